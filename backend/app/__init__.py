@@ -6,9 +6,11 @@ from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from app.db_routing import RoutingSession
+
 load_dotenv()
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 
@@ -16,27 +18,55 @@ jwt = JWTManager()
 def create_app():
     app = Flask(__name__)
 
+    from app.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret")
     default_db = "sqlite:///" + os.path.join(
         os.path.dirname(os.path.dirname(__file__)), "ministry.db"
     )
     app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL", default_db)
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    # Pool sized per worker (gunicorn_config.py matches it to the thread count), with
+    # pre-ping and recycling so connections dropped by the host while idle are replaced.
+    from app.db_pool import engine_options
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+    # Optional read replica for @read_replica views (see app/db_routing.py).
+    from app.db_routing import replica_binds
+    app.config["SQLALCHEMY_BINDS"] = replica_binds(engine_options)
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "jwt-dev-secret")
-    app.config["UPLOAD_FOLDER"] = os.path.join(
+    # Root of the local image storage (app/services/storage.py; STORAGE_BACKEND=s3 ignores it).
+    app.config["UPLOAD_FOLDER"] = os.getenv("UPLOAD_FOLDER") or os.path.join(
         os.path.dirname(os.path.dirname(__file__)), "uploads"
     )
     app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16 MB
+    app.config["MAX_BATCH_CONTENT_LENGTH"] = int(os.getenv("MAX_BATCH_UPLOAD_MB", "128")) * 1024 * 1024
+    app.config["BATCH_UPLOAD_MAX_FILES"] = int(os.getenv("BATCH_UPLOAD_MAX_FILES", "25"))
+    app.config["OCR_BATCH_CONCURRENCY"] = int(os.getenv("OCR_BATCH_CONCURRENCY", "4"))
 
-    os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
+    # Multipart files stream straight to disk, hashed and size-checked (see app/uploads.py).
+    from app.uploads import init_uploads
+    init_uploads(app)
 
     db.init_app(app)
+    from app.sqlite_profile import init_sqlite
+    init_sqlite(app, db)
+    from app.db_routing import init_routing
+    init_routing(app, db)
+    from app.sync import init_sync
+    init_sync(app, db)
+    from app.events import init_events
+    init_events(app, db)
     migrate.init_app(app, db)
     jwt.init_app(app)
     # Allow frontend origin from env in production, or all origins for dev
     frontend_origin = os.getenv("FRONTEND_URL", "").rstrip("/")
     origins = [frontend_origin] if frontend_origin else "*"
-    CORS(app, resources={r"/api/*": {"origins": origins}})
+    CORS(
+        app,
+        resources={r"/api/*": {"origins": origins}},
+        expose_headers=["X-Total-Count", "X-Page", "X-Per-Page", "X-Next-Cursor", "X-Primary-Until", "X-Profile-Id", "X-Sync-Token", "ETag"],
+    )
 
     from app.routes.auth import auth_bp
     from app.routes.users import users_bp
@@ -57,5 +87,20 @@ def create_app():
     app.register_blueprint(activity_bp, url_prefix="/api/activity")
     from app.routes.inventory import inventory_bp
     app.register_blueprint(inventory_bp, url_prefix="/api/inventory")
+    from app.routes.health import health_bp
+    app.register_blueprint(health_bp, url_prefix="/api/health")
+    from app.routes.events import events_bp
+    app.register_blueprint(events_bp, url_prefix="/api/events")
+
+    from app.metrics import init_metrics
+    init_metrics(app)
+    from app.profiling import init_profiling
+    init_profiling(app, db)
+
+    from app.compression import init_compression
+    init_compression(app)
+
+    from app.commands import register_commands
+    register_commands(app)
 
     return app
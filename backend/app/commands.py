@@ -0,0 +1,119 @@
+"""Flask CLI commands (run with `flask --app run:app <command>`)."""
+import click
+from flask.cli import with_appcontext
+
+
+@click.command("reindex-receipts")
+@click.option("--all", "reindex_all", is_flag=True, help="Re-embed every receipt, not only those missing a vector.")
+@click.option("--rebuild", is_flag=True, help="Clear the vector store first (use after changing the embedding model).")
+@click.option("--restart", is_flag=True, help="Ignore any saved checkpoint.")
+@click.option("--chunk-size", default=500, show_default=True, help="Receipts read from the database per chunk.")
+@click.option("--batch-size", default=100, show_default=True, help="Texts per embeddings request / vectors per upsert.")
+@click.option("--workers", default=4, show_default=True, help="Concurrent embedding/upsert batches.")
+@with_appcontext
+def reindex_receipts_command(reindex_all, rebuild, restart, chunk_size, batch_size, workers):
+    """Re-embed receipts and upsert them into the vector store."""
+    from app.services.reindex_service import reindex_receipts
+
+    stats = reindex_receipts(
+        only_missing=not (reindex_all or rebuild),
+        chunk_size=chunk_size,
+        batch_size=batch_size,
+        workers=workers,
+        restart=restart,
+        rebuild=rebuild,
+        log=click.echo,
+    )
+    click.echo(f"Done: {stats['indexed']} receipts indexed, {stats['failed']} failed chunk(s).")
+
+
+@click.command("retry-ocr")
+@click.option("--limit", default=None, type=int, help="Maximum receipts to retry in this run.")
+@with_appcontext
+def retry_ocr_command(limit):
+    """Re-run OCR for receipts deferred while OpenAI was unavailable."""
+    from app.services.receipt_service import retry_pending_ocr
+
+    retried, pending = retry_pending_ocr(limit=limit, log=click.echo)
+    click.echo(f"Done: {retried} receipts re-processed, {pending} still pending.")
+
+
+@click.command("sync-replica")
+@click.option("--interval", default=0.0, type=float, help="Keep syncing every N seconds (0 = copy once).")
+@with_appcontext
+def sync_replica_command(interval):
+    """Copy the SQLite primary onto the SQLite replica (local replica testing)."""
+    import time
+    from app import db
+    from app.db_routing import REPLICA_BIND, sync_sqlite_replica
+
+    replica = db.engines.get(REPLICA_BIND)
+    if replica is None:
+        raise click.ClickException("No replica configured (set REPLICA_DATABASE_URL)")
+    if db.engine.dialect.name != "sqlite" or replica.dialect.name != "sqlite":
+        raise click.ClickException("sync-replica only copies SQLite databases; use your database's replication otherwise")
+    while True:
+        sync_sqlite_replica(db.engine.url.database, replica.url.database)
+        click.echo(f"Replica synced: {replica.url.database}")
+        if interval <= 0:
+            return
+        time.sleep(interval)
+
+
+@click.command("prune-tombstones")
+@click.option("--days", default=30, show_default=True, help="Keep tombstones of deletes newer than this.")
+@with_appcontext
+def prune_tombstones_command(days):
+    """Drop old delete markers; clients that last synced before them reload in full."""
+    from datetime import datetime, timedelta
+    from app.sync import prune_tombstones
+
+    removed = prune_tombstones(datetime.utcnow() - timedelta(days=days))
+    click.echo(f"Pruned {removed} tombstones")
+
+
+@click.command("gc-uploads")
+@click.option("--grace-hours", default=24, show_default=True, help="Keep files newer than this (uploads not yet committed).")
+@click.option("--dry-run", is_flag=True, help="List orphans without deleting them.")
+@with_appcontext
+def gc_uploads_command(grace_hours, dry_run):
+    """Delete uploaded images that no receipt or recipe references."""
+    from datetime import timedelta
+    from app.services.storage import collect_garbage
+
+    orphans, aborted = collect_garbage(timedelta(hours=grace_hours), dry_run=dry_run, log=click.echo)
+    verb = "Found" if dry_run else "Deleted"
+    click.echo(f"{verb} {orphans} orphaned files; aborted {aborted} partial writes.")
+
+
+@click.command("migrate-uploads")
+@click.option("--source", default=None, help="Directory of flat (unsharded) uploads. Defaults to UPLOAD_FOLDER.")
+@click.option("--keep", is_flag=True, help="Leave the source files in place.")
+@with_appcontext
+def migrate_uploads_command(source, keep):
+    """Move flat upload files into the configured storage (sharded local directories or S3)."""
+    import os
+    from flask import current_app
+    from app.services.storage import get_storage
+
+    source = source or current_app.config["UPLOAD_FOLDER"]
+    store = get_storage()
+    moved = 0
+    for entry in os.scandir(source):
+        if not entry.is_file() or entry.name.startswith("."):
+            continue
+        with open(entry.path, "rb") as f:
+            store.save(entry.name, f)
+        if not keep:
+            os.remove(entry.path)
+        moved += 1
+    click.echo(f"Moved {moved} files into {store.name} storage.")
+
+
+def register_commands(app):
+    app.cli.add_command(reindex_receipts_command)
+    app.cli.add_command(retry_ocr_command)
+    app.cli.add_command(sync_replica_command)
+    app.cli.add_command(prune_tombstones_command)
+    app.cli.add_command(gc_uploads_command)
+    app.cli.add_command(migrate_uploads_command)
@@ -0,0 +1,85 @@
+"""Response compression (brotli when installed, else gzip) negotiated via Accept-Encoding.
+
+Disable with COMPRESS_ENABLED=0 when a reverse proxy already compresses responses.
+"""
+import os
+import gzip
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIMETYPES = "application/json,text/csv,text/plain,text/html,text/event-stream"
+
+
+def _encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def negotiate_encoding():
+    """Best encoding the client accepts, or None."""
+    return request.accept_encodings.best_match(_encodings())
+
+
+def _compress(data, encoding, level):
+    if encoding == "br":
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def compress_stream(chunks, encoding, level=6):
+    """Compress an iterable of str/bytes chunks incrementally (for streamed exports).
+    Each chunk is flushed so the client receives data as it is produced."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=min(level, 11))
+        for chunk in chunks:
+            out = compressor.process(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+            out += compressor.flush()
+            if out:
+                yield out
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        out += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def init_compression(app):
+    app.config["COMPRESS_ENABLED"] = os.getenv("COMPRESS_ENABLED", "1").lower() not in ("0", "false", "no")
+    app.config["COMPRESS_MIN_SIZE"] = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+    app.config["COMPRESS_LEVEL"] = int(os.getenv("COMPRESS_LEVEL", "6"))
+    app.config["COMPRESS_MIMETYPES"] = {
+        m.strip() for m in os.getenv("COMPRESS_MIMETYPES", DEFAULT_MIMETYPES).split(",") if m.strip()
+    }
+
+    @app.after_request
+    def compress_response(response):
+        if not app.config["COMPRESS_ENABLED"]:
+            return response
+        if response.mimetype not in app.config["COMPRESS_MIMETYPES"]:
+            return response
+        response.vary.add("Accept-Encoding")
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        encoding = negotiate_encoding()
+        if not encoding:
+            return response
+        data = response.get_data()
+        if len(data) < app.config["COMPRESS_MIN_SIZE"]:
+            return response
+        response.set_data(_compress(data, encoding, app.config["COMPRESS_LEVEL"]))
+        response.headers["Content-Encoding"] = encoding
+        return response
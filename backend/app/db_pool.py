@@ -0,0 +1,80 @@
+"""Database connection pool configuration and per-worker pool statistics."""
+import os
+import time
+import threading
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait (including pre-ping)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+
+def _env_flag(name, default):
+    return os.getenv(name, default).lower() not in ("0", "false", "no")
+
+
+def engine_options(database_uri):
+    """SQLALCHEMY_ENGINE_OPTIONS from the environment.
+
+    pool_pre_ping tests each connection on checkout, so connections the host killed
+    while idle are replaced transparently; pool_recycle retires connections before
+    typical idle cutoffs (Render/Neon drop them after a few minutes).
+    """
+    options = {
+        "pool_pre_ping": _env_flag("DB_POOL_PRE_PING", "1"),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "280")),
+    }
+    if not database_uri.startswith("sqlite"):
+        options.update({
+            "poolclass": TimedQueuePool,
+            "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+            "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        })
+    return options
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    stats = {"pid": os.getpid(), "pool_class": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+        })
+    if isinstance(pool, TimedQueuePool):
+        with pool._stats_lock:
+            stats.update({
+                "checkouts": pool.checkouts,
+                "checkout_timeouts": pool.checkout_timeouts,
+                "avg_wait_ms": round(pool.total_wait / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+                "max_wait_ms": round(pool.max_wait * 1000, 3),
+            })
+    return stats
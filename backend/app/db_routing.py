@@ -0,0 +1,96 @@
+"""Route read-only requests to a replica database.
+
+Set REPLICA_DATABASE_URL to register a "replica" bind; views decorated with
+@read_replica then run their queries there. Everything else stays on the primary,
+and a replica request falls back to the primary once its session has pending or
+flushed changes.
+
+Read-your-writes: after a successful write, responses carry X-Primary-Until (a
+Unix timestamp REPLICA_STICKY_SECONDS ahead). The frontend echoes it back, and
+replica routes honour it by reading from the primary until then, so a client never
+reads a replica that has not caught up with its own writes yet.
+"""
+import os
+import time
+import sqlite3
+from functools import wraps
+from flask import g, request, has_request_context
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND = "replica"
+STICKY_HEADER = "X-Primary-Until"
+_WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _replica_allowed(self):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _replica_allowed(session):
+    if not has_request_context() or not g.get("use_replica"):
+        return False
+    if session.info.get("wrote") or session._flushing or session.new or session.dirty or session.deleted:
+        return False
+    return True
+
+
+def _primary_pinned():
+    try:
+        return float(request.headers.get(STICKY_HEADER, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_replica(view):
+    """Run this view's queries on the replica bind (when one is configured)."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.use_replica = not _primary_pinned()
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def replica_binds(engine_options):
+    """SQLALCHEMY_BINDS entry for REPLICA_DATABASE_URL, or {} when no replica is set."""
+    url = os.getenv("REPLICA_DATABASE_URL")
+    if not url:
+        return {}
+    return {REPLICA_BIND: {"url": url, **engine_options(url)}}
+
+
+def init_routing(app, db):
+    from sqlalchemy import event
+
+    sticky = float(os.getenv("REPLICA_STICKY_SECONDS", "5"))
+
+    @event.listens_for(db.session, "after_flush")
+    def _mark_wrote(session, flush_context):
+        session.info["wrote"] = True
+
+    @app.after_request
+    def _pin_writer_to_primary(response):
+        if request.method in _WRITE_METHODS and response.status_code < 400:
+            response.headers[STICKY_HEADER] = f"{time.time() + sticky:.3f}"
+        return response
+
+
+def sync_sqlite_replica(primary_path, replica_path, pages=1024):
+    """Copy the primary SQLite file onto the replica with the online backup API.
+
+    Consistent even while the primary is being written, and safe for readers that
+    already have the replica open (they see the old or the new copy, never a mix).
+    """
+    src = sqlite3.connect(primary_path)
+    dst = sqlite3.connect(replica_path)
+    try:
+        src.backup(dst, pages=pages)
+    finally:
+        dst.close()
+        src.close()
@@ -0,0 +1,250 @@
+"""Live change events for the SSE stream (GET /api/events/stream).
+
+Inserts, updates and deletes of users, ledger entries, receipts, reimbursements, recipes,
+inventory items and activity log rows become small events
+
+    {"type": "reimbursement", "op": "update", "id": 12, "seq": 340, "user_id": 3}
+
+published when their transaction commits (never for rolled-back work). `seq` is the
+delta-sync token of the change (app/sync.py), so a client reacts with a `since=`
+fetch. Events cross gunicorn workers through a channel:
+
+  postgres - NOTIFY inside the committing transaction; one LISTEN connection per worker
+  table    - rows in live_events written in the same transaction; each worker polls
+             them every EVENTS_POLL_SECONDS (SQLite and other databases), rereading
+             the last EVENTS_REORDER_SECONDS for rows that committed out of id order
+
+EVENTS_CHANNEL picks one explicitly (or `off`); by default Postgres with psycopg2 uses
+postgres and everything else uses table. A worker only listens while it has streams.
+"""
+import os
+import json
+import time
+import queue
+import select
+import logging
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import event, text, insert, select as sql_select, delete, func
+
+log = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "cafe_events"
+MAX_BATCH = 100  # larger commits publish one {"op": "bulk"} event per type instead
+_OWNER = {
+    "user": "id",
+    "ledger": "created_by",
+    "receipt": "uploaded_by",
+    "reimbursement": "requested_by",
+    "recipe": "created_by",
+    "inventory": "last_edited_by",
+    "activity": "user_id",
+}
+
+_hub = None
+
+
+def _entity_types():
+    from app.models import ActivityLog
+    from app.sync import _tracked
+
+    return {**_tracked(), ActivityLog: "activity"}
+
+
+def _collect(session, flush_context):
+    """after_flush: remember what this flush changed until the transaction commits."""
+    types = _entity_types()
+    pending = session.info.setdefault("live_events", {})
+    for objects, op in ((session.new, "insert"), (session.dirty, "update"), (session.deleted, "delete")):
+        for obj in objects:
+            entity = types.get(type(obj))
+            if entity is None or (op == "update" and not session.is_modified(obj)):
+                continue
+            key = (entity, obj.id)
+            if op == "update" and key in pending:
+                continue  # keep "insert" for rows created in this transaction
+            pending[key] = {
+                "type": entity,
+                "op": op,
+                "id": obj.id,
+                "seq": getattr(obj, "change_seq", None),
+                "user_id": getattr(obj, _OWNER[entity]),
+            }
+
+
+def _publish_pending(session):
+    """before_commit: write the collected events into the committing transaction."""
+    if _hub is None:
+        return
+    session.flush()
+    pending = session.info.pop("live_events", None)
+    if not pending:
+        return
+    events = list(pending.values())
+    if len(events) > MAX_BATCH:
+        events = [{"type": t, "op": "bulk", "id": None, "seq": None, "user_id": None}
+                  for t in sorted({e["type"] for e in events})]
+    _hub.channel.publish(session, events)
+
+
+def _discard_pending(session, *args):
+    session.info.pop("live_events", None)
+
+
+class TableChannel:
+    name = "table"
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.poll_seconds = float(os.getenv("EVENTS_POLL_SECONDS", "0.5"))
+        self.retention = timedelta(seconds=int(os.getenv("EVENTS_RETENTION_SECONDS", "600")))
+        self.reorder_seconds = float(os.getenv("EVENTS_REORDER_SECONDS", "5"))
+        self._next_prune = 0.0
+
+    def publish(self, session, events):
+        from app.models import LiveEvent
+
+        table = LiveEvent.__table__
+        session.execute(insert(table), [{"payload": json.dumps(e)} for e in events])
+        # Pruned by whoever publishes, at most every retention/2 per worker, so the table
+        # stays bounded whether or not any worker has a stream open.
+        if time.monotonic() >= self._next_prune:
+            self._next_prune = time.monotonic() + self.retention.total_seconds() / 2
+            session.execute(delete(table).where(table.c.created_at < datetime.utcnow() - self.retention))
+
+    def listen(self, dispatch, active):
+        """Poll for new rows. Ids are assigned at insert but become visible at commit, so
+        on a concurrent database (Postgres without psycopg2, MySQL) a lower id can show up
+        after a higher one. Each poll therefore rereads everything newer than `floor`,
+        skipping ids already dispatched, and `floor` only moves past an id once it has
+        been seen for EVENTS_REORDER_SECONDS."""
+        from app.models import LiveEvent
+
+        table = LiveEvent.__table__
+        floor = None
+        seen = {}  # id -> monotonic time dispatched, for ids above floor
+        while True:
+            if floor is None or not active.is_set():
+                active.wait()
+                # Start from now: nobody was listening for what came before.
+                with self.engine.connect() as conn:
+                    floor = conn.execute(sql_select(func.max(table.c.id))).scalar() or 0
+                seen.clear()
+            time.sleep(self.poll_seconds)
+            with self.engine.connect() as conn:
+                rows = conn.execute(
+                    sql_select(table.c.id, table.c.payload).where(table.c.id > floor).order_by(table.c.id)
+                ).all()
+            now = time.monotonic()
+            for row in rows:
+                if row.id not in seen:
+                    seen[row.id] = now
+                    dispatch(json.loads(row.payload))
+            settled = [i for i, at in seen.items() if now - at >= self.reorder_seconds]
+            if settled:
+                floor = max(floor, *settled)
+                seen = {i: at for i, at in seen.items() if i > floor}
+
+
+class PostgresChannel:
+    name = "postgres"
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def publish(self, session, events):
+        for e in events:
+            session.execute(text("SELECT pg_notify(:channel, :payload)"),
+                            {"channel": NOTIFY_CHANNEL, "payload": json.dumps(e)})
+
+    def listen(self, dispatch, active):
+        raw = self.engine.raw_connection()
+        raw.detach()  # a dedicated connection; the pool opens a replacement
+        conn = raw.driver_connection
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        try:
+            while True:
+                if not active.is_set():
+                    active.wait()
+                    conn.poll()
+                    conn.notifies.clear()  # sent while nobody was listening
+                if select.select([conn], [], [], 5)[0]:
+                    conn.poll()
+                    while conn.notifies:
+                        dispatch(json.loads(conn.notifies.pop(0).payload))
+        finally:
+            raw.close()
+
+
+class Hub:
+    """Fans events from the channel out to this worker's open streams."""
+
+    def __init__(self, channel, max_streams):
+        self.channel = channel
+        self.max_streams = max_streams
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self._thread = None
+
+    def subscribe(self):
+        """A queue receiving every event, or None when this worker is at max_streams."""
+        with self._lock:
+            if len(self._subscribers) >= self.max_streams:
+                return None
+            q = queue.Queue(maxsize=1000)
+            self._subscribers.add(q)
+            self._active.set()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="live-events", daemon=True)
+                self._thread.start()
+            return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+            if not self._subscribers:
+                self._active.clear()
+
+    def dispatch(self, evt):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(evt)
+            except queue.Full:
+                pass  # a stalled client; it resyncs with since= when it reconnects
+
+    def _run(self):
+        delay = 1
+        while True:
+            try:
+                self.channel.listen(self.dispatch, self._active)
+            except Exception:
+                log.exception("Live event listener failed; retrying in %ss", delay)
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+def get_hub():
+    return _hub
+
+
+def init_events(app, db):
+    global _hub
+    choice = os.getenv("EVENTS_CHANNEL", "").strip().lower()
+    if choice in ("off", "0", "none"):
+        return
+    with app.app_context():
+        engine = db.engine
+    if not choice:
+        choice = "postgres" if engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2" else "table"
+    channel = PostgresChannel(engine) if choice == "postgres" else TableChannel(engine)
+    _hub = Hub(channel, int(os.getenv("EVENTS_MAX_STREAMS", "4")))
+
+    if not event.contains(db.session, "after_flush", _collect):
+        event.listen(db.session, "after_flush", _collect)
+        event.listen(db.session, "before_commit", _publish_pending)
+        event.listen(db.session, "after_rollback", _discard_pending)
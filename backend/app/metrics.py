@@ -0,0 +1,145 @@
+"""Prometheus metrics: request latency, status counts, DB queries and upstream calls.
+
+GET /metrics serves them in the Prometheus text format. Under gunicorn every worker
+writes its samples to files in PROMETHEUS_MULTIPROC_DIR (set by gunicorn_config.py
+before the app is imported), and a scrape of any worker returns the sum over all of
+them. Without that variable the metrics cover the current process only.
+
+Set METRICS_TOKEN to require `Authorization: Bearer <token>` on /metrics. Without a
+token the endpoint answers 403, unless METRICS_PUBLIC=1 (e.g. a private network that
+only the scraper reaches) or the app runs in debug mode.
+"""
+import os
+import time
+from contextlib import contextmanager
+from flask import g, request, has_request_context, Response, abort
+from app.query_timing import on_query
+
+_prometheus_available = True
+
+try:
+    from prometheus_client import (
+        CollectorRegistry,
+        Counter,
+        Histogram,
+        generate_latest,
+        multiprocess,
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+    )
+except ImportError:
+    _prometheus_available = False
+
+_DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+_QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+_UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 90.0)
+
+if _prometheus_available:
+    REQUEST_LATENCY = Histogram(
+        "http_request_duration_seconds",
+        "Time to build the response, by route",
+        ["method", "blueprint", "endpoint"],
+    )
+    REQUESTS = Counter(
+        "http_requests_total",
+        "Responses by route and status code",
+        ["method", "blueprint", "endpoint", "status"],
+    )
+    DB_QUERY_LATENCY = Histogram(
+        "db_query_duration_seconds",
+        "SQL statement execution time, by route",
+        ["endpoint"],
+        buckets=_DB_BUCKETS,
+    )
+    DB_QUERIES_PER_REQUEST = Histogram(
+        "db_queries_per_request",
+        "SQL statements executed per request",
+        ["endpoint"],
+        buckets=_QUERY_COUNT_BUCKETS,
+    )
+    UPSTREAM_LATENCY = Histogram(
+        "upstream_request_duration_seconds",
+        "Outbound API call time (each attempt), by service, operation and outcome",
+        ["service", "operation", "outcome"],
+        buckets=_UPSTREAM_BUCKETS,
+    )
+
+
+def _endpoint():
+    if has_request_context():
+        return request.endpoint or "unmatched"
+    return "none"
+
+
+@contextmanager
+def upstream_timer(service, operation):
+    """Time one outbound call; records outcome "ok" or "error"."""
+    if not _prometheus_available:
+        yield
+        return
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        UPSTREAM_LATENCY.labels(service, operation, outcome).observe(time.perf_counter() - start)
+
+
+def _observe_query(conn, cursor, statement, parameters, executemany, elapsed):
+    DB_QUERY_LATENCY.labels(_endpoint()).observe(elapsed)
+    if has_request_context() and "metrics_start" in g:
+        g.metrics_queries += 1
+
+
+def _record(response_status):
+    if g.get("metrics_recorded") or "metrics_start" not in g:
+        return
+    g.metrics_recorded = True
+    endpoint = request.endpoint or "unmatched"
+    blueprint = request.blueprint or ""
+    REQUEST_LATENCY.labels(request.method, blueprint, endpoint).observe(time.perf_counter() - g.metrics_start)
+    REQUESTS.labels(request.method, blueprint, endpoint, str(response_status)).inc()
+    DB_QUERIES_PER_REQUEST.labels(endpoint).observe(g.metrics_queries)
+
+
+def _registry():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def init_metrics(app):
+    if not _prometheus_available or os.getenv("METRICS_ENABLED", "1").lower() in ("0", "false", "no"):
+        return
+
+    on_query("metrics", _observe_query)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+        g.metrics_queries = 0
+
+    @app.after_request
+    def _record_response(response):
+        _record(response.status_code)
+        return response
+
+    @app.teardown_request
+    def _record_error(exc):
+        if exc is not None:
+            _record(500)
+
+    token = os.getenv("METRICS_TOKEN")
+    public = app.debug or os.getenv("METRICS_PUBLIC", "0").lower() in ("1", "true", "yes")
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        if token:
+            if request.headers.get("Authorization") != f"Bearer {token}":
+                abort(401)
+        elif not public:
+            abort(403)
+        return Response(generate_latest(_registry()), content_type=CONTENT_TYPE_LATEST)
@@ -1,4 +1,5 @@
 from datetime import datetime, date
+from sqlalchemy import event, DDL
 from app import db
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -13,6 +14,8 @@ class User(db.Model):
     role = db.Column(db.String(20), nullable=False, default="worker")  # admin | worker
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped on every write like the synced models (app/sync.py); feeds collection ETags.
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0", index=True)
 
     def set_password(self, password):
         self.password_hash = generate_password_hash(password)
@@ -35,30 +38,43 @@ class Receipt(db.Model):
     __tablename__ = "receipts"
 
     id = db.Column(db.Integer, primary_key=True)
-    uploaded_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    uploaded_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     image_path = db.Column(db.String(512), nullable=False)
-    ocr_raw = db.Column(db.JSON, nullable=True)
+    # Full model response with every line item; deferred so list queries don't load it.
+    ocr_raw = db.deferred(db.Column(db.JSON, nullable=True))
     merchant_name = db.Column(db.String(256), nullable=True)
-    transaction_date = db.Column(db.Date, nullable=True)
-    total_amount = db.Column(db.Numeric(12, 2), nullable=True)
+    transaction_date = db.Column(db.Date, nullable=True, index=True)
+    total_amount = db.Column(db.Numeric(12, 2), nullable=True, index=True)
     pinecone_id = db.Column(db.String(256), nullable=True)
+    search_text = db.Column(db.Text, nullable=True)  # full-text source; see search_service
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Global change sequence of the last insert/update (see app/sync.py); `since=` reads it.
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0", index=True)
 
     uploader = db.relationship("User", backref="receipts")
 
-    def to_dict(self):
-        return {
+    __table_args__ = (
+        db.Index("ix_receipts_created_at_id", "created_at", "id"),
+        db.Index("ix_receipts_merchant_lower", db.func.lower(merchant_name)),
+    )
+
+    def to_dict(self, include_ocr=False):
+        data = {
             "id": self.id,
             "uploaded_by": self.uploaded_by,
             "uploaded_by_name": self.uploader.name if self.uploader else None,
             "image_path": self.image_path,
-            "ocr_raw": self.ocr_raw,
             "merchant_name": self.merchant_name,
             "transaction_date": self.transaction_date.isoformat() if self.transaction_date else None,
             "total_amount": float(self.total_amount) if self.total_amount else None,
             "pinecone_id": self.pinecone_id,
             "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+        if include_ocr:
+            data["ocr_raw"] = self.ocr_raw
+        return data
 
 
 LEDGER_CATEGORIES = ["sales", "expense", "reimbursement", "ministry_fund", "offering"]
@@ -78,6 +94,9 @@ class LedgerEntry(db.Model):
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     status = db.Column(db.String(20), nullable=False, default="approved")
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Global change sequence of the last insert/update (see app/sync.py); `since=` reads it.
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0", index=True)
 
     receipt = db.relationship("Receipt", backref="ledger_entries")
     creator = db.relationship("User", backref="ledger_entries")
@@ -94,6 +113,7 @@ class LedgerEntry(db.Model):
             "created_by": self.created_by,
             "status": self.status,
             "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
 
 
@@ -108,6 +128,9 @@ class Reimbursement(db.Model):
     notes = db.Column(db.Text, nullable=True)
     payout_date = db.Column(db.Date, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Global change sequence of the last insert/update (see app/sync.py); `since=` reads it.
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0", index=True)
 
     ledger_entry = db.relationship("LedgerEntry", backref="reimbursement")
     requester = db.relationship("User", foreign_keys=[requested_by], backref="reimbursement_requests")
@@ -125,6 +148,7 @@ class Reimbursement(db.Model):
             "notes": self.notes,
             "payout_date": self.payout_date.isoformat() if self.payout_date else None,
             "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
             "ledger_entry": self.ledger_entry.to_dict() if self.ledger_entry else None,
         }
 
@@ -142,11 +166,16 @@ class Recipe(db.Model):
     cook_time = db.Column(db.Integer, nullable=True)
     servings = db.Column(db.Integer, nullable=True)
     image_path = db.Column(db.String(512), nullable=True)
+    search_text = db.Column(db.Text, nullable=True)  # full-text source; see recipe_search
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Global change sequence of the last insert/update (see app/sync.py); `since=` reads it.
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0", index=True)
 
     creator = db.relationship("User", backref="recipes")
+    # SQLite does not enforce ON DELETE CASCADE here, so the ORM removes the rows itself.
+    ingredient_names = db.relationship("RecipeIngredient", cascade="all, delete-orphan")
 
     def to_dict(self):
         return {
@@ -167,6 +196,19 @@ class Recipe(db.Model):
         }
 
 
+class RecipeIngredient(db.Model):
+    """One normalized ingredient name per recipe ("2 shots espresso" -> "espresso"),
+    kept in step with Recipe.ingredients by recipe_search.index_recipe()."""
+    __tablename__ = "recipe_ingredients"
+
+    recipe_id = db.Column(
+        db.Integer, db.ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True
+    )
+    name = db.Column(db.String(120), primary_key=True)
+
+    __table_args__ = (db.Index("ix_recipe_ingredients_name", "name"),)
+
+
 class ActivityLog(db.Model):
     """Record of who did what for audit trail."""
     __tablename__ = "activity_logs"
@@ -205,6 +247,9 @@ class InventoryItem(db.Model):
     last_edited_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
     last_edited_at = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Global change sequence of the last insert/update (see app/sync.py); `since=` reads it.
+    change_seq = db.Column(db.BigInteger, nullable=False, default=0, server_default="0", index=True)
 
     editor = db.relationship("User", backref="inventory_edits")
 
@@ -218,4 +263,46 @@ class InventoryItem(db.Model):
             "last_edited_by_name": self.editor.name if self.editor else None,
             "last_edited_at": self.last_edited_at.isoformat() if self.last_edited_at else None,
             "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
         }
+
+
+class ChangeCounter(db.Model):
+    """Single row holding the global change sequence for delta sync (app/sync.py)."""
+    __tablename__ = "change_counter"
+
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+    # Tombstones at or below this sequence have been pruned; older `since=` values must reload.
+    tombstone_floor = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+event.listen(
+    ChangeCounter.__table__,
+    "after_create",
+    DDL("INSERT INTO change_counter (id, value, tombstone_floor) VALUES (1, 0, 0)"),
+)
+
+
+class Tombstone(db.Model):
+    """A deleted ledger entry, receipt, reimbursement, recipe, inventory item or user."""
+    __tablename__ = "tombstones"
+
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(40), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    change_seq = db.Column(db.BigInteger, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        db.Index("ix_tombstones_entity_type_change_seq", "entity_type", "change_seq"),
+    )
+
+
+class LiveEvent(db.Model):
+    """Outbox for live change events on databases without LISTEN/NOTIFY (app/events.py)."""
+    __tablename__ = "live_events"
+
+    id = db.Column(db.Integer, primary_key=True)
+    payload = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
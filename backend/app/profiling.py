@@ -0,0 +1,200 @@
+"""Slow-query log and opt-in per-request profiling.
+
+Slow queries: any statement slower than SLOW_QUERY_MS (default 200; 0 disables) is
+logged to the "app.slow_query" logger with its parameter shape and EXPLAIN plan.
+
+Profiling: a request is profiled when it carries `X-Profile: <PROFILE_TOKEN>` (only
+if PROFILE_TOKEN is set) or `?_profile=1` from an admin. The Python profile (cProfile,
+or pyinstrument with PROFILER=pyinstrument) and every SQL statement with its timing
+are saved under PROFILES_DIR; the response's X-Profile-Id names the files:
+  <id>.json  request, SQL statements, top functions
+  <id>.prof  cProfile stats (`python -m pstats` / snakeviz), or <id>.html for pyinstrument
+One request is profiled at a time per worker; concurrent ones are served unprofiled.
+"""
+import os
+import io
+import json
+import time
+import uuid
+import pstats
+import cProfile
+import logging
+import threading
+from importlib.util import find_spec
+from flask import g, request, has_request_context
+from app.query_timing import on_query
+
+_pyinstrument_available = find_spec("pyinstrument") is not None
+
+slow_query_log = logging.getLogger("app.slow_query")
+
+_EXPLAINABLE = ("select", "with", "update", "delete", "insert")
+_profile_lock = threading.Lock()
+
+
+def params_shape(parameters):
+    """Types (and lengths for strings) of bound parameters, without their values."""
+    def shape(value):
+        if isinstance(value, (str, bytes)):
+            return f"{type(value).__name__}[{len(value)}]"
+        return type(value).__name__
+
+    if isinstance(parameters, dict):
+        return {k: shape(v) for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [shape(v) for v in parameters]
+    return shape(parameters)
+
+
+def _explain(conn, cursor, statement, parameters, executemany=False):
+    """EXPLAIN a statement on the caller's own connection and transaction. Outside SQLite
+    it runs inside a savepoint, so a failing EXPLAIN cannot abort the caller's transaction."""
+    if executemany or not statement.lstrip().lower().startswith(_EXPLAINABLE):
+        return None
+    sqlite = conn.dialect.name == "sqlite"
+    prefix = "EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN "
+    cursor = cursor.connection.cursor()
+    try:
+        if not sqlite:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return "\n".join(" | ".join(str(col) for col in row) for row in cursor.fetchall())
+        except Exception as e:
+            if not sqlite:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return f"(EXPLAIN failed: {e})"
+        finally:
+            if not sqlite:
+                cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    except Exception as e:
+        return f"(EXPLAIN failed: {e})"
+    finally:
+        cursor.close()
+
+
+def _make_query_hook(threshold):
+    def _record_query(conn, cursor, statement, parameters, executemany, elapsed):
+        if has_request_context() and g.get("profile_sql") is not None:
+            g.profile_sql.append({
+                "statement": statement,
+                "params": params_shape(parameters),
+                "executemany": executemany,
+                "duration_ms": round(elapsed * 1000, 3),
+            })
+        if threshold and elapsed * 1000 >= threshold:
+            plan = _explain(conn, cursor, statement, parameters, executemany)
+            slow_query_log.warning(
+                "Slow query (%.1f ms) on %s\n%s\nparams: %s\nplan:\n%s",
+                elapsed * 1000,
+                request.endpoint if has_request_context() else "cli",
+                statement,
+                params_shape(parameters),
+                plan,
+            )
+
+    return _record_query
+
+
+def _profile_requested():
+    token = os.getenv("PROFILE_TOKEN")
+    if token and request.headers.get("X-Profile") == token:
+        return True
+    if request.args.get("_profile") != "1":
+        return False
+    from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+    from app.models import User
+
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return False
+    user = User.query.get(int(identity)) if identity else None
+    return user is not None and user.role == "admin"
+
+
+def _start_profiler():
+    if os.getenv("PROFILER", "cprofile") == "pyinstrument" and _pyinstrument_available:
+        from pyinstrument import Profiler as InstrumentProfiler
+        profiler = InstrumentProfiler()
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+
+def _save_profile(directory, profiler, response):
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{(request.endpoint or 'unmatched').replace('.', '-')}-{uuid.uuid4().hex[:6]}"
+    os.makedirs(directory, exist_ok=True)
+    base = os.path.join(directory, profile_id)
+
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+        profiler.dump_stats(base + ".prof")
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(25)
+        summary = out.getvalue()
+    else:
+        profiler.stop()
+        with open(base + ".html", "w", encoding="utf-8") as f:
+            f.write(profiler.output_html())
+        summary = profiler.output_text()
+
+    sql = g.profile_sql
+    report = {
+        "id": profile_id,
+        "method": request.method,
+        "path": request.full_path,
+        "endpoint": request.endpoint,
+        "status": response.status_code,
+        "duration_ms": round((time.perf_counter() - g.profile_start) * 1000, 3),
+        "sql_count": len(sql),
+        "sql_ms": round(sum(q["duration_ms"] for q in sql), 3),
+        "sql": sql,
+        "top_functions": summary,
+    }
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+    return profile_id
+
+
+def init_profiling(app, db):
+    threshold = float(os.getenv("SLOW_QUERY_MS", "200"))
+    directory = os.getenv("PROFILES_DIR") or os.path.join(
+        os.path.dirname(os.path.dirname(__file__)), "profiles"
+    )
+
+    on_query("profiling", _make_query_hook(threshold))
+
+    @app.before_request
+    def _maybe_start_profile():
+        if not _profile_requested() or not _profile_lock.acquire(blocking=False):
+            return
+        g.profile_sql = []
+        g.profile_start = time.perf_counter()
+        g.profiler = _start_profiler()
+
+    @app.after_request
+    def _maybe_save_profile(response):
+        profiler = g.pop("profiler", None)
+        if profiler is None:
+            return response
+        try:
+            response.headers["X-Profile-Id"] = _save_profile(directory, profiler, response)
+        finally:
+            g.profile_sql = None
+            _profile_lock.release()
+        return response
+
+    @app.teardown_request
+    def _release_profile(exc):
+        # The request failed before after_request ran: drop the profile.
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            if isinstance(profiler, cProfile.Profile):
+                profiler.disable()
+            else:
+                profiler.stop()
+            _profile_lock.release()
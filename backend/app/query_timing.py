@@ -0,0 +1,35 @@
+"""One pair of engine cursor listeners that times every SQL statement.
+
+The start time is kept on the statement's execution context rather than the pooled
+connection, so a statement that raises (after_cursor_execute never fires for it)
+leaves nothing behind. Consumers (metrics.py, profiling.py) register a callback that
+receives each finished statement with its duration.
+"""
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_callbacks = {}
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_timing_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_query_timing_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    for callback in list(_callbacks.values()):
+        callback(conn, cursor, statement, parameters, executemany, elapsed)
+
+
+def on_query(name, callback):
+    """Call `callback(conn, cursor, statement, parameters, executemany, elapsed_seconds)`
+    after every statement on any engine. Registering `name` again replaces the callback."""
+    _callbacks[name] = callback
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
@@ -1,22 +1,37 @@
 from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db
 from app.models import User, ActivityLog
+from app.json_provider import rows_to_dicts
+from app.db_routing import read_replica
 
 activity_bp = Blueprint("activity", __name__)
 
 
 @activity_bp.route("/", methods=["GET"])
 @jwt_required()
+@read_replica
 def list_activity():
     user_id = int(get_jwt_identity())
     current_user = User.query.get(user_id)
     if not current_user:
         return jsonify({"error": "User not found"}), 404
 
-    query = ActivityLog.query
+    # Plain column rows joined to the user name (same keys as ActivityLog.to_dict()),
+    # instead of one lazy User load per log row.
+    query = db.session.query(
+        ActivityLog.id,
+        ActivityLog.user_id,
+        User.name.label("user_name"),
+        ActivityLog.action,
+        ActivityLog.entity_type,
+        ActivityLog.entity_id,
+        ActivityLog.details,
+        ActivityLog.created_at,
+    ).outerjoin(User, ActivityLog.user_id == User.id)
     if current_user.role != "admin":
-        query = query.filter_by(user_id=user_id)
+        query = query.filter(ActivityLog.user_id == user_id)
 
     start = request.args.get("start")
     end = request.args.get("end")
@@ -26,10 +41,10 @@ def list_activity():
         query = query.filter(ActivityLog.created_at < datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1))
     entity_type = request.args.get("entity_type")
     if entity_type:
-        query = query.filter_by(entity_type=entity_type)
+        query = query.filter(ActivityLog.entity_type == entity_type)
     user_filter = request.args.get("user_id")
     if user_filter and current_user.role == "admin":
-        query = query.filter_by(user_id=int(user_filter))
+        query = query.filter(ActivityLog.user_id == int(user_filter))
 
     logs = query.order_by(ActivityLog.created_at.desc()).limit(500).all()
-    return jsonify([log.to_dict() for log in logs])
+    return jsonify(rows_to_dicts(logs))
@@ -4,12 +4,14 @@ from flask_jwt_extended import jwt_required
 from sqlalchemy import func, case
 from app import db
 from app.models import LedgerEntry, Reimbursement
+from app.db_routing import read_replica
 
 analytics_bp = Blueprint("analytics", __name__)
 
 
 @analytics_bp.route("/summary", methods=["GET"])
 @jwt_required()
+@read_replica
 def summary():
     start = request.args.get("start")
     end = request.args.get("end")
@@ -53,10 +55,12 @@ def summary():
     ]
 
     reimb_filter = Reimbursement.query
+    if start or end:
+        reimb_filter = reimb_filter.join(LedgerEntry)
     if start:
-        reimb_filter = reimb_filter.join(LedgerEntry).filter(LedgerEntry.entry_date >= datetime.strptime(start, "%Y-%m-%d").date())
+        reimb_filter = reimb_filter.filter(LedgerEntry.entry_date >= datetime.strptime(start, "%Y-%m-%d").date())
     if end:
-        reimb_filter = reimb_filter.join(LedgerEntry).filter(LedgerEntry.entry_date <= datetime.strptime(end, "%Y-%m-%d").date())
+        reimb_filter = reimb_filter.filter(LedgerEntry.entry_date <= datetime.strptime(end, "%Y-%m-%d").date())
     reimb_count = reimb_filter.count()
 
     return jsonify({
@@ -0,0 +1,70 @@
+import os
+import json
+import time
+import queue
+from flask import Blueprint, Response, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db
+from app.models import User
+from app.events import get_hub
+
+events_bp = Blueprint("events", __name__)
+
+HEARTBEAT_SECONDS = 15
+STREAM_SECONDS = int(os.getenv("EVENTS_STREAM_SECONDS", "300"))
+# Workers see only their own receipts, reimbursements and activity (as in the listings).
+_PRIVATE_TYPES = ("receipt", "reimbursement", "activity")
+
+
+def _visible(evt, user_id, is_admin):
+    return is_admin or evt["type"] not in _PRIVATE_TYPES or evt["user_id"] in (user_id, None)
+
+
+def _format(evt):
+    return f"event: {evt['type']}\ndata: {json.dumps(evt)}\n\n"
+
+
+@events_bp.route("/stream", methods=["GET"])
+@jwt_required()
+def stream():
+    """Server-sent events: one `event: <type>` message per committed change (app/events.py).
+
+    The stream ends after EVENTS_STREAM_SECONDS so worker threads are recycled; clients
+    reconnect and should refetch with since= to cover the gap. Comment lines every 15 s
+    keep proxies from closing an idle stream.
+    """
+    hub = get_hub()
+    if hub is None:
+        return jsonify({"error": "Live events are disabled"}), 404
+    user_id = int(get_jwt_identity())
+    user = User.query.get(user_id)
+    if not user:
+        return jsonify({"error": "User not found"}), 404
+    is_admin = user.role == "admin"
+    # Give the connection back to the pool; the stream itself never touches the database.
+    db.session.remove()
+
+    subscription = hub.subscribe()
+    if subscription is None:
+        return jsonify({"error": "Too many live streams on this worker"}), 503, {"Retry-After": "10"}
+
+    def generate():
+        try:
+            yield "retry: 3000\n\n"
+            deadline = time.monotonic() + STREAM_SECONDS
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    evt = subscription.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if _visible(evt, user_id, is_admin):
+                    yield _format(evt)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,46 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import text
+from app import db
+from app.models import User
+from app.services.resilience import breaker_states
+from app.db_pool import pool_stats
+
+health_bp = Blueprint("health", __name__)
+
+
+@health_bp.route("/", methods=["GET"])
+def health():
+    """Liveness plus upstream circuit-breaker state. Unauthenticated for load balancers,
+    so it carries no error text; see /breakers for that."""
+    try:
+        db.session.execute(text("SELECT 1"))
+        database = "ok"
+    except Exception as e:
+        db.session.rollback()
+        database = f"error: {e.__class__.__name__}"
+
+    breakers = breaker_states()
+    degraded = any(b["state"] != "closed" for b in breakers.values())
+    status = "error" if database != "ok" else ("degraded" if degraded else "ok")
+    return jsonify({"status": status, "database": database, "breakers": breakers}), 503 if database != "ok" else 200
+
+
+@health_bp.route("/pool", methods=["GET"])
+@jwt_required()
+def pool():
+    """Connection pool stats for the worker that serves this request (admin only)."""
+    user = User.query.get(int(get_jwt_identity()))
+    if not user or user.role != "admin":
+        return jsonify({"error": "Admin access required"}), 403
+    return jsonify({name or "default": pool_stats(engine) for name, engine in db.engines.items()})
+
+
+@health_bp.route("/breakers", methods=["GET"])
+@jwt_required()
+def breakers():
+    """Circuit-breaker state including each upstream's last error message (admin only)."""
+    user = User.query.get(int(get_jwt_identity()))
+    if not user or user.role != "admin":
+        return jsonify({"error": "Admin access required"}), 403
+    return jsonify(breaker_states(include_errors=True))
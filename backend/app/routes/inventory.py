@@ -1,7 +1,7 @@
 from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
+from app import db, sync
 from app.models import User, InventoryItem
 from app.activity_log import log_activity
 
@@ -11,8 +11,22 @@ inventory_bp = Blueprint("inventory", __name__)
 @inventory_bp.route("/", methods=["GET"])
 @jwt_required()
 def list_inventory():
-    items = InventoryItem.query.order_by(InventoryItem.name).all()
-    return jsonify([i.to_dict() for i in items])
+    try:
+        since = sync.parse_since()
+    except ValueError:
+        return jsonify({"error": "since must be a sync token or an ISO timestamp"}), 400
+    token = sync.current_token()
+    if since is None:
+        etag = sync.collection_etag(InventoryItem, related=(User,))
+        if (cached := sync.not_modified(etag, token)) is not None:
+            return cached
+    query = InventoryItem.query
+    if since is not None:
+        query = query.filter(sync.changed_since(InventoryItem, since))
+    items = [i.to_dict() for i in query.order_by(InventoryItem.name).all()]
+    if since is not None:
+        return sync.delta_response(InventoryItem, items, since, token)
+    return sync.with_etag(sync.with_token(jsonify(items), token), etag)
 
 
 @inventory_bp.route("/", methods=["POST"])
@@ -1,10 +1,15 @@
+import io
+import csv
 from datetime import date, datetime
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import func, case, cast, Numeric
-from app import db
+from app import db, sync
 from app.models import User, LedgerEntry, LEDGER_CATEGORIES
 from app.activity_log import log_activity
+from app.json_provider import rows_to_dicts
+from app.compression import negotiate_encoding, compress_stream
+from app.db_routing import read_replica
 
 ledger_bp = Blueprint("ledger", __name__)
 
@@ -38,7 +43,48 @@ def create_entry():
 @ledger_bp.route("/", methods=["GET"])
 @jwt_required()
 def list_entries():
-    query = LedgerEntry.query
+    try:
+        since = sync.parse_since()
+    except ValueError:
+        return jsonify({"error": "since must be a sync token or an ISO timestamp"}), 400
+    token = sync.current_token()
+    criteria = []
+    start = request.args.get("start")
+    end = request.args.get("end")
+    if start:
+        criteria.append(LedgerEntry.entry_date >= datetime.strptime(start, "%Y-%m-%d").date())
+    if end:
+        criteria.append(LedgerEntry.entry_date <= datetime.strptime(end, "%Y-%m-%d").date())
+    if since is None:
+        etag = sync.collection_etag(LedgerEntry, criteria)
+        if (cached := sync.not_modified(etag, token)) is not None:
+            return cached
+
+    # Plain column rows (same keys as LedgerEntry.to_dict()); no ORM objects are built.
+    query = db.session.query(*(c for c in LedgerEntry.__table__.columns if c.key != "change_seq")).filter(*criteria)
+
+    if since is not None:
+        query = query.filter(sync.changed_since(LedgerEntry, since))
+    entries = query.order_by(LedgerEntry.entry_date.desc()).all()
+    if since is not None:
+        return sync.delta_response(LedgerEntry, rows_to_dicts(entries), since, token)
+    return sync.with_etag(sync.with_token(jsonify(rows_to_dicts(entries)), token), etag)
+
+
+@ledger_bp.route("/export", methods=["GET"])
+@jwt_required()
+def export_entries():
+    """Stream ledger entries as CSV, compressed on the fly when the client accepts it."""
+    query = db.session.query(
+        LedgerEntry.id,
+        LedgerEntry.entry_date,
+        LedgerEntry.category,
+        LedgerEntry.amount,
+        LedgerEntry.status,
+        LedgerEntry.label,
+        LedgerEntry.description,
+        User.name.label("created_by_name"),
+    ).outerjoin(User, LedgerEntry.created_by == User.id)
 
     start = request.args.get("start")
     end = request.args.get("end")
@@ -46,13 +92,35 @@ def list_entries():
         query = query.filter(LedgerEntry.entry_date >= datetime.strptime(start, "%Y-%m-%d").date())
     if end:
         query = query.filter(LedgerEntry.entry_date <= datetime.strptime(end, "%Y-%m-%d").date())
-
-    entries = query.order_by(LedgerEntry.entry_date.desc()).all()
-    return jsonify([e.to_dict() for e in entries])
+    query = query.order_by(LedgerEntry.entry_date, LedgerEntry.id)
+
+    def generate():
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow(["id", "date", "category", "amount", "status", "label", "description", "created_by"])
+        for i, r in enumerate(query.execution_options(yield_per=1000), 1):
+            writer.writerow([r.id, r.entry_date.isoformat(), r.category, r.amount, r.status, r.label or "", r.description or "", r.created_by_name or ""])
+            if i % 1000 == 0:
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        yield buf.getvalue()
+
+    body = stream_with_context(generate())
+    encoding = negotiate_encoding() if current_app.config["COMPRESS_ENABLED"] else None
+    if encoding:
+        body = compress_stream(body, encoding, current_app.config["COMPRESS_LEVEL"])
+    response = Response(body, mimetype="text/csv")
+    response.headers["Content-Disposition"] = "attachment; filename=ledger.csv"
+    response.vary.add("Accept-Encoding")
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    return response
 
 
 @ledger_bp.route("/daily-summary", methods=["GET"])
 @jwt_required()
+@read_replica
 def daily_summary():
     start = request.args.get("start")
     end = request.args.get("end")
@@ -1,13 +1,26 @@
-import os
-import uuid
+import math
+import base64
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from flask import Blueprint, request, jsonify, current_app, send_from_directory
+from flask import Blueprint, Response, request, jsonify, current_app, send_file, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
+from sqlalchemy import tuple_
+from sqlalchemy.orm import undefer
+from app import db, sync
 from app.models import User, Receipt
-from app.services.ocr_service import run_ocr, upsert_to_pinecone, search_receipts
+from app.services.ocr_service import upsert_to_pinecone, upsert_batch_to_pinecone
+from app.services.receipt_service import run_ocr_safe, apply_ocr_data
+from app.services.storage import get_storage, new_key, mimetype, iter_file
+from app.services.search_service import (
+    hybrid_search,
+    apply_filters,
+    receipt_search_text,
+    receipt_embedding_text,
+    receipt_vector_metadata,
+)
 from app.activity_log import log_activity
 from app.services.inventory_service import add_receipt_items_to_inventory
+from app.db_routing import read_replica
 
 receipts_bp = Blueprint("receipts", __name__)
 
@@ -18,6 +31,53 @@ def _allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def _requested_fields():
+    """?fields=id,merchant_name,... limits the keys returned for each receipt."""
+    raw = request.args.get("fields")
+    return {f.strip() for f in raw.split(",") if f.strip()} if raw else None
+
+
+def _wants_ocr(fields):
+    """ocr_raw is only loaded for ?include=ocr (or when fields= names it)."""
+    include = {p.strip() for p in request.args.get("include", "").split(",")}
+    return "ocr" in include or (fields is not None and "ocr_raw" in fields)
+
+
+def _project(data, fields):
+    if fields is None:
+        return data
+    return {k: v for k, v in data.items() if k in fields or k == "id"}
+
+
+def _serialize(receipt, include_ocr, fields):
+    return _project(receipt.to_dict(include_ocr=include_ocr), fields)
+
+
+def _save_upload(file):
+    """Store an uploaded receipt image under a random key (services/storage.py). Returns the key."""
+    filename = new_key(file.filename.rsplit(".", 1)[1])
+    get_storage().save_upload(filename, file.stream)
+    return filename
+
+
+def _create_receipt(user_id, filename, ocr_data):
+    """Persist a receipt from OCR output, log it and add its items to inventory."""
+    receipt = Receipt(uploaded_by=user_id, image_path=filename)
+    apply_ocr_data(receipt, ocr_data)
+    db.session.add(receipt)
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        get_storage().delete(filename)
+        raise
+
+    log_activity(user_id, "receipt.upload", "receipt", receipt.id, f"Uploaded receipt #{receipt.id}" + (f" ({receipt.merchant_name})" if receipt.merchant_name else ""))
+
+    add_receipt_items_to_inventory(receipt, user_id)
+    return receipt
+
+
 @receipts_bp.route("/upload", methods=["POST"])
 @jwt_required()
 def upload_receipt():
@@ -48,49 +108,16 @@ def upload_receipt():
     if not file.filename or not _allowed_file(file.filename):
         return jsonify({"error": "Invalid file type. Use PNG, JPG, JPEG, or WebP."}), 400
 
-    ext = file.filename.rsplit(".", 1)[1].lower()
-    filename = f"{uuid.uuid4().hex}.{ext}"
-    filepath = os.path.join(current_app.config["UPLOAD_FOLDER"], filename)
-    file.save(filepath)
-
-    try:
-        ocr_data = run_ocr(filepath)
-    except Exception as e:
-        ocr_data = {"error": str(e)}
-
-    tx_date = None
-    if ocr_data.get("transaction_date"):
-        try:
-            tx_date = datetime.strptime(ocr_data["transaction_date"], "%Y-%m-%d").date()
-        except (ValueError, TypeError):
-            pass
-
-    receipt = Receipt(
-        uploaded_by=user_id,
-        image_path=filename,
-        ocr_raw=ocr_data,
-        merchant_name=ocr_data.get("merchant_name"),
-        transaction_date=tx_date,
-        total_amount=ocr_data.get("total_amount"),
-    )
-    db.session.add(receipt)
-    db.session.commit()
-
-    log_activity(user_id, "receipt.upload", "receipt", receipt.id, f"Uploaded receipt #{receipt.id}" + (f" ({receipt.merchant_name})" if receipt.merchant_name else ""))
+    filename = _save_upload(file)
 
-    add_receipt_items_to_inventory(receipt, user_id)
+    ocr_data = run_ocr_safe(filename)
+    receipt = _create_receipt(user_id, filename, ocr_data)
 
-    embedding_text = f"{receipt.merchant_name or ''} {receipt.total_amount or ''} {ocr_data.get('category_suggestion', '')}"
     try:
         pinecone_id = upsert_to_pinecone(
             receipt.id,
-            embedding_text,
-            {
-                "receipt_id": receipt.id,
-                "merchant": receipt.merchant_name or "",
-                "amount": float(receipt.total_amount) if receipt.total_amount else 0,
-                "date": receipt.transaction_date.isoformat() if receipt.transaction_date else "",
-            },
+            receipt_embedding_text(receipt),
+            receipt_vector_metadata(receipt),
         )
         if pinecone_id:
             receipt.pinecone_id = pinecone_id
@@ -98,21 +125,198 @@ def upload_receipt():
     except Exception:
         pass
 
-    return jsonify(receipt.to_dict()), 201
+    return jsonify(receipt.to_dict(include_ocr=True)), 201
+
+
+@receipts_bp.route("/upload-batch", methods=["POST"])
+@jwt_required()
+def upload_batch():
+    """Upload several receipt images in one multipart request (field name 'files').
+    OCR runs concurrently; the response lists a result per file in upload order."""
+    user_id = int(get_jwt_identity())
+
+    ct = (request.content_type or "").lower()
+    if "multipart" not in ct and "form-data" not in ct:
+        return jsonify({"error": "Request must be multipart/form-data with one or more 'files' fields."}), 400
+
+    # Must be set before request.files is touched, since that triggers form parsing.
+    request.max_content_length = current_app.config["MAX_BATCH_CONTENT_LENGTH"]
+    files = request.files.getlist("files") or request.files.getlist("file")
+    if not files:
+        return jsonify({"error": "No files provided. Send images as multipart/form-data with field name 'files'."}), 400
+    max_files = current_app.config["BATCH_UPLOAD_MAX_FILES"]
+    if len(files) > max_files:
+        return jsonify({"error": f"Too many files. Upload at most {max_files} at a time."}), 400
+
+    results = [{"filename": f.filename, "status": "error"} for f in files]
+    saved = []  # (index, filename)
+    for i, file in enumerate(files):
+        if not file.filename or not _allowed_file(file.filename):
+            results[i]["error"] = "Invalid file type. Use PNG, JPG, JPEG, or WebP."
+            continue
+        saved.append((i, _save_upload(file)))
+
+    # OCR is the slow part (one model round-trip per image); run it in parallel and
+    # let the shared token bucket in ocr_service keep us under the rate limit.
+    workers = min(current_app.config["OCR_BATCH_CONCURRENCY"], len(saved)) or 1
+    store = get_storage()  # the pool threads have no app context to look it up
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        ocr_results = list(pool.map(lambda filename: run_ocr_safe(filename, store), [filename for _, filename in saved]))
+
+    created = []
+    for (i, filename), ocr_data in zip(saved, ocr_results):
+        receipt = _create_receipt(user_id, filename, ocr_data)
+        created.append((i, receipt))
+
+    try:
+        vector_ids = upsert_batch_to_pinecone([
+            (r.id, receipt_embedding_text(r), receipt_vector_metadata(r)) for _, r in created
+        ])
+        for (_, receipt), vector_id in zip(created, vector_ids):
+            if vector_id:
+                receipt.pinecone_id = vector_id
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+
+    for i, receipt in created:
+        results[i]["status"] = "ok"
+        results[i]["receipt"] = receipt.to_dict(include_ocr=True)
+        if receipt.ocr_raw and receipt.ocr_raw.get("error"):
+            results[i]["error"] = receipt.ocr_raw["error"]
+
+    return jsonify({"results": results, "created": len(created)}), 201 if created else 400
+
+
+def _encode_cursor(created_at, receipt_id):
+    raw = f"{created_at.isoformat()}|{receipt_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    created_at, receipt_id = raw.split("|")
+    return datetime.fromisoformat(created_at), int(receipt_id)
+
+
+def _summary_row_to_dict(row, include_ocr):
+    """Same keys as Receipt.to_dict(), built from a projected row without an ORM object."""
+    data = {
+        "id": row.id,
+        "uploaded_by": row.uploaded_by,
+        "uploaded_by_name": row.uploaded_by_name,
+        "image_path": row.image_path,
+        "merchant_name": row.merchant_name,
+        "transaction_date": row.transaction_date.isoformat() if row.transaction_date else None,
+        "total_amount": float(row.total_amount) if row.total_amount else None,
+        "pinecone_id": row.pinecone_id,
+        "created_at": row.created_at.isoformat(),
+        "updated_at": row.updated_at.isoformat() if row.updated_at else None,
+    }
+    if include_ocr:
+        data["ocr_raw"] = row.ocr_raw
+    return data
 
 
 @receipts_bp.route("/", methods=["GET"])
 @jwt_required()
+@read_replica
 def list_receipts():
+    """Newest first, keyset-paginated on (created_at, id).
+
+    Query params: limit (default 100, max 500), cursor (from the X-Next-Cursor
+    header of the previous page), merchant (prefix), from/to (transaction date),
+    min_amount/max_amount, uploaded_by (admins only), include=ocr, fields=.
+    With since= (the X-Sync-Token of an earlier response) only receipts changed
+    since then are returned, unpaginated; see app/sync.py.
+    """
     user_id = int(get_jwt_identity())
     user = User.query.get(user_id)
+    try:
+        since = sync.parse_since()
+    except ValueError:
+        return jsonify({"error": "since must be a sync token or an ISO timestamp"}), 400
+    token = sync.current_token()
+    fields = _requested_fields()
+    include_ocr = _wants_ocr(fields)
+    limit = min(max(request.args.get("limit", 100, type=int), 1), 500)
+
+    columns = [
+        Receipt.id,
+        Receipt.uploaded_by,
+        User.name.label("uploaded_by_name"),
+        Receipt.image_path,
+        Receipt.merchant_name,
+        Receipt.transaction_date,
+        Receipt.total_amount,
+        Receipt.pinecone_id,
+        Receipt.created_at,
+        Receipt.updated_at,
+    ]
+    if include_ocr:
+        columns.append(Receipt.ocr_raw)
+    query = db.session.query(*columns).outerjoin(User, Receipt.uploaded_by == User.id)
+
+    if user.role != "admin":
+        query = query.filter(Receipt.uploaded_by == user_id)
+    elif request.args.get("uploaded_by", type=int):
+        query = query.filter(Receipt.uploaded_by == request.args.get("uploaded_by", type=int))
+
+    filters = {"amount": []}
+    try:
+        for key in ("from", "to"):
+            if request.args.get(key):
+                filters[key] = datetime.strptime(request.args[key], "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Dates must be YYYY-MM-DD"}), 400
+    try:
+        for key, op in (("min_amount", ">="), ("max_amount", "<=")):
+            if request.args.get(key, "").strip():
+                amount = float(request.args[key])
+                if not math.isfinite(amount):
+                    raise ValueError(key)
+                filters["amount"].append((op, amount))
+    except ValueError:
+        return jsonify({"error": "min_amount and max_amount must be numbers"}), 400
+    if request.args.get("merchant", "").strip():
+        filters["merchant"] = request.args["merchant"].strip()
+    query = apply_filters(query, filters)
+
+    if since is not None:
+        rows = query.filter(sync.changed_since(Receipt, since)).order_by(Receipt.created_at.desc(), Receipt.id.desc()).all()
+        scope = () if user.role == "admin" else (Receipt.uploaded_by == user_id,)
+        items = [_project(_summary_row_to_dict(row, include_ocr), fields) for row in rows]
+        return sync.delta_response(Receipt, items, since, token, scope)
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            cursor_created, cursor_id = _decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            return jsonify({"error": "Invalid cursor"}), 400
+        query = query.filter(tuple_(Receipt.created_at, Receipt.id) < (cursor_created, cursor_id))
+
+    rows = query.order_by(Receipt.created_at.desc(), Receipt.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [_project(_summary_row_to_dict(row, include_ocr), fields) for row in rows]
+
+    response = sync.with_token(jsonify(items), token)
+    if has_more:
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].created_at, rows[-1].id)
+    return response
 
-    if user.role == "admin":
-        receipts = Receipt.query.order_by(Receipt.created_at.desc()).all()
-    else:
-        receipts = Receipt.query.filter_by(uploaded_by=user_id).order_by(Receipt.created_at.desc()).all()
 
-    return jsonify([r.to_dict() for r in receipts])
+@receipts_bp.route("/<int:receipt_id>", methods=["GET"])
+@jwt_required()
+def get_receipt(receipt_id):
+    user_id = int(get_jwt_identity())
+    user = User.query.get(user_id)
+    receipt = Receipt.query.options(undefer(Receipt.ocr_raw)).get_or_404(receipt_id)
+    if user.role != "admin" and receipt.uploaded_by != user_id:
+        return jsonify({"error": "Not found"}), 404
+    return jsonify(_serialize(receipt, True, _requested_fields()))
 
 
 @receipts_bp.route("/<int:receipt_id>", methods=["PATCH"])
@@ -130,10 +334,11 @@ def update_receipt(receipt_id):
             pass
     if "total_amount" in data:
         receipt.total_amount = data["total_amount"]
+    receipt.search_text = receipt_search_text(receipt)
 
     db.session.commit()
     log_activity(int(get_jwt_identity()), "receipt.update", "receipt", receipt_id, f"Updated receipt #{receipt_id}")
-    return jsonify(receipt.to_dict())
+    return jsonify(receipt.to_dict(include_ocr=True))
 
 
 @receipts_bp.route("/search", methods=["GET"])
@@ -143,25 +348,41 @@ def search():
     if not q:
         return jsonify([])
 
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 20, type=int), 1), 100)
+
+    fields = _requested_fields()
+    include_ocr = _wants_ocr(fields)
+
     try:
-        results = search_receipts(q)
-        receipt_ids = [r["metadata"].get("receipt_id") for r in results if r["metadata"].get("receipt_id")]
-        receipts = Receipt.query.filter(Receipt.id.in_(receipt_ids)).all()
-        receipt_map = {r.id: r.to_dict() for r in receipts}
-
-        enriched = []
-        for r in results:
-            rid = r["metadata"].get("receipt_id")
-            if rid in receipt_map:
-                entry = receipt_map[rid]
-                entry["search_score"] = r["score"]
-                enriched.append(entry)
-
-        return jsonify(enriched)
+        receipts, scores, total = hybrid_search(q, page=page, per_page=per_page, include_ocr=include_ocr)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    enriched = []
+    for r in receipts:
+        entry = _serialize(r, include_ocr, fields)
+        entry["search_score"] = scores.get(r.id)
+        enriched.append(entry)
+
+    response = jsonify(enriched)
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["X-Page"] = str(page)
+    response.headers["X-Per-Page"] = str(per_page)
+    return response
+
 
 @receipts_bp.route("/image/<filename>", methods=["GET"])
 def serve_image(filename):
-    return send_from_directory(current_app.config["UPLOAD_FOLDER"], filename)
+    """Receipt and recipe images. Keys are never reused, so browsers may cache them for a day."""
+    store = get_storage()
+    try:
+        if store.name == "local":
+            return send_file(store.path(filename), mimetype=mimetype(filename), conditional=True, max_age=86400)
+        body = store.open(filename)
+    except FileNotFoundError:
+        abort(404)
+    response = Response(iter_file(body), mimetype=mimetype(filename), direct_passthrough=True)
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    return response
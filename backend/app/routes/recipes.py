@@ -1,23 +1,61 @@
-import os
-import uuid
-from flask import Blueprint, request, jsonify, current_app
+import logging
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
+from app import db, sync
 from app.models import User, Recipe
 from app.activity_log import log_activity
+from app.services.storage import get_storage, new_key
+from app.services.recipe_search import index_recipe, search_recipes
 
 recipes_bp = Blueprint("recipes", __name__)
+log = logging.getLogger(__name__)
 
 
 @recipes_bp.route("/", methods=["GET"])
 @jwt_required()
 def list_recipes():
+    try:
+        since = sync.parse_since()
+    except ValueError:
+        return jsonify({"error": "since must be a sync token or an ISO timestamp"}), 400
+    token = sync.current_token()
     category = request.args.get("category")
-    query = Recipe.query
-    if category:
-        query = query.filter_by(category=category)
-    recipes = query.order_by(Recipe.created_at.desc()).all()
-    return jsonify([r.to_dict() for r in recipes])
+    criteria = [Recipe.category == category] if category else []
+    if since is None:
+        etag = sync.collection_etag(Recipe, criteria, related=(User,))
+        if (cached := sync.not_modified(etag, token)) is not None:
+            return cached
+    query = Recipe.query.filter(*criteria)
+    if since is not None:
+        query = query.filter(sync.changed_since(Recipe, since))
+    recipes = [r.to_dict() for r in query.order_by(Recipe.created_at.desc()).all()]
+    if since is not None:
+        return sync.delta_response(Recipe, recipes, since, token)
+    return sync.with_etag(sync.with_token(jsonify(recipes), token), etag)
+
+
+@recipes_bp.route("/search", methods=["GET"])
+@jwt_required()
+def search():
+    """Ranked full-text search (`q`) with repeatable `ingredient=` filters (all must match)."""
+    q = request.args.get("q", "").strip()
+    ingredients = [
+        part.strip()
+        for value in request.args.getlist("ingredient")
+        for part in value.split(",")
+        if part.strip()
+    ]
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 20, type=int), 1), 100)
+
+    results, total = search_recipes(
+        q, ingredients, category=request.args.get("category"), page=page, per_page=per_page
+    )
+    response = jsonify(results)
+    response.headers["X-Total-Count"] = str(total)
+    response.headers["X-Page"] = str(page)
+    response.headers["X-Per-Page"] = str(per_page)
+    return response
 
 
 @recipes_bp.route("/", methods=["POST"])
@@ -28,9 +66,13 @@ def create_recipe():
     if not admin or admin.role != "admin":
         return jsonify({"error": "Admin access required"}), 403
 
-    data = request.form.to_dict() if request.content_type and "multipart" in request.content_type else request.get_json()
+    multipart = request.content_type and "multipart" in request.content_type
+    data = request.form.to_dict() if multipart else request.get_json()
 
     ingredients = data.get("ingredients")
+    if multipart and len(request.form.getlist("ingredients")) > 1:
+        # The form appends one `ingredients` field per line.
+        ingredients = request.form.getlist("ingredients")
     if isinstance(ingredients, str):
         import json
         try:
@@ -38,14 +80,6 @@ def create_recipe():
         except (json.JSONDecodeError, TypeError):
             ingredients = [i.strip() for i in ingredients.split(",")]
 
-    image_path = None
-    if request.files.get("image"):
-        file = request.files["image"]
-        ext = file.filename.rsplit(".", 1)[1].lower() if "." in file.filename else "jpg"
-        filename = f"recipe-{uuid.uuid4().hex}.{ext}"
-        file.save(os.path.join(current_app.config["UPLOAD_FOLDER"], filename))
-        image_path = filename
-
     recipe = Recipe(
         title=data["title"],
         category=data.get("category"),
@@ -55,11 +89,23 @@ def create_recipe():
         prep_time=int(data["prep_time"]) if data.get("prep_time") else None,
         cook_time=int(data["cook_time"]) if data.get("cook_time") else None,
         servings=int(data["servings"]) if data.get("servings") else None,
-        image_path=image_path,
         created_by=user_id,
     )
+    index_recipe(recipe)
+    # Stored only once the fields parsed; a failed commit removes it again.
+    if request.files.get("image"):
+        file = request.files["image"]
+        ext = file.filename.rsplit(".", 1)[1] if "." in file.filename else "jpg"
+        recipe.image_path = new_key(ext, prefix="recipe-")
+        get_storage().save_upload(recipe.image_path, file.stream)
     db.session.add(recipe)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        if recipe.image_path:
+            get_storage().delete(recipe.image_path)
+        raise
     log_activity(user_id, "recipe.create", "recipe", recipe.id, f"Created recipe: {recipe.title}")
     return jsonify(recipe.to_dict()), 201
 
@@ -79,6 +125,8 @@ def update_recipe(recipe_id):
             setattr(recipe, field, data[field])
     if "ingredients" in data:
         recipe.ingredients = data["ingredients"]
+    if data.keys() & {"description", "ingredients", "instructions"}:
+        index_recipe(recipe)
 
     db.session.commit()
     log_activity(admin.id, "recipe.update", "recipe", recipe_id, f"Updated recipe: {recipe.title}")
@@ -95,7 +143,14 @@ def delete_recipe(recipe_id):
     recipe = Recipe.query.get_or_404(recipe_id)
     title = recipe.title
     recipe_id_val = recipe.id
+    image_path = recipe.image_path
     db.session.delete(recipe)
     db.session.commit()
+    if image_path:
+        try:
+            get_storage().delete(image_path)
+        except Exception:
+            # The row is gone either way; `flask gc-uploads` retries the file.
+            log.exception("Could not delete image %s of recipe %s", image_path, recipe_id_val)
     log_activity(admin.id, "recipe.delete", "recipe", recipe_id_val, f"Deleted recipe: {title}")
     return jsonify({"message": "Recipe deleted"})
@@ -1,13 +1,23 @@
 from datetime import date, datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
+from sqlalchemy.orm import joinedload
+from app import db, sync
 from app.models import User, LedgerEntry, Reimbursement
 from app.activity_log import log_activity
 
 reimbursements_bp = Blueprint("reimbursements", __name__)
 
 
+def _with_relations(query):
+    """Load what to_dict() reads in the same query instead of three lazy loads per row."""
+    return query.options(
+        joinedload(Reimbursement.requester),
+        joinedload(Reimbursement.approver),
+        joinedload(Reimbursement.ledger_entry),
+    )
+
+
 @reimbursements_bp.route("/", methods=["POST"])
 @jwt_required()
 def create_reimbursement():
@@ -44,8 +54,22 @@ def create_reimbursement():
 @jwt_required()
 def my_reimbursements():
     user_id = int(get_jwt_identity())
-    items = Reimbursement.query.filter_by(requested_by=user_id).order_by(Reimbursement.created_at.desc()).all()
-    return jsonify([r.to_dict() for r in items])
+    try:
+        since = sync.parse_since()
+    except ValueError:
+        return jsonify({"error": "since must be a sync token or an ISO timestamp"}), 400
+    token = sync.current_token()
+    if since is None:
+        etag = sync.collection_etag(Reimbursement, (Reimbursement.requested_by == user_id,), related=(User,))
+        if (cached := sync.not_modified(etag, token)) is not None:
+            return cached
+    query = _with_relations(Reimbursement.query.filter_by(requested_by=user_id))
+    if since is not None:
+        query = query.filter(sync.changed_since(Reimbursement, since))
+    items = [r.to_dict() for r in query.order_by(Reimbursement.created_at.desc()).all()]
+    if since is not None:
+        return sync.delta_response(Reimbursement, items, since, token, (Reimbursement.requested_by == user_id,))
+    return sync.with_etag(sync.with_token(jsonify(items), token), etag)
 
 
 @reimbursements_bp.route("/pending", methods=["GET"])
@@ -55,8 +79,23 @@ def pending_reimbursements():
     if not admin or admin.role != "admin":
         return jsonify({"error": "Admin access required"}), 403
 
-    items = Reimbursement.query.filter_by(status="pending").order_by(Reimbursement.created_at.asc()).all()
-    return jsonify([r.to_dict() for r in items])
+    try:
+        since = sync.parse_since()
+    except ValueError:
+        return jsonify({"error": "since must be a sync token or an ISO timestamp"}), 400
+    token = sync.current_token()
+    if since is None:
+        etag = sync.collection_etag(Reimbursement, (Reimbursement.status == "pending",), related=(User,))
+        if (cached := sync.not_modified(etag, token)) is not None:
+            return cached
+    query = _with_relations(Reimbursement.query.filter_by(status="pending"))
+    if since is not None:
+        query = query.filter(sync.changed_since(Reimbursement, since))
+    items = [r.to_dict() for r in query.order_by(Reimbursement.created_at.asc()).all()]
+    if since is not None:
+        # Approved/rejected requests come back in "deleted": they left the queue.
+        return sync.delta_response(Reimbursement, items, since, token)
+    return sync.with_etag(sync.with_token(jsonify(items), token), etag)
 
 
 @reimbursements_bp.route("/<int:reimb_id>/approve", methods=["POST"])
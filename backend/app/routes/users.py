@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
+from app import db, sync
 from app.models import User
 from app.activity_log import log_activity
 
@@ -20,8 +20,11 @@ def _require_admin():
 def list_users():
     if not _require_admin():
         return jsonify({"error": "Admin access required"}), 403
+    etag = sync.collection_etag(User)
+    if (cached := sync.not_modified(etag)) is not None:
+        return cached
     users = User.query.order_by(User.created_at.desc()).all()
-    return jsonify([u.to_dict() for u in users])
+    return sync.with_etag(jsonify([u.to_dict() for u in users]), etag)
 
 
 @users_bp.route("/", methods=["POST"])
@@ -0,0 +1,123 @@
+"""Two-level cache for text embeddings: in-process LRU backed by a SQLite file.
+
+Entries are keyed by (model, normalized text). Vectors are stored on disk as
+packed float32 blobs so a 1536-dim embedding takes ~6 KB instead of ~30 KB of JSON.
+"""
+import os
+import sqlite3
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+
+_DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "embedding_cache.db"
+)
+
+# _lock guards the in-memory LRU only; _disk_lock serializes use of the SQLite
+# connection, which can wait up to 5 s on another worker's write. A cache hit never
+# takes _disk_lock.
+_lock = threading.Lock()
+_disk_lock = threading.Lock()
+_lru = OrderedDict()
+_conn = None
+_conn_pid = None
+
+
+def _max_entries():
+    return int(os.getenv("EMBEDDING_CACHE_SIZE", "1024"))
+
+
+def _db_path():
+    # Set EMBEDDING_CACHE_PATH to an empty string to keep the cache in memory only.
+    return os.getenv("EMBEDDING_CACHE_PATH", _DEFAULT_PATH)
+
+
+def normalize(text):
+    """Lowercase and collapse whitespace so "Costco " and "costco" share an entry."""
+    return " ".join((text or "").lower().split())
+
+
+def _key(model, text):
+    return hashlib.sha256(f"{model}\x00{normalize(text)}".encode("utf-8")).hexdigest()
+
+
+def _get_conn():
+    """Open the persistent store once per process (gunicorn forks after import)."""
+    global _conn, _conn_pid
+    path = _db_path()
+    if not path:
+        return None
+    if _conn is None or _conn_pid != os.getpid():
+        _conn = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, model TEXT NOT NULL, dim INTEGER NOT NULL, vector BLOB NOT NULL)"
+        )
+        _conn_pid = os.getpid()
+    return _conn
+
+
+def _remember(key, vector):
+    _lru[key] = vector
+    _lru.move_to_end(key)
+    while len(_lru) > _max_entries():
+        _lru.popitem(last=False)
+
+
+def get(model, text):
+    """Return the cached embedding as a list of floats, or None on a miss."""
+    key = _key(model, text)
+    with _lock:
+        if key in _lru:
+            _lru.move_to_end(key)
+            return _lru[key]
+    with _disk_lock:
+        try:
+            conn = _get_conn()
+            row = conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone() if conn else None
+        except sqlite3.Error:
+            row = None
+    if row is None:
+        return None
+    vector = array("f", row[0]).tolist()
+    with _lock:
+        _remember(key, vector)
+    return vector
+
+
+def put(model, text, vector):
+    """Store an embedding in both cache levels. Disk errors are ignored."""
+    key = _key(model, text)
+    vector = list(vector)
+    with _lock:
+        _remember(key, vector)
+    with _disk_lock:
+        try:
+            conn = _get_conn()
+            if conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO embeddings (key, model, dim, vector) VALUES (?, ?, ?, ?)",
+                    (key, model, len(vector), array("f", vector).tobytes()),
+                )
+                conn.commit()
+        except sqlite3.Error:
+            pass
+
+
+def clear(model=None):
+    """Drop cached embeddings (all, or only those for one model)."""
+    with _lock:
+        _lru.clear()
+    with _disk_lock:
+        try:
+            conn = _get_conn()
+            if conn:
+                if model:
+                    conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+                else:
+                    conn.execute("DELETE FROM embeddings")
+                conn.commit()
+        except sqlite3.Error:
+            pass
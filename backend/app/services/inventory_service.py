@@ -1,5 +1,6 @@
 """Update inventory from receipt OCR items."""
 from datetime import datetime
+from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models import InventoryItem
 
@@ -11,6 +12,7 @@ def add_receipt_items_to_inventory(receipt, user_id):
     if not items:
         return
     now = datetime.utcnow()
+    updates = []
     for it in items:
         name = (it.get("name") or "").strip()
         if not name:
@@ -22,20 +24,36 @@ def add_receipt_items_to_inventory(receipt, user_id):
             qty = float(qty)
         except (TypeError, ValueError):
             qty = 1
-        existing = InventoryItem.query.filter_by(name=name).first()
-        if existing:
-            existing.quantity = (float(existing.quantity) or 0) + qty
-            existing.last_edited_by = user_id
-            existing.last_edited_at = now
-        else:
-            new_item = InventoryItem(
-                name=name,
-                quantity=qty,
-                last_edited_by=user_id,
-                last_edited_at=now,
-            )
-            db.session.add(new_item)
+        updates.append((name, qty))
     try:
+        for name, qty in updates:
+            _add_quantity(name, qty, user_id, now)
         db.session.commit()
     except Exception:
         db.session.rollback()
+
+
+def _add_quantity(name, qty, user_id, now):
+    """Increment an item's quantity, creating it if needed. Concurrent uploads of receipts
+    with the same item can both miss the lookup; the loser of the insert race falls back
+    to the update, and the increment is done in SQL so neither count is lost."""
+    with db.session.no_autoflush:
+        existing = InventoryItem.query.filter_by(name=name).first()
+    if existing is None:
+        try:
+            with db.session.begin_nested():
+                db.session.add(InventoryItem(
+                    name=name,
+                    quantity=qty,
+                    last_edited_by=user_id,
+                    last_edited_at=now,
+                ))
+            return
+        except IntegrityError:
+            existing = InventoryItem.query.filter_by(name=name).first()
+            if existing is None:
+                raise
+    existing.quantity = InventoryItem.quantity + qty
+    existing.last_edited_by = user_id
+    existing.last_edited_at = now
+    db.session.flush()
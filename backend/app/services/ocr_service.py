@@ -1,32 +1,123 @@
 import os
 import json
 import base64
-import uuid
 
-_openai_client = None
-_pinecone_available = True
+from app.services import embedding_cache
+from app.services.vector_store import get_vector_store
+from app.services.storage import get_storage, mimetype
+from app.services.throttle import TokenBucket
+from app.services.resilience import call_with_retry, get_breaker
+from app.metrics import upstream_timer
+
+EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+
+# Per-attempt timeouts and total deadlines (seconds). Both stay well under the
+# gunicorn worker timeout so a slow OpenAI cannot pin every worker.
+OCR_TIMEOUT = float(os.getenv("OPENAI_OCR_TIMEOUT", "40"))
+OCR_DEADLINE = float(os.getenv("OPENAI_OCR_DEADLINE", "90"))
+EMBEDDING_TIMEOUT = float(os.getenv("OPENAI_EMBEDDING_TIMEOUT", "8"))
+EMBEDDING_DEADLINE = float(os.getenv("OPENAI_EMBEDDING_DEADLINE", "15"))
+OPENAI_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+_openai_breaker = get_breaker(
+    "openai",
+    failure_threshold=int(os.getenv("OPENAI_BREAKER_THRESHOLD", "5")),
+    reset_timeout=float(os.getenv("OPENAI_BREAKER_RESET", "30")),
+)
+
+# Shared by every OCR call in this worker so batch uploads cannot burst past the
+# account's rate limit (requests/second, burst size).
+_ocr_bucket = TokenBucket(
+    rate=float(os.getenv("OPENAI_OCR_RATE", "2")),
+    capacity=float(os.getenv("OPENAI_OCR_BURST", "5")),
+)
 
-try:
-    from pinecone import Pinecone
-except ImportError:
-    _pinecone_available = False
+_openai_client = None
 
 
 def _get_openai():
     global _openai_client
     if _openai_client is None:
         from openai import OpenAI
-        _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Retries are handled by _call_openai so they count toward the circuit breaker.
+        # OPENAI_BASE_URL points at a proxy or at the offline stub (stubs/openai_stub.py).
+        _openai_client = OpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=os.getenv("OPENAI_BASE_URL") or None,
+            max_retries=0,
+        )
     return _openai_client
 
 
-def encode_image(image_path):
-    with open(image_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
-
+def _call_openai(request, timeout, deadline, operation):
+    """Run request(client) with retries, a per-attempt timeout and an overall deadline.
+    Raises resilience.UpstreamUnavailable when OpenAI is failing or the circuit is open."""
+    client = _get_openai()
 
-def run_ocr(image_path):
-    """Send image to GPT-4o for structured receipt extraction."""
+    def attempt(remaining):
+        per_try = min(timeout, remaining) if remaining is not None else timeout
+        with upstream_timer("openai", operation):
+            return request(client.with_options(timeout=max(per_try, 1.0)))
+
+    return call_with_retry(attempt, _openai_breaker, retries=OPENAI_RETRIES, deadline=deadline)
+
+
+OCR_PROMPT = (
+    "Extract the following from this receipt image and return ONLY valid JSON:\n"
+    "{\n"
+    '  "merchant_name": "string",\n'
+    '  "transaction_date": "YYYY-MM-DD",\n'
+    '  "total_amount": number,\n'
+    '  "subtotal": number or null,\n'
+    '  "tax": number or null,\n'
+    '  "items": [{"name": "string", "quantity": number, "price": number}],\n'
+    '  "payment_method": "string or null",\n'
+    '  "category_suggestion": "string"\n'
+    "}\n"
+    "If a field is unreadable, set it to null."
+)
+_IMAGE_PLACEHOLDER = "@@IMAGE@@"
+_B64_BLOCK = 3 * 64 * 1024  # a multiple of 3, so blocks encode without padding
+
+
+def ocr_request_body(image_key, store):
+    """The chat.completions JSON body for OCR of a stored image, as (length, chunks()).
+
+    The image is base64-encoded block by block straight into the request stream, so
+    neither the image, its base64 text nor the JSON document is ever held whole in
+    memory. chunks() can be called again for a retry.
+    """
+    payload = {
+        "model": "gpt-4o",
+        "messages": [{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": OCR_PROMPT},
+                {"type": "image_url", "image_url": {"url": f"data:{mimetype(image_key, 'image/jpeg')};base64,{_IMAGE_PLACEHOLDER}"}},
+            ],
+        }],
+        "max_tokens": 1000,
+    }
+    head, tail = (part.encode("utf-8") for part in json.dumps(payload).split(_IMAGE_PLACEHOLDER))
+    size = store.size(image_key)
+
+    def chunks():
+        yield head
+        carry = b""
+        with store.open(image_key) as f:
+            while block := f.read(_B64_BLOCK):
+                block = carry + block
+                cut = len(block) - len(block) % 3
+                carry = block[cut:]
+                yield base64.b64encode(block[:cut])
+        yield base64.b64encode(carry) + tail
+
+    return len(head) + 4 * ((size + 2) // 3) + len(tail), chunks
+
+
+def run_ocr(image_key, store=None):
+    """Send a stored image (see services/storage.py) to GPT-4o for structured receipt extraction.
+    Pass `store` when calling outside the app context (worker threads)."""
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         return {
@@ -37,43 +128,15 @@ def run_ocr(image_path):
             "error": "OPENAI_API_KEY not configured",
         }
 
-    client = _get_openai()
-    b64 = encode_image(image_path)
-    ext = os.path.splitext(image_path)[1].lower().lstrip(".")
-    mime = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}.get(ext, "image/jpeg")
-
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[
-            {
-                "role": "user",
-                "content": [
-                    {
-                        "type": "text",
-                        "text": (
-                            "Extract the following from this receipt image and return ONLY valid JSON:\n"
-                            "{\n"
-                            '  "merchant_name": "string",\n'
-                            '  "transaction_date": "YYYY-MM-DD",\n'
-                            '  "total_amount": number,\n'
-                            '  "subtotal": number or null,\n'
-                            '  "tax": number or null,\n'
-                            '  "items": [{"name": "string", "quantity": number, "price": number}],\n'
-                            '  "payment_method": "string or null",\n'
-                            '  "category_suggestion": "string"\n'
-                            "}\n"
-                            "If a field is unreadable, set it to null."
-                        ),
-                    },
-                    {
-                        "type": "image_url",
-                        "image_url": {"url": f"data:{mime};base64,{b64}"},
-                    },
-                ],
-            }
-        ],
-        max_tokens=1000,
-    )
+    from openai.types.chat import ChatCompletion
+
+    _ocr_bucket.acquire()
+    length, chunks = ocr_request_body(image_key, store or get_storage())
+    # Content-Length is known up front, so the body streams without chunked encoding.
+    headers = {"Content-Type": "application/json", "Content-Length": str(length)}
+    response = _call_openai(lambda client: client.post(
+        "/chat/completions", cast_to=ChatCompletion, content=chunks(), options={"headers": headers},
+    ), OCR_TIMEOUT, OCR_DEADLINE, "chat.completions")
 
     raw_text = response.choices[0].message.content.strip()
     if raw_text.startswith("```"):
@@ -83,47 +146,78 @@ def run_ocr(image_path):
 
 
 def create_embedding(text):
-    """Create a vector embedding for semantic search."""
-    client = _get_openai()
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=text,
-    )
-    return response.data[0].embedding
-
+    """Create a vector embedding for semantic search (cached by model + normalized text)."""
+    cached = embedding_cache.get(EMBEDDING_MODEL, text)
+    if cached is not None:
+        return cached
 
-def upsert_to_pinecone(receipt_id, text_for_embedding, metadata):
-    """Store receipt embedding in Pinecone for semantic search."""
-    api_key = os.getenv("PINECONE_API_KEY")
-    index_name = os.getenv("PINECONE_INDEX_NAME", "receipts")
-
-    if not api_key or not _pinecone_available:
+    response = _call_openai(lambda client: client.embeddings.create(
+        model=EMBEDDING_MODEL,
+        input=text,
+    ), EMBEDDING_TIMEOUT, EMBEDDING_DEADLINE, "embeddings")
+    vector = response.data[0].embedding
+    embedding_cache.put(EMBEDDING_MODEL, text, vector)
+    return vector
+
+
+def create_embeddings(texts):
+    """Embed many texts with a single API call for the uncached ones. Order is preserved."""
+    results = [embedding_cache.get(EMBEDDING_MODEL, t) for t in texts]
+    missing = [i for i, v in enumerate(results) if v is None]
+    if missing:
+        response = _call_openai(lambda client: client.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=[texts[i] for i in missing],
+        ), EMBEDDING_TIMEOUT, EMBEDDING_DEADLINE, "embeddings")
+        for i, item in zip(missing, sorted(response.data, key=lambda d: d.index)):
+            results[i] = item.embedding
+            embedding_cache.put(EMBEDDING_MODEL, texts[i], item.embedding)
+    return results
+
+
+def receipt_vector_id(receipt_id):
+    """Vector ids are derived from the receipt id, so re-indexing a receipt overwrites its vector."""
+    return f"receipt-{receipt_id}"
+
+
+def upsert_to_pinecone(receipt_id, text_for_embedding, metadata, replaces=None):
+    """Store receipt embedding in the configured vector store (Pinecone or local index).
+    `replaces` is the receipt's previous vector id; it is deleted if it differs (ids from
+    older releases carried a random suffix)."""
+    store = get_vector_store()
+    if store is None:
         return None
 
-    pc = Pinecone(api_key=api_key)
-    index = pc.Index(index_name)
-
     vector = create_embedding(text_for_embedding)
-    pinecone_id = f"receipt-{receipt_id}-{uuid.uuid4().hex[:8]}"
+    pinecone_id = receipt_vector_id(receipt_id)
 
-    index.upsert(vectors=[{"id": pinecone_id, "values": vector, "metadata": metadata}])
+    store.upsert([{"id": pinecone_id, "values": vector, "metadata": metadata}])
+    if replaces and replaces != pinecone_id:
+        store.delete([replaces])
     return pinecone_id
 
 
-def search_receipts(query, top_k=10):
-    """Semantic search for receipts via Pinecone."""
-    api_key = os.getenv("PINECONE_API_KEY")
-    index_name = os.getenv("PINECONE_INDEX_NAME", "receipts")
+def upsert_batch_to_pinecone(items):
+    """Batch form of upsert_to_pinecone: items are (receipt_id, text, metadata).
+    One embeddings request and one upsert for the whole batch. Returns the vector ids."""
+    store = get_vector_store()
+    if store is None or not items:
+        return [None] * len(items)
+
+    vectors = create_embeddings([text for _, text, _ in items])
+    ids = [receipt_vector_id(receipt_id) for receipt_id, _, _ in items]
+    store.upsert([
+        {"id": vid, "values": vec, "metadata": meta}
+        for vid, vec, (_, _, meta) in zip(ids, vectors, items)
+    ])
+    return ids
 
-    if not api_key or not _pinecone_available:
-        return []
 
-    pc = Pinecone(api_key=api_key)
-    index = pc.Index(index_name)
+def search_receipts(query, top_k=10):
+    """Semantic search for receipts via the configured vector store."""
+    store = get_vector_store()
+    if store is None:
+        return []
 
     vector = create_embedding(query)
-    results = index.query(vector=vector, top_k=top_k, include_metadata=True)
-    return [
-        {"id": m.id, "score": m.score, "metadata": m.metadata}
-        for m in results.matches
-    ]
+    return store.query(vector, top_k=top_k)
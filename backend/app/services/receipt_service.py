@@ -0,0 +1,71 @@
+"""Receipt OCR helpers shared by the upload routes and the retry-ocr command."""
+from datetime import datetime
+from app import db
+from app.models import Receipt
+from app.services.ocr_service import run_ocr, upsert_to_pinecone
+from app.services.resilience import UpstreamUnavailable
+from app.services.search_service import receipt_search_text, receipt_embedding_text, receipt_vector_metadata
+from app.services.inventory_service import add_receipt_items_to_inventory
+
+
+def run_ocr_safe(image_key, store=None):
+    """run_ocr that never raises. When OpenAI is down (retries exhausted or circuit
+    open) the result is marked retry_pending so `flask retry-ocr` picks it up later."""
+    try:
+        return run_ocr(image_key, store)
+    except UpstreamUnavailable as e:
+        return {"error": str(e), "retry_pending": True}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def apply_ocr_data(receipt, ocr_data):
+    """Copy OCR output onto a receipt and refresh its full-text search source."""
+    tx_date = None
+    if ocr_data.get("transaction_date"):
+        try:
+            tx_date = datetime.strptime(ocr_data["transaction_date"], "%Y-%m-%d").date()
+        except (ValueError, TypeError):
+            pass
+
+    receipt.ocr_raw = ocr_data
+    receipt.merchant_name = ocr_data.get("merchant_name")
+    receipt.transaction_date = tx_date
+    receipt.total_amount = ocr_data.get("total_amount")
+    receipt.search_text = receipt_search_text(receipt)
+
+
+def retry_pending_ocr(limit=None, log=print):
+    """Re-run OCR for receipts whose OCR was deferred because OpenAI was unavailable.
+    Stops early if OpenAI is still failing. Returns (retried, still_pending)."""
+    candidates = (
+        Receipt.query.filter(Receipt.merchant_name.is_(None), Receipt.total_amount.is_(None))
+        .order_by(Receipt.id)
+        .all()
+    )
+    pending = [r for r in candidates if (r.ocr_raw or {}).get("retry_pending")]
+    if limit:
+        pending = pending[:limit]
+
+    retried = 0
+    for receipt in pending:
+        ocr_data = run_ocr_safe(receipt.image_path)
+        if ocr_data.get("retry_pending"):
+            log(f"OpenAI still unavailable at receipt #{receipt.id}: {ocr_data['error']}")
+            break
+        apply_ocr_data(receipt, ocr_data)
+        db.session.commit()
+        add_receipt_items_to_inventory(receipt, receipt.uploaded_by)
+        try:
+            vector_id = upsert_to_pinecone(
+                receipt.id, receipt_embedding_text(receipt), receipt_vector_metadata(receipt),
+                replaces=receipt.pinecone_id,
+            )
+            if vector_id:
+                receipt.pinecone_id = vector_id
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+        retried += 1
+        log(f"Re-ran OCR for receipt #{receipt.id}")
+    return retried, len(pending) - retried
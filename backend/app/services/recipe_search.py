@@ -0,0 +1,183 @@
+"""Recipe search: ranked full-text match plus "has all of these ingredients" filters.
+
+Text is matched against title (weighted highest), description, ingredient lines and
+instructions through recipes_fts (FTS5, SQLite) or a weighted tsvector GIN index
+(Postgres). Ingredient filters go through recipe_ingredients, which holds one
+normalized name per ingredient line, so `ingredient=milk` is an indexed lookup rather
+than a scan of the JSON column. Both are kept current by index_recipe(), called
+wherever a recipe's text or ingredients change.
+"""
+import re
+from sqlalchemy import func, or_, text, Integer, Float
+from app import db
+from app.models import User, Recipe, RecipeIngredient
+from app.services.search_service import _sqlite_fts_available, _fts5_match
+
+TITLE_WEIGHT = 5.0  # bm25() column weight of title relative to the body text
+MAX_NAME_LENGTH = 120
+
+_WORD_RE = re.compile(r"[^\W_]+(?:[./][^\W_]+)?")
+_QUANTITY_RE = re.compile(r"^(\d+(?:[./]\d+)?|[½¼¾⅓⅔⅛]|a|an|one|two|three|four|half|few|some)$")
+_UNITS = {
+    "c", "cup", "tbsp", "tablespoon", "tsp", "teaspoon", "oz", "ounce", "fl", "floz", "ml",
+    "l", "liter", "litre", "g", "gram", "kg", "lb", "pound", "shot", "pump", "pinch", "dash",
+    "splash", "scoop", "slice", "can", "bottle", "drop", "handful", "piece", "sprig", "bag",
+    "packet", "stick", "x", "of",
+}
+_CONJUNCTIONS = {"and", "or", "n"}
+
+
+def _is_measure(word):
+    return bool(_QUANTITY_RE.match(word)) or word in _UNITS or word.rstrip("s") in _UNITS or (
+        word.endswith("es") and word[:-2] in _UNITS
+    )
+
+
+def normalize_ingredient(line):
+    """"2 shots Espresso (double)" -> "espresso"; "8 oz whole milk, steamed" -> "whole milk".
+
+    A leading quantity or unit is dropped only when a word other than a conjunction
+    follows it, so "half and half" stays "half and half".
+    """
+    value = re.sub(r"\([^)]*\)", " ", str(line or "").lower()).split(",")[0].replace("&", " and ")
+    words = _WORD_RE.findall(value)
+    while len(words) > 1 and _is_measure(words[0]) and words[1] not in _CONJUNCTIONS:
+        words.pop(0)
+    return " ".join(words)[:MAX_NAME_LENGTH] or None
+
+
+def ingredient_lines(ingredients):
+    """Recipe.ingredients as a list of strings (it is a JSON list, but older rows may hold text)."""
+    if not ingredients:
+        return []
+    if isinstance(ingredients, str):
+        ingredients = re.split(r"[\n,]", ingredients)
+    return [str(i).strip() for i in ingredients if str(i).strip()]
+
+
+def ingredient_names(ingredients):
+    """Distinct normalized names, in recipe order."""
+    names = []
+    for line in ingredient_lines(ingredients):
+        name = normalize_ingredient(line)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def recipe_search_text(recipe):
+    """Body text indexed next to the title: description, ingredient lines and instructions."""
+    parts = [recipe.description or ""] + ingredient_lines(recipe.ingredients) + [recipe.instructions or ""]
+    return " ".join(p for p in parts if p).strip() or None
+
+
+def index_recipe(recipe):
+    """Refresh search_text and the recipe_ingredients rows from the recipe's current fields."""
+    recipe.search_text = recipe_search_text(recipe)
+    current = {row.name: row for row in recipe.ingredient_names}
+    recipe.ingredient_names = [
+        current.get(name) or RecipeIngredient(name=name) for name in ingredient_names(recipe.ingredients)
+    ]
+
+
+def _ingredient_filter(name):
+    """Recipe ids with an ingredient equal to `name` or containing it as whole words
+    ("milk" matches "oat milk"; "oat milk" does not match "milk")."""
+    escaped = name.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
+    return db.session.query(RecipeIngredient.recipe_id).filter(or_(
+        RecipeIngredient.name == name,
+        RecipeIngredient.name.like(f"{escaped} %", escape="\\"),
+        RecipeIngredient.name.like(f"% {escaped}", escape="\\"),
+        RecipeIngredient.name.like(f"% {escaped} %", escape="\\"),
+    ))
+
+
+def _recipe_tsvector():
+    # Must match ix_recipes_search_tsv exactly for Postgres to use the index.
+    title = func.setweight(func.to_tsvector("english", func.coalesce(Recipe.title, "")), "A")
+    body = func.setweight(func.to_tsvector("english", func.coalesce(Recipe.search_text, "")), "B")
+    return title.op("||")(body)
+
+
+def _rank(query, terms):
+    """Restrict `query` to rows matching all terms; return (query, score column, ORDER BY)."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        tsv = _recipe_tsvector()
+        tsq = func.plainto_tsquery("english", " ".join(terms))
+        score = func.ts_rank(tsv, tsq)
+        return query.filter(tsv.op("@@")(tsq)), score, (score.desc(), Recipe.id.desc())
+
+    if dialect == "sqlite" and _sqlite_fts_available("recipes_fts"):
+        fts = (
+            text(
+                "SELECT rowid AS id, bm25(recipes_fts, :title_weight, 1.0) AS rank "
+                "FROM recipes_fts WHERE recipes_fts MATCH :match"
+            )
+            .bindparams(match=_fts5_match(terms), title_weight=TITLE_WEIGHT)
+            .columns(id=Integer, rank=Float)
+            .subquery()
+        )
+        # bm25() is lower-is-better and negative; flip it so higher is better.
+        return query.join(fts, fts.c.id == Recipe.id), -fts.c.rank, (fts.c.rank, Recipe.id.desc())
+
+    for t in terms:
+        query = query.filter(or_(Recipe.title.ilike(f"%{t}%"), Recipe.search_text.ilike(f"%{t}%")))
+    return query, None, (Recipe.created_at.desc(), Recipe.id.desc())
+
+
+def search_recipes(q="", ingredients=(), category=None, page=1, per_page=20):
+    """Ranked, paginated recipe search. Returns (compact dicts, total matches).
+
+    Rows are projected to the list fields only; description and instructions stay in
+    the database, and each result carries its normalized ingredient names (sorted
+    alphabetically, as recipe_ingredients stores them) instead of the raw lines.
+    """
+    query = db.session.query(
+        Recipe.id, Recipe.title, Recipe.category, Recipe.prep_time, Recipe.cook_time,
+        Recipe.servings, Recipe.image_path, Recipe.created_by, User.name.label("creator_name"),
+        Recipe.created_at, Recipe.updated_at,
+    ).outerjoin(User, User.id == Recipe.created_by)
+    if category:
+        query = query.filter(Recipe.category == category)
+    for name in dict.fromkeys(filter(None, map(normalize_ingredient, ingredients))):
+        query = query.filter(Recipe.id.in_(_ingredient_filter(name)))
+
+    terms = (q or "").split()
+    if terms:
+        query, score, order = _rank(query, terms)
+    else:
+        score, order = None, (Recipe.created_at.desc(), Recipe.id.desc())
+
+    total = query.count()
+    if score is not None:
+        query = query.add_columns(score.label("score"))
+    rows = query.order_by(*order).offset((page - 1) * per_page).limit(per_page).all()
+
+    names = {}
+    if rows:
+        for recipe_id, name in (
+            db.session.query(RecipeIngredient.recipe_id, RecipeIngredient.name)
+            .filter(RecipeIngredient.recipe_id.in_([r.id for r in rows]))
+            .order_by(RecipeIngredient.recipe_id, RecipeIngredient.name)
+        ):
+            names.setdefault(recipe_id, []).append(name)
+
+    results = []
+    for r in rows:
+        results.append({
+            "id": r.id,
+            "title": r.title,
+            "category": r.category,
+            "ingredients": names.get(r.id, []),
+            "prep_time": r.prep_time,
+            "cook_time": r.cook_time,
+            "servings": r.servings,
+            "image_path": r.image_path,
+            "created_by": r.created_by,
+            "creator_name": r.creator_name,
+            "created_at": r.created_at.isoformat(),
+            "updated_at": r.updated_at.isoformat() if r.updated_at else None,
+            "search_score": float(r.score) if score is not None else None,
+        })
+    return results, total
@@ -0,0 +1,130 @@
+"""Rebuild receipt vectors in bulk: batched embeddings, batched upserts, resumable."""
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor
+from app import db
+from app.models import Receipt
+from app.services.ocr_service import EMBEDDING_MODEL, create_embeddings, receipt_vector_id
+from app.services.search_service import receipt_embedding_text, receipt_vector_metadata
+from app.services.vector_store import get_vector_store
+
+DEFAULT_CHECKPOINT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".reindex_checkpoint.json"
+)
+
+
+def _load_checkpoint(path, only_missing):
+    if not path or not os.path.exists(path):
+        return 0
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    # A checkpoint from a different model or mode is not a valid resume point.
+    if state.get("model") != EMBEDDING_MODEL or state.get("only_missing") != only_missing:
+        return 0
+    return int(state.get("last_id", 0))
+
+
+def _save_checkpoint(path, last_id, only_missing):
+    if not path:
+        return
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"last_id": last_id, "model": EMBEDDING_MODEL, "only_missing": only_missing}, f)
+    os.replace(tmp, path)
+
+
+def _embed_and_upsert(store, batch):
+    """Worker task: one embeddings request and one upsert for a batch of receipts.
+    batch is [(receipt_id, vector_id, text, metadata)]; returns [(receipt_id, vector_id)]."""
+    vectors = create_embeddings([text.strip() or "receipt" for _, _, text, _ in batch])
+    store.upsert([
+        {"id": vector_id, "values": vec, "metadata": meta}
+        for (_, vector_id, _, meta), vec in zip(batch, vectors)
+    ])
+    return [(receipt_id, vector_id) for receipt_id, vector_id, _, _ in batch]
+
+
+def iter_receipt_chunks(chunk_size, after_id=0, only_missing=False):
+    """Stream receipts ordered by id using keyset pagination (constant memory)."""
+    last_id = after_id
+    while True:
+        query = Receipt.query.filter(Receipt.id > last_id)
+        if only_missing:
+            query = query.filter(Receipt.pinecone_id.is_(None))
+        chunk = query.order_by(Receipt.id).limit(chunk_size).all()
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+
+
+def reindex_receipts(
+    only_missing=True,
+    chunk_size=500,
+    batch_size=100,
+    workers=4,
+    checkpoint_path=DEFAULT_CHECKPOINT,
+    restart=False,
+    rebuild=False,
+    log=print,
+):
+    """Re-embed receipts and upsert them into the configured vector store.
+
+    Returns a dict of counts. Progress is checkpointed after every fully processed
+    chunk, so an interrupted run resumes where it stopped; a chunk with a failed
+    batch stops the run without advancing the checkpoint.
+    """
+    store = get_vector_store()
+    if store is None:
+        raise RuntimeError("No vector store configured (set PINECONE_API_KEY or VECTOR_STORE=local)")
+
+    if rebuild:
+        store.reset()
+        restart = True
+    start_after = 0 if restart else _load_checkpoint(checkpoint_path, only_missing)
+    if start_after:
+        log(f"Resuming after receipt #{start_after}")
+
+    stats = {"indexed": 0, "failed": 0, "chunks": 0}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for chunk in iter_receipt_chunks(chunk_size, start_after, only_missing):
+            items = [
+                (
+                    r.id,
+                    r.pinecone_id or receipt_vector_id(r.id),
+                    receipt_embedding_text(r),
+                    receipt_vector_metadata(r),
+                )
+                for r in chunk
+            ]
+            futures = [
+                pool.submit(_embed_and_upsert, store, items[i:i + batch_size])
+                for i in range(0, len(items), batch_size)
+            ]
+
+            by_id = {r.id: r for r in chunk}
+            chunk_failed = False
+            for fut in futures:
+                try:
+                    done = fut.result()
+                except Exception as e:
+                    chunk_failed = True
+                    log(f"Batch failed: {e}")
+                    continue
+                for receipt_id, vector_id in done:
+                    by_id[receipt_id].pinecone_id = vector_id
+                stats["indexed"] += len(done)
+            db.session.commit()
+            stats["chunks"] += 1
+
+            if chunk_failed:
+                stats["failed"] += 1
+                log(f"Stopping at chunk ending with receipt #{chunk[-1].id}; rerun to resume")
+                return stats
+            _save_checkpoint(checkpoint_path, chunk[-1].id, only_missing)
+            log(f"Indexed through receipt #{chunk[-1].id} ({stats['indexed']} total)")
+            db.session.expunge_all()
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return stats
@@ -0,0 +1,151 @@
+"""Retries with jittered backoff and circuit breakers for outbound API calls."""
+import time
+import random
+import threading
+
+_TRANSIENT_ERRORS = {"APITimeoutError", "APIConnectionError", "RateLimitError", "InternalServerError"}
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream service is failing; the work should be retried later."""
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    """closed -> open after `failure_threshold` consecutive transient failures;
+    open -> half_open after `reset_timeout` seconds, when one trial call is let through;
+    half_open -> closed on success, back to open on failure."""
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self.total_failures = 0
+        self.total_rejected = 0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._trial_in_flight = False
+            if self.state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            self.total_rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.total_failures += 1
+            self.last_error = str(error)[:200] if error else None
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def snapshot(self, include_error=False):
+        """State and counters; `last_error` (upstream error text) only when include_error."""
+        with self._lock:
+            retry_in = None
+            if self.state == "open":
+                retry_in = max(0.0, round(self.reset_timeout - (time.monotonic() - self.opened_at), 1))
+            snapshot = {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "total_failures": self.total_failures,
+                "total_rejected": self.total_rejected,
+                "retry_in_seconds": retry_in,
+            }
+            if include_error:
+                snapshot["last_error"] = self.last_error
+            return snapshot
+
+
+def get_breaker(name, failure_threshold=5, reset_timeout=30.0):
+    """Process-wide breaker registry, so every caller of one upstream shares state."""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name, failure_threshold, reset_timeout)
+        return _breakers[name]
+
+
+def breaker_states(include_errors=False):
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot(include_errors) for b in breakers}
+
+
+def is_transient(exc):
+    """429, 5xx, timeouts and connection errors are worth retrying; other errors are not."""
+    status = getattr(exc, "status_code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    return any(cls.__name__ in _TRANSIENT_ERRORS for cls in type(exc).__mro__)
+
+
+def _retry_after(exc):
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_retry(fn, breaker, retries=2, base_delay=0.5, max_delay=8.0, deadline=None):
+    """Call fn(timeout) with retries on transient errors.
+
+    fn receives the seconds left before `deadline` (None if unbounded) to use as
+    its own request timeout. Backoff is "full jitter": a random sleep in
+    [0, min(max_delay, base_delay * 2**attempt)], or the server's Retry-After.
+    Raises CircuitOpenError without calling fn while the breaker is open, and
+    UpstreamUnavailable once retries or the deadline are exhausted.
+    """
+    end = time.monotonic() + deadline if deadline else None
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(f"{breaker.name} is unavailable (circuit open); try again later")
+        remaining = end - time.monotonic() if end else None
+        try:
+            result = fn(remaining)
+        except Exception as e:
+            if not is_transient(e):
+                breaker.record_success()  # the service answered; the request was bad
+                raise
+            breaker.record_failure(e)
+            delay = _retry_after(e)
+            if delay is None:
+                delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            out_of_time = end is not None and time.monotonic() + delay >= end
+            if attempt >= retries or out_of_time:
+                raise UpstreamUnavailable(f"{breaker.name} request failed: {e}") from e
+            attempt += 1
+            time.sleep(delay)
+            continue
+        breaker.record_success()
+        return result
@@ -0,0 +1,249 @@
+"""Hybrid receipt search: SQL full-text match + vector-similarity rerank of the best matches.
+
+Query syntax (free text plus optional filters, all pushed into SQL):
+  amount>50 amount<=20   total amount range
+  from:2026-01-01        transaction date lower bound (inclusive)
+  to:2026-01-31          transaction date upper bound (inclusive)
+  by:greycin             uploader name or username
+  2026-02-14             bare date: exact transaction date
+"""
+import re
+from datetime import datetime
+from sqlalchemy import func, or_, text, literal, Integer, Float
+from sqlalchemy.orm import undefer
+from app import db
+from app.models import User, Receipt
+
+CANDIDATE_LIMIT = 200
+TEXT_WEIGHT = 0.5
+VECTOR_WEIGHT = 0.5
+MIN_VECTOR_SCORE = 0.25
+
+_AMOUNT_RE = re.compile(r"^amount(>=|<=|>|<|=)(\d+(?:\.\d+)?)$", re.IGNORECASE)
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+_fts_checked = {}
+
+
+def receipt_search_text(receipt):
+    """Text indexed for full-text search: merchant, OCR line items and dates."""
+    ocr = receipt.ocr_raw or {}
+    parts = [receipt.merchant_name or ""]
+    for it in ocr.get("items") or []:
+        if isinstance(it, dict) and it.get("name"):
+            parts.append(str(it["name"]))
+    for key in ("category_suggestion", "payment_method"):
+        if ocr.get(key):
+            parts.append(str(ocr[key]))
+    if receipt.transaction_date:
+        parts.append(receipt.transaction_date.isoformat())
+        parts.append(receipt.transaction_date.strftime("%B %Y"))
+    return " ".join(p for p in parts if p).strip() or None
+
+
+def receipt_embedding_text(receipt):
+    """Text embedded for the vector store. Changing this requires `flask reindex-receipts --all`."""
+    ocr = receipt.ocr_raw or {}
+    return f"{receipt.merchant_name or ''} {receipt.total_amount or ''} {ocr.get('category_suggestion', '')}"
+
+
+def receipt_vector_metadata(receipt):
+    return {
+        "receipt_id": receipt.id,
+        "merchant": receipt.merchant_name or "",
+        "amount": float(receipt.total_amount) if receipt.total_amount else 0,
+        "date": receipt.transaction_date.isoformat() if receipt.transaction_date else "",
+    }
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def parse_query(q):
+    """Split a search string into free-text terms and structured filters."""
+    terms = []
+    filters = {}
+    for token in (q or "").split():
+        m = _AMOUNT_RE.match(token)
+        if m:
+            filters.setdefault("amount", []).append((m.group(1), float(m.group(2))))
+            continue
+        key, sep, value = token.partition(":")
+        key = key.lower()
+        if sep and value and key in ("from", "to"):
+            d = _parse_date(value)
+            if d:
+                filters[key] = d
+                continue
+        if sep and value and key == "by":
+            filters["by"] = value
+            continue
+        if _DATE_RE.match(token) and _parse_date(token):
+            filters["on"] = _parse_date(token)
+            continue
+        terms.append(token)
+    return terms, filters
+
+
+def _escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", r"\%").replace("_", r"\_")
+
+
+def apply_filters(query, filters):
+    """Push parsed filters into the SQL WHERE clause (indexed columns only)."""
+    ops = {
+        ">": Receipt.total_amount.__gt__,
+        ">=": Receipt.total_amount.__ge__,
+        "<": Receipt.total_amount.__lt__,
+        "<=": Receipt.total_amount.__le__,
+        "=": Receipt.total_amount.__eq__,
+    }
+    for op, value in filters.get("amount", []):
+        query = query.filter(ops[op](value))
+    if filters.get("from"):
+        query = query.filter(Receipt.transaction_date >= filters["from"])
+    if filters.get("to"):
+        query = query.filter(Receipt.transaction_date <= filters["to"])
+    if filters.get("on"):
+        query = query.filter(Receipt.transaction_date == filters["on"])
+    if filters.get("merchant"):
+        # Prefix match on lower(merchant_name), served by ix_receipts_merchant_lower.
+        prefix = _escape_like(filters["merchant"].lower())
+        query = query.filter(func.lower(Receipt.merchant_name).like(prefix + "%", escape="\\"))
+    if filters.get("by"):
+        # Case-insensitive exact match; wildcards in the input are literal.
+        who = _escape_like(filters["by"])
+        uploader_ids = db.session.query(User.id).filter(
+            or_(User.name.ilike(who, escape="\\"), User.email.ilike(who, escape="\\"))
+        )
+        query = query.filter(Receipt.uploaded_by.in_(uploader_ids))
+    return query
+
+
+def _sqlite_fts_available(table="receipts_fts"):
+    bind = db.session.get_bind()
+    key = (str(bind.url), table)
+    if key not in _fts_checked:
+        row = db.session.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": table},
+        ).first()
+        _fts_checked[key] = row is not None
+    return _fts_checked[key]
+
+
+def _fts5_match(terms):
+    # Quote every term (doubling embedded quotes) and prefix-match it; terms are ANDed.
+    return " ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+
+def _text_match(query, terms):
+    """Restrict `query` to receipts matching all terms. Returns (query, rank, order):
+    `rank` is higher-is-better and `order` sorts best first."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        tsv = func.to_tsvector("english", func.coalesce(Receipt.search_text, ""))
+        tsq = func.plainto_tsquery("english", " ".join(terms))
+        rank = func.ts_rank(tsv, tsq)
+        return query.filter(tsv.op("@@")(tsq)), rank, (rank.desc(), Receipt.id.desc())
+
+    if dialect == "sqlite" and _sqlite_fts_available():
+        fts = (
+            text("SELECT rowid AS id, bm25(receipts_fts) AS rank FROM receipts_fts WHERE receipts_fts MATCH :match")
+            .bindparams(match=_fts5_match(terms))
+            .columns(id=Integer, rank=Float)
+            .subquery()
+        )
+        # bm25() is lower-is-better and negative; flip it so higher is better.
+        return query.join(fts, fts.c.id == Receipt.id), -fts.c.rank, (fts.c.rank, Receipt.id.desc())
+
+    for t in terms:
+        query = query.filter(Receipt.search_text.ilike(f"%{t}%"))
+    return query, literal(1.0), (Receipt.created_at.desc(), Receipt.id.desc())
+
+
+def _text_scores(matched, rank, order, offset, limit):
+    """{receipt_id: rank} for `limit` text matches from `offset`, best first."""
+    rows = (
+        matched.with_entities(Receipt.id, rank.label("rank"))
+        .order_by(*order)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    return {r.id: float(r.rank) for r in rows}
+
+
+def _vector_scores(candidate_ids, terms, limit):
+    """Return {receipt_id: cosine score} for vector hits among the text candidates."""
+    from app.services.ocr_service import search_receipts
+
+    try:
+        hits = search_receipts(" ".join(terms), top_k=limit)
+    except Exception:
+        return {}  # vector store down: degrade to text-only ranking
+    scores = {}
+    for h in hits:
+        rid = (h.get("metadata") or {}).get("receipt_id")
+        if rid is None or h["score"] < MIN_VECTOR_SCORE:
+            continue
+        rid = int(rid)
+        if rid in candidate_ids:
+            scores[rid] = max(scores.get(rid, 0.0), float(h["score"]))
+    return scores
+
+
+def hybrid_search(q, page=1, per_page=20, include_ocr=False):
+    """Run a hybrid search. Returns (receipts, scores_by_id, total).
+
+    Full text decides which receipts match; `total` is the exact number of matches.
+    The best CANDIDATE_LIMIT of them are reranked with vector similarity. Pages past
+    that window continue in full-text order. The vector store is only queried when
+    the text step found something.
+    """
+    terms, filters = parse_query(q)
+    query = apply_filters(Receipt.query, filters)
+    row_options = [undefer(Receipt.ocr_raw)] if include_ocr else []
+
+    if not terms:
+        total = query.count()
+        receipts = (
+            query.options(*row_options)
+            .order_by(Receipt.transaction_date.desc(), Receipt.id.desc())
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+            .all()
+        )
+        return receipts, {}, total
+
+    matched, rank, order = _text_match(query, terms)
+    text_scores = _text_scores(matched, rank, order, 0, CANDIDATE_LIMIT)
+    if not text_scores:
+        return [], {}, 0
+    total = len(text_scores) if len(text_scores) < CANDIDATE_LIMIT else matched.count()
+    vector_scores = _vector_scores(set(text_scores), terms, CANDIDATE_LIMIT)
+
+    top_text = max(text_scores.values(), default=0) or 1.0
+
+    def score(rid, text_score):
+        return TEXT_WEIGHT * (text_score / top_text) + VECTOR_WEIGHT * vector_scores.get(rid, 0.0)
+
+    combined = {rid: score(rid, s) for rid, s in text_scores.items()}
+    ranked = sorted(combined, key=lambda rid: (-combined[rid], -rid))
+
+    start, end = (page - 1) * per_page, page * per_page
+    page_ids = ranked[start:end]
+    if len(page_ids) < per_page and total > len(ranked):
+        # Past the reranked window: continue in full-text order.
+        offset = max(start, len(ranked))
+        rest = _text_scores(matched, rank, order, offset, end - offset)
+        combined.update({rid: score(rid, s) for rid, s in rest.items()})
+        page_ids += list(rest)
+    if not page_ids:
+        return [], combined, total
+    by_id = {r.id: r for r in Receipt.query.options(*row_options).filter(Receipt.id.in_(page_ids)).all()}
+    return [by_id[rid] for rid in page_ids if rid in by_id], combined, total
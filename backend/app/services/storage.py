@@ -0,0 +1,365 @@
+"""Pluggable storage for uploaded receipt and recipe images.
+
+Backends:
+  local - files under UPLOAD_FOLDER, sharded two levels deep by a hash of the key
+          (ab/cd/<key>) so no directory grows past a few hundred entries
+  s3    - an S3-compatible bucket (S3_BUCKET, optional S3_ENDPOINT_URL for MinIO or the
+          offline stand-in in stubs/s3_stub.py, S3_PREFIX, S3_REGION; credentials from
+          the usual AWS_* variables). Needs boto3.
+
+STORAGE_BACKEND selects the backend (default local). Keys are the names stored in
+image_path (`<uuid>.<ext>`), so switching backends needs no schema change; copy the files
+over with `flask migrate-uploads`. Writes stream in CHUNK_SIZE pieces and only become
+visible once complete; request uploads arrive already spooled to disk (app/uploads.py) and
+save_upload() moves them into place. `flask gc-uploads` removes files no receipt or recipe
+references.
+"""
+import os
+import uuid
+import shutil
+import hashlib
+import threading
+from datetime import datetime, timezone
+from importlib.util import find_spec
+from flask import current_app
+from app.metrics import upstream_timer
+from app.uploads import UploadSpool
+
+# Like the Pinecone SDK in vector_store, boto3 is only imported when the s3 backend is built.
+_boto3_available = find_spec("boto3") is not None
+
+CHUNK_SIZE = 1024 * 1024
+MULTIPART_SIZE = 8 * 1024 * 1024  # S3 part size; smaller bodies go up in one PUT
+MIMETYPES = {"jpg": "image/jpeg", "jpeg": "image/jpeg", "png": "image/png", "webp": "image/webp"}
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class StorageError(Exception):
+    pass
+
+
+def new_key(ext, prefix=""):
+    """A fresh random key for an upload with extension `ext`."""
+    return f"{prefix}{uuid.uuid4().hex}.{ext.lower()}"
+
+
+def mimetype(key, default="application/octet-stream"):
+    return MIMETYPES.get(key.rsplit(".", 1)[-1].lower(), default)
+
+
+def shard_path(key):
+    """ab/cd/<key>, from the SHA-1 of the key (uuid keys alone would shard too, but
+    legacy and hand-named files would not)."""
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return f"{digest[:2]}/{digest[2:4]}/{key}"
+
+
+def _valid_key(key):
+    return bool(key) and "/" not in key and "\\" not in key and not key.startswith(".")
+
+
+class Storage:
+    """Minimal interface shared by all backends."""
+
+    name = "base"
+
+    def save(self, key, stream):
+        """Write the binary file-like `stream` under `key`; returns the size in bytes."""
+        raise NotImplementedError
+
+    def save_upload(self, key, upload):
+        """Store a request file's stream (an UploadSpool when parsed by UploadRequest)."""
+        upload.seek(0)
+        return self.save(key, upload)
+
+    def spool_dir(self):
+        """Where UploadRequest spools incoming files; None for the system temp directory."""
+        return None
+
+    def open(self, key):
+        """A binary file-like object for `key`; FileNotFoundError when it is missing."""
+        raise NotImplementedError
+
+    def size(self, key):
+        """Size of `key` in bytes; FileNotFoundError when it is missing."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Remove `key`; missing keys are ignored."""
+        raise NotImplementedError
+
+    def keys(self):
+        """Yield (key, last_modified as naive UTC) for every stored file."""
+        raise NotImplementedError
+
+    def abort_stale_writes(self, older_than):
+        """Discard partial writes started before `older_than`; returns how many."""
+        return 0
+
+    def read(self, key):
+        with self.open(key) as f:
+            return f.read()
+
+
+class LocalStorage(Storage):
+    name = "local"
+
+    def __init__(self, root):
+        self.root = root
+        self._partial = os.path.join(root, ".partial")
+        os.makedirs(self._partial, exist_ok=True)
+
+    def _path(self, key):
+        if not _valid_key(key):
+            raise FileNotFoundError(key)
+        return os.path.join(self.root, *shard_path(key).split("/"))
+
+    def path(self, key):
+        """Filesystem path of `key`; files saved before sharding still live at the top level."""
+        sharded = self._path(key)
+        if not os.path.exists(sharded):
+            flat = os.path.join(self.root, key)
+            if os.path.isfile(flat):
+                return flat
+        return sharded
+
+    def save(self, key, stream):
+        target = self._path(key)
+        # Write under .partial and rename into place, so readers and the GC never see
+        # half a file and a crash leaves only a partial for abort_stale_writes.
+        tmp = os.path.join(self._partial, f"{uuid.uuid4().hex}-{key}")
+        try:
+            with open(tmp, "wb") as out:
+                shutil.copyfileobj(stream, out, CHUNK_SIZE)
+                size = out.tell()
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        return size
+
+    def save_upload(self, key, upload):
+        if not isinstance(upload, UploadSpool) or os.path.dirname(upload.name) != self._partial:
+            return super().save_upload(key, upload)
+        # Spooled into .partial by the request parser: a rename, no second copy.
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        size = upload.size
+        upload.persist(target)
+        return size
+
+    def spool_dir(self):
+        return self._partial
+
+    def open(self, key):
+        return open(self.path(key), "rb")
+
+    def size(self, key):
+        return os.path.getsize(self.path(key))
+
+    def delete(self, key):
+        for path in (self._path(key), os.path.join(self.root, key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def keys(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                if name.startswith("."):
+                    continue
+                modified = os.stat(os.path.join(dirpath, name)).st_mtime
+                yield name, datetime.fromtimestamp(modified, timezone.utc).replace(tzinfo=None)
+
+    def abort_stale_writes(self, older_than):
+        removed = 0
+        cutoff = older_than.replace(tzinfo=timezone.utc).timestamp()
+        for entry in os.scandir(self._partial):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        return removed
+
+
+class S3Storage(Storage):
+    name = "s3"
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, region=None):
+        import boto3
+        from botocore.config import Config
+        from boto3.s3.transfer import TransferConfig
+
+        # Path-style addressing for custom endpoints: MinIO and the stub have no per-bucket DNS.
+        config = Config(s3={"addressing_style": "path"}) if endpoint_url else None
+        self._client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region, config=config)
+        self._transfer = TransferConfig(
+            multipart_threshold=MULTIPART_SIZE, multipart_chunksize=MULTIPART_SIZE, max_concurrency=1, use_threads=False
+        )
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+
+    def _object(self, key):
+        if not _valid_key(key):
+            raise FileNotFoundError(key)
+        return self.prefix + shard_path(key)
+
+    def save(self, key, stream, metadata=None):
+        # upload_fileobj reads MULTIPART_SIZE at a time and switches to a multipart upload
+        # for larger bodies; an interrupted one is aborted by the transfer manager or,
+        # failing that, by abort_stale_writes.
+        counter = _CountingReader(stream)
+        extra = {"ContentType": mimetype(key)}
+        if metadata:
+            extra["Metadata"] = metadata
+        with upstream_timer("s3", "put"):
+            self._client.upload_fileobj(counter, self.bucket, self._object(key), ExtraArgs=extra, Config=self._transfer)
+        return counter.size
+
+    def save_upload(self, key, upload):
+        upload.seek(0)
+        # Keep the hash computed while the upload streamed in, for later integrity checks.
+        metadata = {"sha256": upload.sha256} if isinstance(upload, UploadSpool) else None
+        return self.save(key, upload, metadata)
+
+    def open(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            with upstream_timer("s3", "get"):
+                return self._client.get_object(Bucket=self.bucket, Key=self._object(key))["Body"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def size(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            with upstream_timer("s3", "head"):
+                return self._client.head_object(Bucket=self.bucket, Key=self._object(key))["ContentLength"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise FileNotFoundError(key) from e
+            raise
+
+    def delete(self, key):
+        with upstream_timer("s3", "delete"):
+            self._client.delete_object(Bucket=self.bucket, Key=self._object(key))
+
+    def keys(self):
+        paginator = self._client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                yield obj["Key"].rsplit("/", 1)[-1], obj["LastModified"].astimezone(timezone.utc).replace(tzinfo=None)
+
+    def abort_stale_writes(self, older_than):
+        removed = 0
+        paginator = self._client.get_paginator("list_multipart_uploads")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for upload in page.get("Uploads", []):
+                if upload["Initiated"].astimezone(timezone.utc).replace(tzinfo=None) < older_than:
+                    self._client.abort_multipart_upload(Bucket=self.bucket, Key=upload["Key"], UploadId=upload["UploadId"])
+                    removed += 1
+        return removed
+
+
+class _CountingReader:
+    """Wraps a stream to count the bytes boto3 reads from it."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.size = 0
+
+    def read(self, size=-1):
+        data = self._stream.read(size)
+        self.size += len(data)
+        return data
+
+
+def iter_file(f, chunk_size=CHUNK_SIZE):
+    """Yield a file-like object's content in chunks, closing it at the end (for streamed responses)."""
+    try:
+        while chunk := f.read(chunk_size):
+            yield chunk
+    finally:
+        f.close()
+
+
+def backend_name():
+    return os.getenv("STORAGE_BACKEND", "local").strip().lower()
+
+
+def get_storage():
+    """Return the configured storage (cached per process)."""
+    name = backend_name()
+    if name == "s3":
+        if not _boto3_available:
+            raise StorageError("STORAGE_BACKEND=s3 needs boto3 (pip install boto3)")
+        if not os.getenv("S3_BUCKET"):
+            raise StorageError("STORAGE_BACKEND=s3 needs S3_BUCKET")
+        key = ("s3", os.getenv("S3_BUCKET"), os.getenv("S3_PREFIX", ""), os.getenv("S3_ENDPOINT_URL"))
+    elif name == "local":
+        key = ("local", current_app.config["UPLOAD_FOLDER"])
+    else:
+        raise StorageError(f"Unknown STORAGE_BACKEND {name!r} (use local or s3)")
+
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if name == "s3":
+                store = S3Storage(key[1], key[2], key[3], os.getenv("S3_REGION"))
+            else:
+                store = LocalStorage(key[1])
+            _stores[key] = store
+        return store
+
+
+def collect_garbage(grace, dry_run=False, batch_size=500, log=print):
+    """Delete stored files that no receipt or recipe references.
+
+    Files younger than `grace` (a timedelta) are kept: an upload is stored before its row
+    commits. Keys are checked against the database in batches, so memory stays flat
+    however many files there are. Returns (orphans found, partial writes aborted).
+    """
+    from app import db
+    from app.models import Receipt, Recipe
+
+    store = get_storage()
+    cutoff = datetime.utcnow() - grace
+    orphans = 0
+
+    def sweep(batch):
+        referenced = {
+            row[0]
+            for model in (Receipt, Recipe)
+            for row in db.session.query(model.image_path).filter(model.image_path.in_(batch))
+        }
+        found = 0
+        for key in batch:
+            if key not in referenced:
+                log(f"{'Would delete' if dry_run else 'Deleting'} orphan {key}")
+                if not dry_run:
+                    store.delete(key)
+                found += 1
+        return found
+
+    batch = []
+    for key, modified in store.keys():
+        if modified >= cutoff:
+            continue
+        batch.append(key)
+        if len(batch) >= batch_size:
+            orphans += sweep(batch)
+            batch = []
+    if batch:
+        orphans += sweep(batch)
+    db.session.rollback()
+    aborted = 0 if dry_run else store.abort_stale_writes(cutoff)
+    return orphans, aborted
@@ -0,0 +1,262 @@
+"""Pluggable vector stores for receipt semantic search.
+
+Backends:
+  pinecone - hosted Pinecone index (PINECONE_API_KEY, PINECONE_INDEX_NAME, optional PINECONE_HOST)
+  local    - float32 matrix memory-mapped from disk, brute-force cosine top-k
+
+VECTOR_STORE selects the backend explicitly; otherwise Pinecone is used when a key
+is configured and the local index is used as the fallback.
+"""
+import os
+import json
+import threading
+from importlib.util import find_spec
+from app.metrics import upstream_timer
+
+# numpy and the Pinecone SDK are imported on first use, not at module load: every
+# worker boot and `flask db upgrade` imports this module via the receipts blueprint.
+_numpy_available = find_spec("numpy") is not None
+_pinecone_available = find_spec("pinecone") is not None
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+_DEFAULT_LOCAL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "vector_index"
+)
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+class VectorStore:
+    """Minimal interface shared by all backends."""
+
+    name = "base"
+
+    def upsert(self, vectors):
+        """vectors: list of {"id": str, "values": [float], "metadata": dict}."""
+        raise NotImplementedError
+
+    def query(self, vector, top_k=10):
+        """Return [{"id", "score", "metadata"}] ordered by descending score."""
+        raise NotImplementedError
+
+    def delete(self, ids):
+        raise NotImplementedError
+
+    def reset(self):
+        """Remove every vector (used before a full rebuild with a new model)."""
+        raise NotImplementedError
+
+
+class PineconeStore(VectorStore):
+    name = "pinecone"
+
+    def __init__(self, api_key, index_name, host=None):
+        # With PINECONE_HOST the index is addressed directly (no describe_index lookup);
+        # this is also how the offline stub (stubs/pinecone_stub.py) is selected.
+        from pinecone import Pinecone
+        client = Pinecone(api_key=api_key)
+        self._index = client.Index(host=host) if host else client.Index(index_name)
+
+    def upsert(self, vectors):
+        with upstream_timer("pinecone", "upsert"):
+            self._index.upsert(vectors=vectors)
+
+    def query(self, vector, top_k=10):
+        with upstream_timer("pinecone", "query"):
+            results = self._index.query(vector=vector, top_k=top_k, include_metadata=True)
+        return [
+            {"id": m.id, "score": m.score, "metadata": m.metadata}
+            for m in results.matches
+        ]
+
+    def delete(self, ids):
+        if ids:
+            with upstream_timer("pinecone", "delete"):
+                self._index.delete(ids=list(ids))
+
+    def reset(self):
+        with upstream_timer("pinecone", "delete"):
+            self._index.delete(delete_all=True)
+
+
+class LocalStore(VectorStore):
+    """Append-only on-disk index: vectors.f32 holds unit-normalized rows, meta.jsonl
+    maps each row to its id/metadata (later rows for the same id win; deletes are
+    tombstone lines). Other processes' appends are picked up on the next query."""
+
+    name = "local"
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._meta_path = os.path.join(path, "meta.jsonl")
+        self._lock = threading.Lock()
+        self._dim = None
+        self._loaded_size = (-1, -1)
+        self._matrix = None
+        self._rows = None  # active row numbers, aligned with _ids/_metadata
+        self._ids = []
+        self._metadata = []
+
+    def _file_sizes(self):
+        sizes = []
+        for p in (self._vectors_path, self._meta_path):
+            sizes.append(os.path.getsize(p) if os.path.exists(p) else 0)
+        return tuple(sizes)
+
+    def _refresh(self):
+        """(Re)map the matrix when the files changed since the last load."""
+        import numpy as np
+        sizes = self._file_sizes()
+        if sizes == self._loaded_size:
+            return
+        latest = {}
+        dim = None
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue  # torn write from a concurrent append
+                    if rec.get("deleted"):
+                        latest.pop(rec["id"], None)
+                    else:
+                        latest[rec["id"]] = (rec["row"], rec.get("metadata") or {})
+                        dim = rec.get("dim", dim)
+        self._dim = dim
+        n_rows = sizes[0] // (dim * 4) if dim else 0
+        if n_rows:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(n_rows, dim))
+        else:
+            self._matrix = None
+        active = sorted((row, vid, meta) for vid, (row, meta) in latest.items() if row < n_rows)
+        self._rows = np.array([a[0] for a in active], dtype=np.int64)
+        self._ids = [a[1] for a in active]
+        self._metadata = [a[2] for a in active]
+        self._loaded_size = sizes
+
+    def _append(self, lines, payload=b""):
+        """Write vector bytes and meta lines under an exclusive file lock."""
+        with open(self._meta_path, "a", encoding="utf-8") as meta_f:
+            if fcntl:
+                fcntl.flock(meta_f, fcntl.LOCK_EX)
+            try:
+                with open(self._vectors_path, "ab") as vec_f:
+                    start_row = vec_f.tell() // (self._dim * 4) if self._dim else 0
+                    vec_f.write(payload)
+                for rec in lines:
+                    if "row" in rec:
+                        rec["row"] = start_row + rec["row"]
+                    meta_f.write(json.dumps(rec) + "\n")
+                meta_f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(meta_f, fcntl.LOCK_UN)
+
+    def upsert(self, vectors):
+        import numpy as np
+        if not vectors:
+            return
+        with self._lock:
+            self._refresh()
+            mat = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+            if self._dim is None:
+                self._dim = mat.shape[1]
+            elif mat.shape[1] != self._dim:
+                raise ValueError(f"Vector dimension {mat.shape[1]} does not match index dimension {self._dim}")
+            norms = np.linalg.norm(mat, axis=1, keepdims=True)
+            mat = mat / np.where(norms == 0, 1, norms)
+            lines = [
+                {"id": v["id"], "row": i, "dim": self._dim, "metadata": v.get("metadata") or {}}
+                for i, v in enumerate(vectors)
+            ]
+            self._append(lines, mat.astype(np.float32).tobytes())
+
+    def query(self, vector, top_k=10):
+        import numpy as np
+        with self._lock:
+            self._refresh()
+            if self._matrix is None or not len(self._rows):
+                return []
+            q = np.asarray(vector, dtype=np.float32)
+            norm = np.linalg.norm(q)
+            if norm:
+                q = q / norm
+            if len(self._rows) == self._matrix.shape[0]:
+                scores = self._matrix @ q  # no superseded rows: skip the gather copy
+            else:
+                scores = self._matrix[self._rows] @ q
+            k = min(top_k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                {"id": self._ids[i], "score": float(scores[i]), "metadata": self._metadata[i]}
+                for i in top
+            ]
+
+    def delete(self, ids):
+        if not ids:
+            return
+        with self._lock:
+            self._refresh()
+            self._append([{"id": vid, "deleted": True} for vid in ids])
+
+    def reset(self):
+        with self._lock:
+            for p in (self._vectors_path, self._meta_path):
+                if os.path.exists(p):
+                    os.remove(p)
+            self._dim = None
+            self._loaded_size = (-1, -1)
+            self._refresh()
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+
+def backend_name():
+    """Name of the backend that get_vector_store() would return, or None."""
+    choice = os.getenv("VECTOR_STORE", "").strip().lower()
+    if choice in ("pinecone", "local"):
+        return choice
+    if choice == "none":
+        return None
+    if os.getenv("PINECONE_API_KEY") and _pinecone_available:
+        return "pinecone"
+    if _numpy_available:
+        return "local"
+    return None
+
+
+def get_vector_store():
+    """Return the configured vector store (cached per process), or None if unavailable."""
+    name = backend_name()
+    if name == "pinecone":
+        if not os.getenv("PINECONE_API_KEY") or not _pinecone_available:
+            return None
+        key = ("pinecone", os.getenv("PINECONE_INDEX_NAME", "receipts"))
+    elif name == "local":
+        if not _numpy_available:
+            return None
+        key = ("local", os.getenv("VECTOR_STORE_PATH", _DEFAULT_LOCAL_PATH))
+    else:
+        return None
+
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            if name == "pinecone":
+                store = PineconeStore(os.getenv("PINECONE_API_KEY"), key[1], os.getenv("PINECONE_HOST"))
+            else:
+                store = LocalStore(key[1])
+            _stores[key] = store
+        return store
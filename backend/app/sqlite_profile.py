@@ -0,0 +1,109 @@
+"""Production settings for SQLite deployments.
+
+Every new connection gets WAL journaling and tuned pragmas, so readers never block
+the writer and a writer waits (busy_timeout) instead of failing with "database is
+locked". With SQLITE_SERIALIZE_WRITES=1, sessions also take a cross-process write
+lock from their first flush until commit/rollback, so gunicorn workers queue for
+the single SQLite writer in order instead of polling against each other.
+"""
+import os
+import time
+import threading
+from sqlalchemy import event
+
+try:
+    import fcntl
+except ImportError:  # Windows: serialize writes within the process only
+    fcntl = None
+
+_thread_write_lock = threading.Lock()
+
+
+def _pragmas():
+    return {
+        "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000")),
+        # Negative cache_size is in KiB: 64 MiB page cache per connection.
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+        "temp_store": "MEMORY",
+    }
+
+
+def _apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in _pragmas().items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+class _WriteLock:
+    """Exclusive lock on `<database>.writelock`, held by one session at a time."""
+
+    def __init__(self, path, timeout):
+        self.path = path
+        self.timeout = timeout
+
+    def acquire(self):
+        if fcntl is None:
+            if not _thread_write_lock.acquire(timeout=self.timeout):
+                raise TimeoutError("Timed out waiting for the SQLite write lock")
+            return None
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+        delay = 0.001
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError("Timed out waiting for the SQLite write lock")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+
+    @staticmethod
+    def release(fd):
+        if fcntl is None:
+            _thread_write_lock.release()
+            return
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+def _install_write_serializer(session, lock):
+    key = "sqlite_write_lock"
+
+    @event.listens_for(session, "before_flush")
+    def _acquire(sess, flush_context, instances):
+        if key not in sess.info:
+            sess.info[key] = lock.acquire()
+
+    # after_transaction_end of the root transaction covers commit, rollback and close():
+    # Flask-SQLAlchemy's teardown closes a session that flushed and then hit a non-DB
+    # error without firing after_commit or after_rollback.
+    @event.listens_for(session, "after_transaction_end")
+    def _release(sess, transaction):
+        if transaction.parent is None and key in sess.info:
+            lock.release(sess.info.pop(key))
+
+
+def init_sqlite(app, db):
+    """Attach the SQLite profile to every SQLite engine of `db` (no-op otherwise)."""
+    if os.getenv("SQLITE_PROFILE", "1").lower() in ("0", "false", "no"):
+        return
+    serialize = os.getenv("SQLITE_SERIALIZE_WRITES", "0").lower() in ("1", "true", "yes")
+    with app.app_context():
+        engines = [e for e in db.engines.values() if e.dialect.name == "sqlite"]
+        for engine in engines:
+            event.listen(engine, "connect", _apply_pragmas)
+        primary = db.engine if db.engine.dialect.name == "sqlite" else None
+    if serialize and primary is not None and primary.url.database:
+        timeout = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "10000")) / 1000
+        _install_write_serializer(db.session, _WriteLock(primary.url.database + ".writelock", timeout))
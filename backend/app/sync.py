@@ -0,0 +1,202 @@
+"""Delta sync: `since=` on collection endpoints returns only what changed.
+
+Every insert or update of a tracked model stamps the row's change_seq with the next
+value of a global counter (one row in change_counter, incremented in the writing
+transaction, so sequence order matches commit order); deletes leave a Tombstone
+with their sequence. Collection responses carry X-Sync-Token, the counter value
+read before the rows. Passing it back as `since=` returns
+
+    {"changed": [rows inserted/updated since], "deleted": [ids], "reset": false}
+
+`deleted` also lists rows that changed but no longer match the view's filters (a
+reimbursement that left the pending queue). `since` may instead be an ISO timestamp,
+compared with updated_at / deleted_at (convenient, but not safe against clock skew or
+in-flight transactions; prefer the token). When the token predates pruned tombstones
+(`flask prune-tombstones`) or more than SYNC_MAX_CHANGES rows changed, the response
+has "reset": true and no rows, and the client should reload without `since`.
+
+Full collection responses also carry a weak ETag built from the view's max change_seq,
+row count and newest tombstone (collection_etag). A request whose If-None-Match still
+matches gets 304 Not Modified without loading or serializing any rows.
+"""
+import os
+import hashlib
+from datetime import datetime, timezone
+from flask import Response, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, func, insert, select, update
+
+SYNC_HEADER = "X-Sync-Token"
+MAX_CHANGES = int(os.getenv("SYNC_MAX_CHANGES", "1000"))
+
+
+def _tracked():
+    from app.models import User, LedgerEntry, Receipt, Reimbursement, Recipe, InventoryItem
+    # Entity names match ActivityLog.entity_type.
+    return {
+        User: "user",
+        LedgerEntry: "ledger",
+        Receipt: "receipt",
+        Reimbursement: "reimbursement",
+        Recipe: "recipe",
+        InventoryItem: "inventory",
+    }
+
+
+def _next_seq(session):
+    from app.models import ChangeCounter
+
+    table = ChangeCounter.__table__
+    result = session.execute(update(table).where(table.c.id == 1).values(value=table.c.value + 1))
+    if result.rowcount == 0:
+        # The migration and create_all() both insert the row; only a hand-cleared table lands here.
+        session.execute(insert(table).values(id=1, value=1, tombstone_floor=0))
+        return 1
+    return session.execute(select(table.c.value).where(table.c.id == 1)).scalar_one()
+
+
+def _stamp_changes(session, flush_context, instances):
+    from app.models import LedgerEntry, Tombstone
+
+    tracked = _tracked()
+    changed = [o for o in session.new if type(o) in tracked]
+    changed += [o for o in session.dirty if type(o) in tracked and session.is_modified(o)]
+    deleted = [o for o in session.deleted if type(o) in tracked]
+    if not changed and not deleted:
+        return
+    seq = _next_seq(session)
+    for obj in changed:
+        obj.change_seq = seq
+        if isinstance(obj, LedgerEntry) and obj.category == "reimbursement" and obj.id is not None:
+            # Reimbursement payloads embed their ledger entry.
+            for reimbursement in obj.reimbursement:
+                reimbursement.change_seq = seq
+    for obj in deleted:
+        session.add(Tombstone(entity_type=tracked[type(obj)], entity_id=obj.id, change_seq=seq))
+
+
+def init_sync(app, db):
+    event.listen(db.session, "before_flush", _stamp_changes)
+
+
+def current_token():
+    """The sync token for a response: read it before querying the rows it covers."""
+    from app import db
+    from app.models import ChangeCounter
+
+    return db.session.execute(select(ChangeCounter.value).where(ChangeCounter.id == 1)).scalar() or 0
+
+
+def parse_since():
+    """None, ("seq", int) or ("time", datetime) from ?since=; ValueError if malformed."""
+    raw = request.args.get("since", "").strip()
+    if not raw:
+        return None
+    if raw.isdigit():
+        return ("seq", int(raw))
+    # Stored timestamps are naive UTC: convert an offset instead of dropping it.
+    value = datetime.fromisoformat(raw.replace("Z", "+00:00"))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return ("time", value)
+
+
+def changed_since(model, since):
+    """Filter clause for rows of `model` inserted or updated after `since`."""
+    kind, value = since
+    if kind == "seq":
+        return model.change_seq > value
+    return model.updated_at > value
+
+
+def delta_response(model, items, since, token, scope=()):
+    """Response for a `since=` request. `items` are the serialized changed rows that
+    match the view; `scope` limits "left the view" ids to rows the caller may see."""
+    from app import db
+    from app.models import ChangeCounter, Tombstone
+
+    kind, value = since
+    floor = db.session.execute(select(ChangeCounter.tombstone_floor).where(ChangeCounter.id == 1)).scalar() or 0
+    if (kind == "seq" and value < floor) or len(items) > MAX_CHANGES:
+        return with_token(jsonify({"changed": [], "deleted": [], "reset": True}), token)
+
+    entity_type = _tracked()[model]
+    tombstones = db.session.query(Tombstone.entity_id).filter(Tombstone.entity_type == entity_type)
+    if kind == "seq":
+        tombstones = tombstones.filter(Tombstone.change_seq > value)
+    else:
+        tombstones = tombstones.filter(Tombstone.deleted_at > value)
+    deleted = {row.entity_id for row in tombstones}
+
+    visible = {item["id"] for item in items}
+    left_view = db.session.query(model.id).filter(changed_since(model, since), *scope)
+    deleted.update(row.id for row in left_view if row.id not in visible)
+
+    return with_token(jsonify({"changed": items, "deleted": sorted(deleted), "reset": False}), token)
+
+
+def with_token(response, token):
+    response.headers[SYNC_HEADER] = str(token)
+    return response
+
+
+def collection_etag(model, criteria=(), related=()):
+    """Validator for a full collection response, from one aggregate query.
+
+    `criteria` are the view's filters. Every insert or update in the view raises its
+    max change_seq, and every delete adds a newer tombstone; the row count covers rows
+    leaving the view and pruned tombstones. `related` are models whose fields are
+    embedded in the payload (user names). The URL and caller are hashed in because the
+    same state renders differently per filter and role. The ETag is weak so it holds
+    for the gzip and brotli encodings of the body alike.
+    """
+    from app import db
+    from app.models import Tombstone
+
+    rows = select(func.max(model.change_seq).label("seq"), func.count().label("n")).select_from(model).where(*criteria).subquery()
+    parts = [
+        rows.c.seq,
+        rows.c.n,
+        select(func.max(Tombstone.change_seq)).where(Tombstone.entity_type == _tracked()[model]).scalar_subquery(),
+    ]
+    parts += [select(func.max(m.change_seq)).scalar_subquery() for m in related]
+    state = db.session.execute(select(*parts)).one()
+    key = "|".join([request.full_path, str(get_jwt_identity()), *map(str, state)])
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:24]
+
+
+def not_modified(etag, token=None):
+    """A 304 response when the client's If-None-Match already holds `etag`, else None.
+    `token` refreshes the X-Sync-Token the browser stored with the cached body."""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = Response(status=304)
+    if token is not None:
+        with_token(response, token)
+    return with_etag(response, etag)
+
+
+def with_etag(response, etag):
+    response.set_etag(etag, weak=True)
+    # Browsers may keep the body but must revalidate it, per user.
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.vary.add("Authorization")
+    return response
+
+
+def prune_tombstones(older_than):
+    """Delete tombstones older than `older_than`; clients whose token predates the newest
+    pruned one are told to reload. Returns the number removed."""
+    from app import db
+    from app.models import ChangeCounter, Tombstone
+
+    old = Tombstone.query.filter(Tombstone.deleted_at < older_than)
+    newest = old.with_entities(db.func.max(Tombstone.change_seq)).scalar()
+    if newest is None:
+        return 0
+    removed = old.delete(synchronize_session=False)
+    counter = db.session.get(ChangeCounter, 1)
+    if counter is not None:
+        counter.tombstone_floor = max(counter.tombstone_floor, newest)
+    db.session.commit()
+    return removed
@@ -0,0 +1,72 @@
+"""Streaming multipart uploads.
+
+Werkzeug already parses multipart bodies incrementally; by default it then spools each
+file into memory (up to 500 KB) or an anonymous temp file, and the route copies that into
+storage. UploadRequest hands the parser an UploadSpool instead: a named temp file created
+next to the storage's final location, so each chunk is written to disk once as it arrives
+while its SHA-256 and size are computed, and a file over MAX_UPLOAD_MB is refused with 413
+mid-stream. Storage.save_upload() then renames the spool into place (local) or streams it
+to the bucket (s3); nothing holds the whole image in memory.
+"""
+import os
+import hashlib
+import tempfile
+from flask import Request, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
+
+
+class UploadSpool:
+    """Writable, readable temp file that hashes and counts what the parser writes into it."""
+
+    def __init__(self, directory=None, limit=None):
+        fd, self.name = tempfile.mkstemp(prefix="upload-", dir=directory)
+        self._file = os.fdopen(fd, "w+b")
+        self._sha256 = hashlib.sha256()
+        self.limit = limit
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        if self.limit is not None and self.size > self.limit:
+            self.close()  # the parser drops the part without closing it
+            raise RequestEntityTooLarge(f"Each file may be at most {self.limit // (1024 * 1024)} MB.")
+        self._sha256.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self):
+        return self._sha256.hexdigest()
+
+    def persist(self, path):
+        """Move the spooled file to `path` (same filesystem); the spool is closed afterwards."""
+        self._file.close()
+        os.replace(self.name, path)
+        self.name = None
+
+    def close(self):
+        self._file.close()
+        if self.name and os.path.exists(self.name):
+            os.remove(self.name)
+        self.name = None
+
+    def __getattr__(self, attr):
+        # read, readline, seek, tell, flush, ... from the underlying file
+        return getattr(self._file, attr)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        from app.services.storage import get_storage
+
+        return UploadSpool(get_storage().spool_dir(), current_app.config["MAX_UPLOAD_FILE_BYTES"])
+
+
+def init_uploads(app):
+    app.config["MAX_UPLOAD_FILE_BYTES"] = int(os.getenv("MAX_UPLOAD_MB", "16")) * 1024 * 1024
+    app.request_class = UploadRequest
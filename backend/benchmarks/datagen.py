@@ -0,0 +1,239 @@
+"""Synthetic data for benchmarks. Rows are generated deterministically from a seed."""
+import random
+from datetime import date, datetime, timedelta
+from sqlalchemy import insert, func
+from app import db
+from app.models import (
+    User, Receipt, LedgerEntry, Reimbursement, Recipe, RecipeIngredient, ActivityLog, InventoryItem,
+    LEDGER_CATEGORIES,
+)
+from app.services.recipe_search import ingredient_names
+
+MERCHANTS = ["Costco", "Costco Wholesale", "Trader Joe's", "Walmart", "Target", "Smart & Final",
+             "Restaurant Depot", "Safeway", "WinCo Foods", "Sam's Club", "Amazon", "H Mart"]
+ITEMS = ["Whole milk", "Oat milk", "Paper cups 16oz", "Lids", "Coffee beans", "Espresso roast",
+         "Sugar", "Vanilla syrup", "Caramel syrup", "Napkins", "Stir sticks", "Bagels",
+         "Cream cheese", "Bananas", "Croissants", "Chai concentrate", "Matcha powder", "Ice"]
+
+
+def fake_ocr(rng, merchant, tx_date):
+    items = [
+        {"name": rng.choice(ITEMS), "quantity": rng.randint(1, 6), "price": round(rng.uniform(1, 40), 2)}
+        for _ in range(rng.randint(3, 25))
+    ]
+    subtotal = round(sum(i["quantity"] * i["price"] for i in items), 2)
+    tax = round(subtotal * 0.0875, 2)
+    return {
+        "merchant_name": merchant,
+        "transaction_date": tx_date.isoformat(),
+        "total_amount": round(subtotal + tax, 2),
+        "subtotal": subtotal,
+        "tax": tax,
+        "items": items,
+        "payment_method": rng.choice(["Visa", "Mastercard", "Cash", "Debit"]),
+        "category_suggestion": "expense",
+    }
+
+
+def seed_users(n=5):
+    """Create benchmark users (admin first). Returns their ids."""
+    ids = []
+    for i in range(n):
+        user = User(name=f"Bench User {i}", email=f"bench{i}", role="admin" if i == 0 else "worker")
+        user.password_hash = "hardcoded"
+        db.session.add(user)
+        db.session.flush()
+        ids.append(user.id)
+    db.session.commit()
+    return ids
+
+
+def _bulk_insert(model, rows_iter, batch=5000):
+    rows = []
+    for row in rows_iter:
+        rows.append(row)
+        if len(rows) >= batch:
+            db.session.execute(insert(model), rows)
+            rows = []
+    if rows:
+        db.session.execute(insert(model), rows)
+    db.session.commit()
+
+
+def seed_receipts(n, user_ids, seed=1, batch=2000):
+    """Bulk-insert n receipts with realistic ocr_raw payloads."""
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=730)
+    created = datetime.utcnow() - timedelta(days=730)
+
+    def rows():
+        for i in range(n):
+            merchant = rng.choice(MERCHANTS)
+            tx_date = start + timedelta(days=rng.randint(0, 729))
+            ocr = fake_ocr(rng, merchant, tx_date)
+            yield {
+                "uploaded_by": rng.choice(user_ids),
+                "image_path": f"bench-{i}.jpg",
+                "ocr_raw": ocr,
+                "merchant_name": merchant,
+                "transaction_date": tx_date,
+                "total_amount": ocr["total_amount"],
+                "search_text": " ".join([merchant] + [it["name"] for it in ocr["items"]] + [tx_date.isoformat()]),
+                "created_at": created + timedelta(minutes=i),
+            }
+
+    _bulk_insert(Receipt, rows(), batch)
+
+
+def seed_ledger(n, user_ids, seed=2):
+    """Bulk-insert n ledger entries spread over two years, mostly sales/expenses."""
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=730)
+    weights = [50, 30, 8, 6, 6]
+
+    def rows():
+        for i in range(n):
+            category = rng.choices(LEDGER_CATEGORIES, weights)[0]
+            yield {
+                "entry_date": start + timedelta(days=rng.randint(0, 729)),
+                "category": category,
+                "amount": round(rng.uniform(2, 400), 2),
+                "description": f"{category} entry {i}",
+                "label": rng.choice([None, "Sunday", "Friday night", "Retreat"]),
+                "created_by": rng.choice(user_ids),
+                "status": rng.choices(["approved", "pending", "rejected"], [90, 7, 3])[0],
+                "created_at": datetime.utcnow() - timedelta(minutes=n - i),
+            }
+
+    _bulk_insert(LedgerEntry, rows())
+
+
+def seed_activity(n, user_ids, seed=3):
+    rng = random.Random(seed)
+    actions = [("ledger.create", "ledger"), ("receipt.upload", "receipt"), ("inventory.update", "inventory"),
+               ("reimbursement.create", "reimbursement"), ("recipe.update", "recipe")]
+
+    def rows():
+        for i in range(n):
+            action, entity = rng.choice(actions)
+            yield {
+                "user_id": rng.choice(user_ids),
+                "action": action,
+                "entity_type": entity,
+                "entity_id": rng.randint(1, 10000),
+                "details": f"{action} #{i}",
+                "created_at": datetime.utcnow() - timedelta(minutes=n - i),
+            }
+
+    _bulk_insert(ActivityLog, rows())
+
+
+def _next_id(model):
+    return (db.session.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def seed_reimbursements(n, user_ids, seed=4):
+    """n pending/approved/rejected reimbursements, each with its ledger entry."""
+    rng = random.Random(seed)
+    start = date.today() - timedelta(days=730)
+    first_entry = _next_id(LedgerEntry)
+    statuses = [rng.choices(["pending", "approved", "rejected"], [40, 50, 10])[0] for _ in range(n)]
+    requesters = [rng.choice(user_ids) for _ in range(n)]
+
+    def entries():
+        for i in range(n):
+            yield {
+                "id": first_entry + i,
+                "entry_date": start + timedelta(days=rng.randint(0, 729)),
+                "category": "reimbursement",
+                "amount": round(rng.uniform(5, 250), 2),
+                "description": f"reimbursement {i}",
+                "created_by": requesters[i],
+                "status": statuses[i],
+                "created_at": datetime.utcnow() - timedelta(minutes=n - i),
+            }
+
+    def reimbursements():
+        for i in range(n):
+            done = statuses[i] != "pending"
+            yield {
+                "ledger_entry_id": first_entry + i,
+                "requested_by": requesters[i],
+                "approved_by": user_ids[0] if done else None,
+                "status": statuses[i],
+                "notes": rng.choice([None, "Costco run", "Retreat snacks", "Cups and lids"]),
+                "payout_date": date.today() if statuses[i] == "approved" else None,
+                "created_at": datetime.utcnow() - timedelta(minutes=n - i),
+            }
+
+    _bulk_insert(LedgerEntry, entries())
+    _bulk_insert(Reimbursement, reimbursements())
+
+
+def seed_inventory(n, user_ids, seed=5):
+    """n inventory items with unique names."""
+    rng = random.Random(seed)
+
+    def rows():
+        for i in range(n):
+            yield {
+                "name": f"{ITEMS[i % len(ITEMS)]} #{i}",
+                "quantity": round(rng.uniform(0, 200), 2),
+                "unit": rng.choice([None, "each", "lb", "oz", "gal"]),
+                "last_edited_by": rng.choice(user_ids),
+                "last_edited_at": datetime.utcnow() - timedelta(minutes=rng.randint(0, 100000)),
+                "created_at": datetime.utcnow() - timedelta(minutes=n - i),
+            }
+
+    _bulk_insert(InventoryItem, rows())
+
+
+def seed_recipes(n, user_ids, seed=6):
+    rng = random.Random(seed)
+    drinks = ["Latte", "Cappuccino", "Cold brew", "Chai latte", "Matcha latte", "Mocha", "Americano"]
+
+    def rows():
+        for i in range(n):
+            ingredients = rng.sample(ITEMS, rng.randint(2, 6))
+            yield {
+                "title": f"{rng.choice(drinks)} #{i}",
+                "category": rng.choice(["drinks", "food", "seasonal"]),
+                "description": "House recipe",
+                "ingredients": ingredients,
+                "instructions": "\n".join(f"Step {k + 1}: add {name.lower()}" for k, name in enumerate(ingredients)),
+                "search_text": " ".join(["House recipe"] + ingredients),
+                "prep_time": rng.randint(2, 15),
+                "servings": rng.randint(1, 4),
+                "created_by": user_ids[0],
+                "created_at": datetime.utcnow() - timedelta(minutes=n - i),
+                "updated_at": datetime.utcnow() - timedelta(minutes=n - i),
+            }
+
+    _bulk_insert(Recipe, rows())
+    _bulk_insert(RecipeIngredient, (
+        {"recipe_id": recipe_id, "name": name}
+        for recipe_id, ingredients in db.session.query(Recipe.id, Recipe.ingredients)
+        for name in ingredient_names(ingredients)
+    ))
+
+
+def seed_all(scale, users=10, log=print):
+    """Seed every table. `scale` is the ledger/activity size (1k to 1M); the other
+    tables are sized relative to it the way the production data grows."""
+    sizes = {
+        "ledger": scale,
+        "activity": scale,
+        "receipts": max(1, scale // 10),
+        "reimbursements": max(1, scale // 20),
+        "inventory": max(1, min(scale // 10, 20000)),
+        "recipes": max(1, min(scale // 100, 5000)),
+    }
+    user_ids = seed_users(users)
+    seed_ledger(sizes["ledger"], user_ids)
+    seed_activity(sizes["activity"], user_ids)
+    seed_receipts(sizes["receipts"], user_ids)
+    seed_reimbursements(sizes["reimbursements"], user_ids)
+    seed_inventory(sizes["inventory"], user_ids)
+    seed_recipes(sizes["recipes"], user_ids)
+    log("Seeded " + ", ".join(f"{k}={v}" for k, v in sizes.items()))
+    return user_ids, sizes
@@ -0,0 +1,56 @@
+"""Helpers for driving the app through Flask's test client in benchmarks."""
+import os
+import time
+import tempfile
+import statistics
+
+
+def make_app(db_path=None):
+    """Create the app on a throwaway SQLite database built by the migrations, so the
+    FTS tables and triggers that db.create_all() knows nothing about exist too."""
+    if db_path is None:
+        fd, db_path = tempfile.mkstemp(suffix=".db", prefix="bench-")
+        os.close(fd)
+        os.remove(db_path)
+    os.environ["DATABASE_URL"] = "sqlite:///" + db_path
+    os.environ.setdefault("EMBEDDING_CACHE_PATH", "")
+    os.environ.setdefault("VECTOR_STORE", "none")
+
+    from flask_migrate import upgrade
+    from app import create_app
+    app = create_app()
+    with app.app_context():
+        upgrade(directory=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations"))
+    return app, db_path
+
+
+def auth_headers(app, user_id):
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        return {"Authorization": "Bearer " + create_access_token(identity=str(user_id))}
+
+
+def time_request(client, url, headers=None, repeat=5, method="get", **kwargs):
+    """Median/min latency (ms) and response size (bytes) over `repeat` calls."""
+    timings = []
+    size = 0
+    status = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resp = getattr(client, method)(url, headers=headers, **kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+        size = len(resp.get_data())
+        status = resp.status_code
+    return {
+        "status": status,
+        "median_ms": round(statistics.median(timings), 2),
+        "min_ms": round(min(timings), 2),
+        "bytes": size,
+    }
+
+
+def print_table(rows, columns):
+    widths = [max(len(str(c)), *(len(str(r.get(c, ""))) for r in rows)) for c in columns]
+    print("  ".join(str(c).ljust(w) for c, w in zip(columns, widths)))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(w) for c, w in zip(columns, widths)))
@@ -0,0 +1,76 @@
+"""ORM objects + to_dict() + stdlib JSON vs. column rows + FastJSONProvider.
+
+    cd backend && python -m benchmarks.json_serialization --rows 50000
+"""
+import os
+import time
+import argparse
+import statistics
+from flask.json.provider import DefaultJSONProvider
+from benchmarks.harness import make_app, auth_headers, time_request, print_table
+from benchmarks.datagen import seed_users, seed_ledger, seed_activity
+
+
+def _median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(statistics.median(timings), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app, db_path = make_app()
+    from app import db
+    from app.models import LedgerEntry
+    from app.json_provider import FastJSONProvider, rows_to_dicts, orjson
+
+    with app.app_context():
+        user_ids = seed_users()
+        seed_ledger(args.rows, user_ids)
+        seed_activity(min(args.rows, 500), user_ids)
+
+    stdlib = DefaultJSONProvider(app)
+    fast = FastJSONProvider(app)
+    rows = []
+    with app.app_context():
+        def orm_stdlib():
+            entries = LedgerEntry.query.order_by(LedgerEntry.entry_date.desc()).all()
+            return stdlib.dumps([e.to_dict() for e in entries], separators=(",", ":"))
+
+        def orm_fast():
+            entries = LedgerEntry.query.order_by(LedgerEntry.entry_date.desc()).all()
+            return fast.dumps([e.to_dict() for e in entries])
+
+        def rows_fast():
+            entries = db.session.query(*LedgerEntry.__table__.columns).order_by(LedgerEntry.entry_date.desc()).all()
+            return fast.dumps(rows_to_dicts(entries))
+
+        assert len(orm_stdlib()) > 0
+        for label, fn in [
+            ("ORM + to_dict + stdlib json", orm_stdlib),
+            ("ORM + to_dict + FastJSONProvider", orm_fast),
+            ("Row tuples + FastJSONProvider", rows_fast),
+        ]:
+            db.session.expunge_all()
+            rows.append({"case": label, "median_ms": _median_ms(fn, args.repeat)})
+
+    client = app.test_client()
+    headers = auth_headers(app, user_ids[0])
+    for url in ["/api/ledger/", "/api/activity/"]:
+        result = time_request(client, url, headers, repeat=args.repeat)
+        rows.append({"case": f"GET {url}", "median_ms": result["median_ms"]})
+
+    print(f"{args.rows} ledger entries, orjson {'installed' if orjson else 'not installed'}")
+    print_table(rows, ["case", "median_ms"])
+    os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
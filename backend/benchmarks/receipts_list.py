@@ -0,0 +1,40 @@
+"""Payload size and latency of GET /api/receipts/ with and without ocr_raw.
+
+    cd backend && python -m benchmarks.receipts_list --receipts 10000
+"""
+import os
+import argparse
+from benchmarks.harness import make_app, auth_headers, time_request, print_table
+from benchmarks.datagen import seed_users, seed_receipts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--receipts", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app, db_path = make_app()
+    with app.app_context():
+        user_ids = seed_users()
+        seed_receipts(args.receipts, user_ids)
+    headers = auth_headers(app, user_ids[0])
+    client = app.test_client()
+
+    rows = []
+    for label, url in [
+        ("default page (100)", "/api/receipts/"),
+        ("limit=500", "/api/receipts/?limit=500"),
+        ("limit=500&include=ocr", "/api/receipts/?limit=500&include=ocr"),
+        ("limit=500&fields=id,merchant_name,total_amount", "/api/receipts/?limit=500&fields=id,merchant_name,total_amount"),
+        ("merchant=costco&min_amount=100", "/api/receipts/?merchant=costco&min_amount=100"),
+    ]:
+        result = time_request(client, url, headers, repeat=args.repeat)
+        rows.append({"case": label, **result, "kb": round(result["bytes"] / 1024, 1)})
+    print(f"{args.receipts} receipts ({db_path})")
+    print_table(rows, ["case", "status", "median_ms", "min_ms", "kb"])
+    os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Latency, SQL query count and peak memory for every API route.
+
+Seeds a throwaway SQLite database with `datagen.seed_all(--scale)` and drives each
+route through Flask's test client. Embeddings (receipt search) come from the
+in-process OpenAI stub, so no network access is needed.
+
+    cd backend && python -m benchmarks.routes --scale 10000
+    python -m benchmarks.routes --scale 100000 --only receipts,ledger
+    python -m benchmarks.routes --scale 10000 --compare benchmarks/results/routes-10000-<time>.json
+
+Results are saved to benchmarks/results/routes-<scale>-<time>.json. Latencies are
+from the timed runs; queries and peak memory (tracemalloc, Python allocations only)
+are from one extra run so tracing does not skew the timings.
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import socket
+import tempfile
+import argparse
+import platform
+import threading
+import statistics
+import subprocess
+import tracemalloc
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from benchmarks.harness import make_app, auth_headers, print_table
+from benchmarks.datagen import seed_all
+from stubs.openai_stub import make_server
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# A tiny valid JPEG for upload routes.
+_JPEG = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909080a0c140d0c0b0b0c1912130f"
+    "141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30313434341f27393d38323c2e333432ffc0000b080001000101"
+    "011100ffc4001f0000010501010101010100000000000000000102030405060708090a0bffda0008010100003f00d2cf20ffd9"
+)
+
+_query_count = 0
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    global _query_count
+    _query_count += 1
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _case(blueprint, name, method, url, role="admin", **request_kwargs):
+    """url and every request kwarg may be a callable taking the iteration number,
+    so write routes can target a different row (or send a unique body) each time."""
+    return {"blueprint": blueprint, "name": name, "method": method, "url": url, "role": role, "kwargs": request_kwargs}
+
+
+def build_cases(sizes, pending_reimbursements, image_name):
+    n_receipts = sizes["receipts"]
+    n_ledger = sizes["ledger"]
+    n_inventory = sizes["inventory"]
+    n_recipes = sizes["recipes"]
+
+    def upload_files(i):
+        return {"file": (io.BytesIO(_JPEG), f"bench-{i}.jpg")}
+
+    return [
+        _case("auth", "login", "post", "/api/auth/login", role=None,
+              json={"username": "admin", "password": "admin0691"}),
+        _case("auth", "me", "get", "/api/auth/me"),
+
+        _case("users", "list", "get", "/api/users/"),
+        _case("users", "create", "post", "/api/users/",
+              json=lambda i: {"name": f"Bench {i}", "email": f"bench-new-{i}-{time.time_ns()}", "password": "x"}),
+        _case("users", "update", "patch", lambda i: f"/api/users/{2 + i % 8}", json={"name": "Renamed"}),
+
+        _case("receipts", "list", "get", "/api/receipts/"),
+        _case("receipts", "list limit=500", "get", "/api/receipts/?limit=500"),
+        _case("receipts", "list include=ocr", "get", "/api/receipts/?limit=500&include=ocr"),
+        _case("receipts", "list filtered", "get", "/api/receipts/?merchant=costco&min_amount=100"),
+        _case("receipts", "list (worker)", "get", "/api/receipts/", role="worker"),
+        _case("receipts", "get", "get", lambda i: f"/api/receipts/{1 + i % n_receipts}"),
+        _case("receipts", "update", "patch", lambda i: f"/api/receipts/{1 + i % n_receipts}",
+              json={"merchant_name": "Costco Wholesale"}),
+        _case("receipts", "search", "get", "/api/receipts/search?q=milk"),
+        _case("receipts", "search filtered", "get", "/api/receipts/search?q=coffee+amount>50"),
+        _case("receipts", "search filters only", "get", "/api/receipts/search?q=amount>100"),
+        _case("receipts", "upload", "post", "/api/receipts/upload", data=upload_files,
+              content_type="multipart/form-data"),
+        _case("receipts", "upload-batch (3)", "post", "/api/receipts/upload-batch",
+              data=lambda i: {"files": [(io.BytesIO(_JPEG), f"batch-{i}-{k}.jpg") for k in range(3)]},
+              content_type="multipart/form-data"),
+        _case("receipts", "image", "get", f"/api/receipts/image/{image_name}"),
+
+        _case("ledger", "list", "get", "/api/ledger/"),
+        _case("ledger", "list month", "get", "/api/ledger/?start=2026-01-01&end=2026-01-31"),
+        _case("ledger", "export csv", "get", "/api/ledger/export"),
+        _case("ledger", "daily-summary", "get", "/api/ledger/daily-summary"),
+        _case("ledger", "create", "post", "/api/ledger/",
+              json={"category": "sales", "amount": 12.5, "description": "bench", "entry_date": "2026-01-15"}),
+        _case("ledger", "update", "patch", lambda i: f"/api/ledger/{1 + i % n_ledger}", json={"label": "Sunday"}),
+        _case("ledger", "delete", "delete", lambda i: f"/api/ledger/{n_ledger - i}"),
+
+        _case("reimbursements", "create", "post", "/api/reimbursements/", role="worker",
+              json={"amount": 23.4, "description": "cups", "entry_date": "2026-01-15"}),
+        _case("reimbursements", "mine", "get", "/api/reimbursements/mine", role="worker"),
+        _case("reimbursements", "pending", "get", "/api/reimbursements/pending"),
+        _case("reimbursements", "approve", "post",
+              lambda i: f"/api/reimbursements/{pending_reimbursements[i % len(pending_reimbursements)]}/approve"),
+        _case("reimbursements", "reject", "post",
+              lambda i: f"/api/reimbursements/{pending_reimbursements[-1 - i % len(pending_reimbursements)]}/reject"),
+
+        _case("recipes", "list", "get", "/api/recipes/"),
+        _case("recipes", "list category", "get", "/api/recipes/?category=drinks"),
+        _case("recipes", "search", "get", "/api/recipes/search?q=latte"),
+        _case("recipes", "search ingredients", "get", "/api/recipes/search?ingredient=oat+milk&ingredient=espresso+roast"),
+        _case("recipes", "create", "post", "/api/recipes/",
+              json={"title": "Bench latte", "category": "drinks", "ingredients": ["Whole milk", "Espresso roast"]}),
+        _case("recipes", "update", "patch", lambda i: f"/api/recipes/{1 + i % n_recipes}", json={"servings": 2}),
+        _case("recipes", "delete", "delete", lambda i: f"/api/recipes/{n_recipes - i}"),
+
+        _case("analytics", "summary", "get", "/api/analytics/summary"),
+        _case("analytics", "summary month", "get", "/api/analytics/summary?start=2026-01-01&end=2026-01-31"),
+
+        _case("activity", "list", "get", "/api/activity/"),
+        _case("activity", "list (worker)", "get", "/api/activity/", role="worker"),
+
+        _case("inventory", "list", "get", "/api/inventory/"),
+        _case("inventory", "create", "post", "/api/inventory/",
+              json=lambda i: {"name": f"Bench item {i} {time.time_ns()}", "quantity": 3}),
+        _case("inventory", "update", "patch", lambda i: f"/api/inventory/{1 + i % n_inventory}", json={"quantity": 7}),
+        _case("inventory", "delete", "delete", lambda i: f"/api/inventory/{n_inventory - i}"),
+
+        _case("health", "health", "get", "/api/health/", role=None),
+        _case("health", "pool", "get", "/api/health/pool"),
+        _case("metrics", "metrics", "get", "/metrics", role=None),
+    ]
+
+
+def _resolve(value, i):
+    return value(i) if callable(value) else value
+
+
+def _call(client, case, headers, i):
+    kwargs = {k: _resolve(v, i) for k, v in case["kwargs"].items()}
+    resp = getattr(client, case["method"])(_resolve(case["url"], i), headers=headers, **kwargs)
+    body = resp.get_data()  # drains streamed responses too
+    return resp.status_code, len(body)
+
+
+def run_case(client, case, headers, repeat):
+    global _query_count
+    timings = []
+    status = size = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        status, size = _call(client, case, headers, i)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    _query_count = 0
+    tracemalloc.start()
+    _call(client, case, headers, repeat)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "status": status,
+        "median_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        "min_ms": round(timings[0], 2),
+        "queries": _query_count,
+        "peak_kb": round(peak / 1024, 1),
+        "kb": round(size / 1024, 1),
+    }
+
+
+def _compare(results, previous_path):
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {(r["blueprint"], r["case"]): r for r in json.load(f)["results"]}
+    for r in results:
+        old = previous.get((r["blueprint"], r["case"]))
+        if old and old["median_ms"]:
+            r["vs_prev"] = f"{(r['median_ms'] - old['median_ms']) / old['median_ms'] * 100:+.0f}%"
+            if r["queries"] != old["queries"]:
+                r["vs_prev"] += f" q{old['queries']}->{r['queries']}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type=int, default=10000, help="Ledger/activity rows; other tables scale with it.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", default="", help="Comma-separated blueprints to run.")
+    parser.add_argument("--compare", help="Earlier results JSON to diff against.")
+    parser.add_argument("--output", help="Results path (default: benchmarks/results/routes-<scale>-<time>.json).")
+    args = parser.parse_args()
+
+    stub_port = _free_port()
+    stub = make_server("127.0.0.1", stub_port)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{stub_port}/v1"
+    os.environ["OPENAI_API_KEY"] = "stub"
+    os.environ["OPENAI_MAX_RETRIES"] = "0"
+    os.environ.setdefault("SLOW_QUERY_MS", "0")
+    os.environ.setdefault("METRICS_PUBLIC", "1")  # the metrics case scrapes without a token
+    scratch = tempfile.mkdtemp(prefix="bench-routes-")
+    os.environ["VECTOR_STORE"] = "local"
+    os.environ["VECTOR_STORE_PATH"] = os.path.join(scratch, "vectors")
+
+    app, db_path = make_app()
+    app.config["UPLOAD_FOLDER"] = scratch
+    from app import db
+    from app.models import Reimbursement
+
+    seed_start = time.perf_counter()
+    with app.app_context():
+        user_ids, sizes = seed_all(args.scale)
+        pending = [r.id for r in db.session.query(Reimbursement.id).filter_by(status="pending").limit(1000)]
+    print(f"Seeded in {time.perf_counter() - seed_start:.1f}s ({db_path})")
+
+    image_name = "bench-image.jpg"
+    with open(os.path.join(scratch, image_name), "wb") as f:
+        f.write(_JPEG)
+
+    headers = {"admin": auth_headers(app, user_ids[0]), "worker": auth_headers(app, user_ids[1]), None: {}}
+    client = app.test_client()
+    event.listen(Engine, "before_cursor_execute", _count_query)
+
+    only = {b.strip() for b in args.only.split(",") if b.strip()}
+    results = []
+    for case in build_cases(sizes, pending, image_name):
+        if only and case["blueprint"] not in only:
+            continue
+        result = run_case(client, case, headers[case["role"]], args.repeat)
+        results.append({"blueprint": case["blueprint"], "case": case["name"], "method": case["method"].upper(), **result})
+
+    event.remove(Engine, "before_cursor_execute", _count_query)
+    stub.shutdown()
+
+    columns = ["blueprint", "case", "status", "median_ms", "p95_ms", "queries", "peak_kb", "kb"]
+    if args.compare:
+        _compare(results, args.compare)
+        columns.append("vs_prev")
+    print_table(results, columns)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"routes-{args.scale}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "scale": args.scale,
+            "sizes": sizes,
+            "repeat": args.repeat,
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "results": results,
+        }, f, indent=2)
+    print(f"Saved {output}")
+    os.remove(db_path)
+    shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Throughput of gunicorn worker profiles while OpenAI is slow.
+
+Starts the OpenAI stub with a fixed latency, then runs gunicorn once per profile
+and fires concurrent receipt searches (each needs one embeddings call upstream).
+
+    cd backend && python -m benchmarks.slow_upstream --latency 0.3 --concurrency 32
+"""
+import os
+import sys
+import time
+import socket
+import shutil
+import argparse
+import tempfile
+import threading
+import statistics
+import subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.harness import make_app, auth_headers, print_table
+from benchmarks.datagen import seed_users, seed_receipts
+from stubs.openai_stub import make_server
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(base, timeout=30):
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            urllib.request.urlopen(base + "/api/health/", timeout=1).read()
+            return True
+        except Exception:
+            time.sleep(0.2)
+    return False
+
+
+def _run_load(base, headers, total, concurrency):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        req = urllib.request.Request(f"{base}/api/receipts/search?q=milk+{i}", headers=headers)
+        start = time.perf_counter()
+        try:
+            urllib.request.urlopen(req, timeout=60).read()
+            ok = True
+        except Exception:
+            ok = False
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            latencies.append(elapsed)
+            if not ok:
+                errors += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "req_per_s": round(total / wall, 1),
+        "p50_ms": round(statistics.median(latencies)),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1]),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub OpenAI latency in seconds.")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=256)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--profiles", default="sync,gthread,gevent")
+    args = parser.parse_args()
+
+    app, db_path = make_app()
+    with app.app_context():
+        user_ids = seed_users()
+        seed_receipts(1000, user_ids)
+    headers = auth_headers(app, user_ids[0])
+
+    stub = make_server(port=0, latency=args.latency)
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    index_dir = tempfile.mkdtemp(prefix="bench-index-")
+
+    rows = []
+    for profile in args.profiles.split(","):
+        port = _free_port()
+        env = dict(
+            os.environ,
+            DATABASE_URL="sqlite:///" + db_path,
+            OPENAI_BASE_URL=f"http://127.0.0.1:{stub.server_port}/v1",
+            OPENAI_API_KEY="stub",
+            VECTOR_STORE="local",
+            VECTOR_STORE_PATH=index_dir,
+            EMBEDDING_CACHE_PATH="",
+            PORT=str(port),
+            GUNICORN_WORKERS=str(args.workers),
+            GUNICORN_WORKER_CLASS=profile,
+        )
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--config", "gunicorn_config.py", "run:app"],
+            cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            base = f"http://127.0.0.1:{port}"
+            if not _wait_ready(base):
+                rows.append({"profile": profile, "errors": "did not start"})
+                continue
+            result = _run_load(base, headers, args.requests, args.concurrency)
+            rows.append({"profile": profile, **result})
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    print(f"{args.workers} workers, upstream latency {args.latency * 1000:.0f} ms, "
+          f"{args.requests} searches at concurrency {args.concurrency}")
+    print_table(rows, ["profile", "req_per_s", "p50_ms", "p95_ms", "errors"])
+    stub.shutdown()
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""Startup cost: module import time of the app, create_app() wall time, and gunicorn
+cold start to the first successful response.
+
+    cd backend && python -m benchmarks.startup
+    python -m benchmarks.startup --runs 10 --top 25
+    python -m benchmarks.startup --check --budget-ms 1500    # exit 1 on regression (CI)
+
+Import times come from `python -X importtime` in a fresh interpreter per run, so they
+include everything `from app import create_app; create_app()` pulls in. --check also
+fails if a module that should only load on first use (OpenAI/Pinecone SDKs, numpy,
+pyinstrument) is imported at boot.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+import urllib.request
+from benchmarks.harness import print_table
+from benchmarks.routes import RESULTS_DIR, _git_revision
+from benchmarks.slow_upstream import BACKEND_DIR, _free_port
+
+# Imported on first use by the code that needs them; none should load while booting.
+DEFERRED_MODULES = ("openai", "pinecone", "numpy", "pyinstrument")
+
+_BOOT = "from app import create_app; create_app()"
+_TIMED_BOOT = (
+    "import time; _t = time.perf_counter(); " + _BOOT + "; "
+    "print((time.perf_counter() - _t) * 1000)"
+)
+
+
+def _env(db_path):
+    return dict(
+        os.environ,
+        DATABASE_URL="sqlite:///" + db_path,
+        EMBEDDING_CACHE_PATH="",
+    )
+
+
+def parse_importtime(stderr):
+    """{module: (self_us, cumulative_us, depth)} from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        if not self_us.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def measure_imports(env):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _BOOT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(proc.stderr)
+
+
+def measure_create_app(env):
+    proc = subprocess.run(
+        [sys.executable, "-c", _TIMED_BOOT],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def measure_cold_start(env, scratch, timeout=60):
+    """Milliseconds from spawning gunicorn (one worker) to the first 200 from /api/health/."""
+    port = _free_port()
+    env = dict(
+        env,
+        PORT=str(port),
+        GUNICORN_WORKERS="1",
+        PROMETHEUS_MULTIPROC_DIR=tempfile.mkdtemp(dir=scratch),
+    )
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn_config.py", "run:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/api/health/", timeout=1).read()
+                return (time.perf_counter() - start) * 1000
+            except Exception:
+                if proc.poll() is not None:
+                    raise SystemExit("gunicorn exited during startup")
+                time.sleep(0.01)
+        raise SystemExit("gunicorn did not respond")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list (by cumulative time).")
+    parser.add_argument("--skip-gunicorn", action="store_true")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if a deferred module loads or a budget is exceeded.")
+    parser.add_argument("--budget-ms", type=float, help="With --check: maximum median create_app() time.")
+    parser.add_argument("--output", help="Results path (default: benchmarks/results/startup-<time>.json).")
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="bench-startup-")
+    env = _env(os.path.join(scratch, "startup.db"))
+    try:
+        imports = measure_imports(env)
+        for _ in range(args.runs - 1):
+            # Keep the fastest of the runs per module: the noise is all on the slow side.
+            for name, (self_us, cumulative_us, depth) in measure_imports(env).items():
+                if name in imports and cumulative_us < imports[name][1]:
+                    imports[name] = (self_us, cumulative_us, depth)
+        create_app_ms = [measure_create_app(env) for _ in range(args.runs)]
+        cold_start_ms = [] if args.skip_gunicorn else [measure_cold_start(env, scratch) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    top_level = {n: v for n, v in imports.items() if v[2] == 0}
+    total_ms = sum(v[1] for v in top_level.values()) / 1000
+    slowest = sorted(imports.items(), key=lambda kv: -kv[1][1])[: args.top]
+    rows = [
+        {"module": name, "self_ms": round(s / 1000, 1), "cumulative_ms": round(c / 1000, 1)}
+        for name, (s, c, _) in slowest
+    ]
+    if rows:
+        print_table(rows, ["module", "self_ms", "cumulative_ms"])
+    loaded = [m for m in DEFERRED_MODULES if m in imports]
+
+    summary = {
+        "modules_imported": len(imports),
+        "import_ms": round(total_ms, 1),
+        "create_app_ms": round(statistics.median(create_app_ms), 1),
+        "cold_start_ms": round(statistics.median(cold_start_ms), 1) if cold_start_ms else None,
+        "deferred_loaded": loaded,
+    }
+    print()
+    print(f"{summary['modules_imported']} modules, {summary['import_ms']} ms of imports (fastest of {args.runs})")
+    print(f"create_app(): median {summary['create_app_ms']} ms over {args.runs} runs")
+    if cold_start_ms:
+        print(f"gunicorn cold start to first response: median {summary['cold_start_ms']} ms")
+    if loaded:
+        print("Loaded at boot but expected on first use only:", ", ".join(loaded))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"startup-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({
+            "revision": _git_revision(),
+            "python": sys.version.split()[0],
+            "runs": args.runs,
+            **summary,
+            "slowest": rows,
+        }, f, indent=2)
+    print(f"Saved {output}")
+
+    if args.check:
+        failed = bool(loaded)
+        if args.budget_ms is not None and summary["create_app_ms"] > args.budget_ms:
+            print(f"create_app() {summary['create_app_ms']} ms exceeds the {args.budget_ms} ms budget")
+            failed = True
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""Closing-time upload burst: staff arrive over a short window and each uploads a
+handful of receipts, checking the receipt list between uploads.
+
+By default everything runs offline: the OpenAI and Pinecone stubs (with the given
+latency distributions and error rates) and gunicorn on a throwaway SQLite database.
+
+    cd backend && python -m benchmarks.upload_burst --users 15 --ramp 30
+    python -m benchmarks.upload_burst --ocr-latency lognormal:3:0.5 --error-rate 0.05 --worker-class gevent
+    python -m benchmarks.upload_burst --target https://staging.example.com --username admin --password ...
+
+Each virtual user: arrives at a random time within --ramp seconds, uploads
+--min-uploads..--max-uploads receipts with exponential think time (--think mean)
+between them, and lists receipts after each upload; one in four also searches.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from benchmarks.harness import make_app, auth_headers, print_table
+from benchmarks.datagen import seed_users, seed_receipts
+from benchmarks.routes import _JPEG
+from benchmarks.slow_upstream import BACKEND_DIR, _free_port, _wait_ready
+from stubs import openai_stub, pinecone_stub
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, name, elapsed_ms, status):
+        with self._lock:
+            self.samples[name].append(elapsed_ms)
+            self.statuses[name][status] += 1
+
+    def rows(self, wall):
+        out = []
+        for name, samples in sorted(self.samples.items()):
+            samples.sort()
+            pct = lambda p: round(samples[min(len(samples) - 1, int(len(samples) * p))])
+            statuses = self.statuses[name]
+            out.append({
+                "request": name,
+                "count": len(samples),
+                "per_s": round(len(samples) / wall, 2),
+                "p50_ms": pct(0.5),
+                "p95_ms": pct(0.95),
+                "p99_ms": pct(0.99),
+                "max_ms": round(samples[-1]),
+                "errors": sum(n for s, n in statuses.items() if not 200 <= s < 300),
+                "statuses": ",".join(f"{s}:{n}" for s, n in sorted(statuses.items())),
+            })
+        return out
+
+
+def _request(recorder, name, req, timeout=120):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception:
+        status = 0  # connection error / timeout
+    recorder.add(name, (time.perf_counter() - start) * 1000, status)
+    return status
+
+
+def _multipart(field, filename, content):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"{field}\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: image/jpeg\r\n\r\n"
+    ).encode("utf-8") + content + f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _virtual_user(base, headers, recorder, rng, args, start_at):
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    uploads = rng.randint(args.min_uploads, args.max_uploads)
+    for n in range(uploads):
+        # Bytes after the JPEG end marker make every photo distinct (and its fake OCR).
+        image = _JPEG + os.urandom(rng.randint(20_000, 200_000))
+        body, content_type = _multipart("file", f"receipt-{n}.jpg", image)
+        req = urllib.request.Request(
+            f"{base}/api/receipts/upload", data=body, method="POST",
+            headers={**headers, "Content-Type": content_type},
+        )
+        _request(recorder, "POST /receipts/upload", req)
+        _request(recorder, "GET /receipts/", urllib.request.Request(f"{base}/api/receipts/", headers=headers))
+        if rng.random() < 0.25:
+            q = rng.choice(["milk", "costco", "cups", "coffee amount>20"])
+            url = f"{base}/api/receipts/search?q={urllib.request.quote(q)}"
+            _request(recorder, "GET /receipts/search", urllib.request.Request(url, headers=headers))
+        if n < uploads - 1:
+            time.sleep(rng.expovariate(1 / args.think) if args.think else 0)
+
+
+def run_burst(base, headers_list, args):
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    begin = time.monotonic()
+    threads = []
+    for i in range(args.users):
+        start_at = begin + rng.uniform(0, args.ramp)
+        t = threading.Thread(
+            target=_virtual_user,
+            args=(base, headers_list[i % len(headers_list)], recorder, random.Random(rng.random()), args, start_at),
+        )
+        t.start()
+        threads.append(t)
+    for t in threads:
+        t.join()
+    return recorder, time.monotonic() - begin
+
+
+def _login(base, username, password):
+    req = urllib.request.Request(
+        f"{base}/api/auth/login", data=json.dumps({"username": username, "password": password}).encode("utf-8"),
+        headers={"Content-Type": "application/json"}, method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        return {"Authorization": "Bearer " + json.loads(resp.read())["token"]}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=15)
+    parser.add_argument("--ramp", type=float, default=30.0, help="Seconds over which users arrive.")
+    parser.add_argument("--min-uploads", type=int, default=3)
+    parser.add_argument("--max-uploads", type=int, default=8)
+    parser.add_argument("--think", type=float, default=2.0, help="Mean seconds between a user's uploads.")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--target", help="Run against this base URL instead of a local gunicorn + stubs.")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin0691")
+    parser.add_argument("--ocr-latency", default="lognormal:2.5:0.4", help="Stub chat.completions latency spec.")
+    parser.add_argument("--embedding-latency", default="lognormal:0.15:0.4", help="Stub embeddings latency spec.")
+    parser.add_argument("--pinecone-latency", default="lognormal:0.05:0.5", help="Stub Pinecone latency spec.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Stub 500 rate (OpenAI and Pinecone).")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Stub 429 rate (OpenAI).")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--worker-class", default="gthread")
+    parser.add_argument("--output", help="Write the results table as JSON here.")
+    args = parser.parse_args()
+
+    if args.target:
+        base = args.target.rstrip("/")
+        recorder, wall = run_burst(base, [_login(base, args.username, args.password)], args)
+        report(recorder, wall, base, headers=None, args=args)
+        return
+
+    scratch = tempfile.mkdtemp(prefix="bench-burst-")
+    app, db_path = make_app(os.path.join(scratch, "burst.db"))
+    with app.app_context():
+        user_ids = seed_users(args.users)
+        seed_receipts(2000, user_ids)
+    headers_list = [auth_headers(app, uid) for uid in user_ids]
+
+    openai = openai_stub.make_server(
+        port=0, latency=args.embedding_latency, ocr_latency=args.ocr_latency,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed,
+    )
+    pinecone = pinecone_stub.make_server(port=0, latency=args.pinecone_latency, error_rate=args.error_rate, seed=args.seed)
+    for server in (openai, pinecone):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    port = _free_port()
+    env = dict(
+        os.environ,
+        DATABASE_URL="sqlite:///" + db_path,
+        UPLOAD_FOLDER=os.path.join(scratch, "uploads"),
+        OPENAI_BASE_URL=f"http://127.0.0.1:{openai.server_port}/v1",
+        OPENAI_API_KEY="stub",
+        VECTOR_STORE="pinecone",
+        PINECONE_API_KEY="stub",
+        PINECONE_HOST=f"http://127.0.0.1:{pinecone.server_port}",
+        EMBEDDING_CACHE_PATH="",
+        PORT=str(port),
+        GUNICORN_WORKERS=str(args.workers),
+        GUNICORN_WORKER_CLASS=args.worker_class,
+        PROMETHEUS_MULTIPROC_DIR=os.path.join(scratch, "metrics"),
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn_config.py", "run:app"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        if not _wait_ready(base):
+            raise SystemExit("gunicorn did not start")
+        recorder, wall = run_burst(base, headers_list, args)
+        report(recorder, wall, base, headers_list[0], args)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+        openai.shutdown()
+        pinecone.shutdown()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def report(recorder, wall, base, headers, args):
+    rows = recorder.rows(wall)
+    print(f"{args.users} users over {args.ramp:.0f}s, {wall:.1f}s total")
+    print_table(rows, ["request", "count", "per_s", "p50_ms", "p95_ms", "p99_ms", "max_ms", "errors", "statuses"])
+    try:
+        with urllib.request.urlopen(urllib.request.Request(f"{base}/api/health/", headers=headers or {}), timeout=10) as r:
+            health = json.loads(r.read())
+        print("Breakers:", json.dumps(health.get("breakers", {})))
+    except Exception as e:
+        print(f"Health check failed: {e}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "wall_s": round(wall, 2), "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
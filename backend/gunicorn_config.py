@@ -1,8 +1,86 @@
 # Gunicorn config for production (Render, Railway, etc.)
 # Hosts bind to 0.0.0.0 so the platform can route traffic; PORT is set by the host.
+#
+# GUNICORN_WORKER_CLASS picks the concurrency profile:
+#   sync    - one request per worker (previous default)
+#   gthread - GUNICORN_THREADS requests per worker (default); good fit for this app,
+#             whose requests mostly wait on OpenAI, Pinecone and the database
+#   gevent  - GUNICORN_WORKER_CONNECTIONS greenlets per worker; needs `gevent`
+#             (and `psycogreen` for Postgres) installed
 import os
+import glob
+import shutil
+import tempfile
 
 bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
 workers = int(os.environ.get("GUNICORN_WORKERS", "4"))
-threads = 1
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", "8")) if worker_class == "gthread" else 1
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "100"))
 timeout = 120
+graceful_timeout = 30
+keepalive = 5
+
+# Load the app once in the master so workers fork with it already imported. Off by
+# default for gevent: the master imports the app before gunicorn patches the worker, so
+# module-level threading locks would stay native and one held across I/O would stall
+# every greenlet. GUNICORN_PRELOAD=1 with gevent patches the master here first.
+preload_app = os.environ.get(
+    "GUNICORN_PRELOAD", "0" if worker_class == "gevent" else "1"
+).lower() not in ("0", "false", "no")
+if preload_app and worker_class == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
+# Recycle workers periodically (jittered so they don't all restart together).
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+# Size each worker's DB pool to the number of requests it can run at once. Read by
+# create_app (see SQLALCHEMY_ENGINE_OPTIONS); explicit env settings win.
+if worker_class == "gevent":
+    os.environ.setdefault("DB_POOL_SIZE", "10")
+    os.environ.setdefault("DB_MAX_OVERFLOW", "20")
+else:
+    os.environ.setdefault("DB_POOL_SIZE", str(threads))
+    os.environ.setdefault("DB_MAX_OVERFLOW", str(max(2, threads // 2)))
+
+# Workers write Prometheus samples here so /metrics can sum them (see app/metrics.py).
+# Must be set before the app (and prometheus_client) is imported; cleared per start.
+# Our default directory is wiped; an operator-set one only loses its *.db sample files.
+_default_metrics_dir = os.path.join(tempfile.gettempdir(), f"cafe-metrics-{os.environ.get('PORT', '5000')}")
+metrics_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", _default_metrics_dir)
+if metrics_dir == _default_metrics_dir:
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+else:
+    for _path in glob.glob(os.path.join(metrics_dir, "*.db")):
+        try:
+            os.remove(_path)
+        except OSError:
+            pass
+os.makedirs(metrics_dir, exist_ok=True)
+
+
+def child_exit(server, worker):
+    try:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+    except ImportError:
+        pass
+
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning("psycogreen not installed; psycopg2 calls will block the gevent loop")
+
+    if preload_app:
+        # Connections opened in the master must not be shared with forked workers.
+        from app import db
+        from run import app
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
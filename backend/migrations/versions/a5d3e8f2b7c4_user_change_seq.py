@@ -0,0 +1,26 @@
+"""users.change_seq for collection ETags
+
+Revision ID: a5d3e8f2b7c4
+Revises: f4c2a9d7e6b1
+Create Date: 2026-10-19 17:05:12.604219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5d3e8f2b7c4'
+down_revision = 'f4c2a9d7e6b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('users', sa.Column('change_seq', sa.BigInteger(), nullable=False, server_default='0'))
+    op.create_index('ix_users_change_seq', 'users', ['change_seq'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_users_change_seq', table_name='users')
+    op.drop_column('users', 'change_seq')
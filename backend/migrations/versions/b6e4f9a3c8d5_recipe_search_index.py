@@ -0,0 +1,133 @@
+"""recipe full-text search index and normalized ingredients
+
+Revision ID: b6e4f9a3c8d5
+Revises: a5d3e8f2b7c4
+Create Date: 2026-10-19 18:21:37.481902
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e4f9a3c8d5'
+down_revision = 'a5d3e8f2b7c4'
+branch_labels = None
+depends_on = None
+
+# Snapshot of app/services/recipe_search.normalize_ingredient at this revision.
+_WORD_RE = re.compile(r"[^\W_]+(?:[./][^\W_]+)?")
+_QUANTITY_RE = re.compile(r"^(\d+(?:[./]\d+)?|[½¼¾⅓⅔⅛]|a|an|one|two|three|four|half|few|some)$")
+_UNITS = {
+    "c", "cup", "tbsp", "tablespoon", "tsp", "teaspoon", "oz", "ounce", "fl", "floz", "ml",
+    "l", "liter", "litre", "g", "gram", "kg", "lb", "pound", "shot", "pump", "pinch", "dash",
+    "splash", "scoop", "slice", "can", "bottle", "drop", "handful", "piece", "sprig", "bag",
+    "packet", "stick", "x", "of",
+}
+_CONJUNCTIONS = {"and", "or", "n"}
+
+
+def _is_measure(word):
+    return bool(_QUANTITY_RE.match(word)) or word in _UNITS or word.rstrip("s") in _UNITS or (
+        word.endswith("es") and word[:-2] in _UNITS
+    )
+
+
+def _normalize(line):
+    value = re.sub(r"\([^)]*\)", " ", str(line or "").lower()).split(",")[0].replace("&", " and ")
+    words = _WORD_RE.findall(value)
+    while len(words) > 1 and _is_measure(words[0]) and words[1] not in _CONJUNCTIONS:
+        words.pop(0)
+    return " ".join(words)[:120] or None
+
+
+def _backfill(bind):
+    recipes = sa.table(
+        'recipes',
+        sa.column('id', sa.Integer),
+        sa.column('description', sa.Text),
+        sa.column('ingredients', sa.JSON),
+        sa.column('instructions', sa.Text),
+        sa.column('search_text', sa.Text),
+    )
+    recipe_ingredients = sa.table(
+        'recipe_ingredients',
+        sa.column('recipe_id', sa.Integer),
+        sa.column('name', sa.String),
+    )
+    rows = bind.execute(sa.select(
+        recipes.c.id, recipes.c.description, recipes.c.ingredients, recipes.c.instructions
+    )).fetchall()
+    for row in rows:
+        lines = row.ingredients or []
+        if isinstance(lines, str):
+            lines = re.split(r"[\n,]", lines)
+        lines = [str(i).strip() for i in lines if str(i).strip()]
+        parts = [row.description or ""] + lines + [row.instructions or ""]
+        bind.execute(
+            recipes.update().where(recipes.c.id == row.id).values(
+                search_text=" ".join(p for p in parts if p).strip() or None
+            )
+        )
+        names = list(dict.fromkeys(filter(None, map(_normalize, lines))))
+        if names:
+            bind.execute(recipe_ingredients.insert(), [{"recipe_id": row.id, "name": n} for n in names])
+
+
+def upgrade():
+    op.add_column('recipes', sa.Column('search_text', sa.Text(), nullable=True))
+    op.create_table(
+        'recipe_ingredients',
+        sa.Column('recipe_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=120), nullable=False),
+        sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('recipe_id', 'name'),
+    )
+    op.create_index('ix_recipe_ingredients_name', 'recipe_ingredients', ['name'], unique=False)
+
+    bind = op.get_bind()
+    _backfill(bind)
+
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_recipes_search_tsv ON recipes USING gin (("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(search_text, '')), 'B')))"
+        )
+    elif bind.dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE recipes_fts USING fts5("
+            "title, search_text, content='recipes', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER recipes_fts_ai AFTER INSERT ON recipes BEGIN "
+            "INSERT INTO recipes_fts(rowid, title, search_text) VALUES (new.id, new.title, new.search_text); END"
+        )
+        op.execute(
+            "CREATE TRIGGER recipes_fts_ad AFTER DELETE ON recipes BEGIN "
+            "INSERT INTO recipes_fts(recipes_fts, rowid, title, search_text) "
+            "VALUES ('delete', old.id, old.title, old.search_text); END"
+        )
+        op.execute(
+            "CREATE TRIGGER recipes_fts_au AFTER UPDATE OF title, search_text ON recipes BEGIN "
+            "INSERT INTO recipes_fts(recipes_fts, rowid, title, search_text) "
+            "VALUES ('delete', old.id, old.title, old.search_text); "
+            "INSERT INTO recipes_fts(rowid, title, search_text) VALUES (new.id, new.title, new.search_text); END"
+        )
+        op.execute("INSERT INTO recipes_fts(recipes_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_recipes_search_tsv")
+    elif bind.dialect.name == 'sqlite':
+        for trigger in ('recipes_fts_ai', 'recipes_fts_ad', 'recipes_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS recipes_fts")
+
+    op.drop_index('ix_recipe_ingredients_name', table_name='recipe_ingredients')
+    op.drop_table('recipe_ingredients')
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_column('search_text')
@@ -0,0 +1,94 @@
+"""receipt full-text search index
+
+Revision ID: c5e1f2a3b4d6
+Revises: b407a24028a3
+Create Date: 2026-10-19 09:12:41.220310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e1f2a3b4d6'
+down_revision = 'b407a24028a3'
+branch_labels = None
+depends_on = None
+
+
+def _backfill_search_text(bind):
+    receipts = sa.table(
+        'receipts',
+        sa.column('id', sa.Integer),
+        sa.column('merchant_name', sa.String),
+        sa.column('transaction_date', sa.Date),
+        sa.column('ocr_raw', sa.JSON),
+        sa.column('search_text', sa.Text),
+    )
+    rows = bind.execute(sa.select(
+        receipts.c.id, receipts.c.merchant_name, receipts.c.transaction_date, receipts.c.ocr_raw
+    )).fetchall()
+    for row in rows:
+        ocr = row.ocr_raw or {}
+        parts = [row.merchant_name or ""]
+        parts += [str(it["name"]) for it in (ocr.get("items") or []) if isinstance(it, dict) and it.get("name")]
+        parts += [str(ocr[k]) for k in ("category_suggestion", "payment_method") if ocr.get(k)]
+        if row.transaction_date:
+            parts += [row.transaction_date.isoformat(), row.transaction_date.strftime("%B %Y")]
+        bind.execute(
+            receipts.update().where(receipts.c.id == row.id).values(
+                search_text=" ".join(p for p in parts if p).strip() or None
+            )
+        )
+
+
+def upgrade():
+    with op.batch_alter_table('receipts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('search_text', sa.Text(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_receipts_transaction_date'), ['transaction_date'], unique=False)
+        batch_op.create_index(batch_op.f('ix_receipts_total_amount'), ['total_amount'], unique=False)
+        batch_op.create_index(batch_op.f('ix_receipts_uploaded_by'), ['uploaded_by'], unique=False)
+
+    bind = op.get_bind()
+    _backfill_search_text(bind)
+
+    if bind.dialect.name == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_receipts_search_tsv ON receipts "
+            "USING gin (to_tsvector('english', coalesce(search_text, '')))"
+        )
+    elif bind.dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE receipts_fts USING fts5("
+            "search_text, content='receipts', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER receipts_fts_ai AFTER INSERT ON receipts BEGIN "
+            "INSERT INTO receipts_fts(rowid, search_text) VALUES (new.id, new.search_text); END"
+        )
+        op.execute(
+            "CREATE TRIGGER receipts_fts_ad AFTER DELETE ON receipts BEGIN "
+            "INSERT INTO receipts_fts(receipts_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); END"
+        )
+        op.execute(
+            "CREATE TRIGGER receipts_fts_au AFTER UPDATE ON receipts BEGIN "
+            "INSERT INTO receipts_fts(receipts_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+            "INSERT INTO receipts_fts(rowid, search_text) VALUES (new.id, new.search_text); END"
+        )
+        op.execute("INSERT INTO receipts_fts(receipts_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_receipts_search_tsv")
+    elif bind.dialect.name == 'sqlite':
+        for trigger in ('receipts_fts_ai', 'receipts_fts_ad', 'receipts_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS receipts_fts")
+
+    with op.batch_alter_table('receipts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_receipts_uploaded_by'))
+        batch_op.drop_index(batch_op.f('ix_receipts_total_amount'))
+        batch_op.drop_index(batch_op.f('ix_receipts_transaction_date'))
+        batch_op.drop_column('search_text')
@@ -0,0 +1,26 @@
+"""receipt list indexes
+
+Revision ID: d7a4c9e2f1b0
+Revises: c5e1f2a3b4d6
+Create Date: 2026-10-19 11:02:15.604187
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a4c9e2f1b0'
+down_revision = 'c5e1f2a3b4d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_receipts_created_at_id', 'receipts', ['created_at', 'id'], unique=False)
+    op.create_index('ix_receipts_merchant_lower', 'receipts', [sa.text('lower(merchant_name)')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_receipts_merchant_lower', table_name='receipts')
+    op.drop_index('ix_receipts_created_at_id', table_name='receipts')
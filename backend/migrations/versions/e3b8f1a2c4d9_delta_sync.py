@@ -0,0 +1,63 @@
+"""delta sync: updated_at, change_seq, tombstones
+
+Revision ID: e3b8f1a2c4d9
+Revises: d7a4c9e2f1b0
+Create Date: 2026-10-19 14:20:41.118532
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b8f1a2c4d9'
+down_revision = 'd7a4c9e2f1b0'
+branch_labels = None
+depends_on = None
+
+# Plain ADD COLUMN (no batch mode): on SQLite, recreating receipts would drop its FTS
+# triggers. Existing rows keep updated_at NULL and change_seq 0, i.e. older than any
+# sync token.
+_UPDATED_AT = ('ledger_entries', 'receipts', 'reimbursements', 'inventory_items')
+_CHANGE_SEQ = ('ledger_entries', 'receipts', 'reimbursements', 'recipes', 'inventory_items')
+
+
+def upgrade():
+    for table in _UPDATED_AT:
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), nullable=True))
+    for table in _CHANGE_SEQ:
+        op.add_column(table, sa.Column('change_seq', sa.BigInteger(), nullable=False, server_default='0'))
+        op.create_index(f'ix_{table}_change_seq', table, ['change_seq'], unique=False)
+
+    counter = op.create_table(
+        'change_counter',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.Column('tombstone_floor', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.bulk_insert(counter, [{'id': 1, 'value': 0, 'tombstone_floor': 0}])
+
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('entity_type', sa.String(length=40), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('change_seq', sa.BigInteger(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_tombstones_entity_type_change_seq', 'tombstones', ['entity_type', 'change_seq'], unique=False)
+    op.create_index('ix_tombstones_deleted_at', 'tombstones', ['deleted_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tombstones_deleted_at', table_name='tombstones')
+    op.drop_index('ix_tombstones_entity_type_change_seq', table_name='tombstones')
+    op.drop_table('tombstones')
+    op.drop_table('change_counter')
+    for table in _CHANGE_SEQ:
+        op.drop_index(f'ix_{table}_change_seq', table_name=table)
+        op.drop_column(table, 'change_seq')
+    for table in _UPDATED_AT:
+        op.drop_column(table, 'updated_at')
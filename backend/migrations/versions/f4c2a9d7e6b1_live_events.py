@@ -0,0 +1,32 @@
+"""live events outbox
+
+Revision ID: f4c2a9d7e6b1
+Revises: e3b8f1a2c4d9
+Create Date: 2026-10-19 16:05:12.730944
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4c2a9d7e6b1'
+down_revision = 'e3b8f1a2c4d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'live_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_live_events_created_at', 'live_events', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_live_events_created_at', table_name='live_events')
+    op.drop_table('live_events')
@@ -0,0 +1,72 @@
+"""Latency distributions and injected errors shared by the stub servers.
+
+Latency specs (seconds):
+  0.3                 fixed
+  uniform:0.1:0.6     uniform between the bounds
+  lognormal:0.8:0.5   lognormal with that median and sigma (long right tail, like real APIs)
+  exp:0.4             exponential with that mean
+"""
+import math
+import time
+import random
+import threading
+
+
+class LatencyModel:
+    def __init__(self, spec="0", seed=None):
+        self.spec = str(spec)
+        kind, _, args = self.spec.partition(":")
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        if not args:
+            value = float(kind)
+            self._sample = lambda rng: value
+        elif kind == "uniform":
+            low, high = (float(x) for x in args.split(":"))
+            self._sample = lambda rng: rng.uniform(low, high)
+        elif kind == "lognormal":
+            median, sigma = (float(x) for x in args.split(":"))
+            self._sample = lambda rng: rng.lognormvariate(math.log(median), sigma)
+        elif kind == "exp":
+            mean = float(args)
+            self._sample = lambda rng: rng.expovariate(1 / mean)
+        else:
+            raise ValueError(f"Unknown latency spec {spec!r}")
+
+    def sample(self):
+        with self._lock:
+            return max(0.0, self._sample(self._rng))
+
+    def sleep(self):
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class FaultInjector:
+    """Decides per request whether to fail: error_rate -> 500, rate_limit_rate -> 429."""
+
+    def __init__(self, error_rate=0.0, rate_limit_rate=0.0, retry_after=1, seed=None):
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def pick(self):
+        """Returns (status, headers) for an injected failure, or None to serve normally."""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return 429, {"Retry-After": str(self.retry_after)}
+        if roll < self.rate_limit_rate + self.error_rate:
+            return 500, {}
+        return None
+
+
+def add_fault_arguments(parser, default_latency="0"):
+    parser.add_argument("--latency", default=default_latency, help="Latency spec (see stubs/faults.py).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction answered with 429 + Retry-After.")
+    parser.add_argument("--seed", type=int, default=None)
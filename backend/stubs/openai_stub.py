@@ -0,0 +1,169 @@
+"""Stand-in for the OpenAI API subset we use (embeddings, chat.completions receipt OCR),
+for offline reindex runs and load tests.
+
+    python -m stubs.openai_stub --port 8089 --ocr-latency lognormal:2.5:0.4 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=stub flask --app run:app reindex-receipts
+
+Embeddings are deterministic hashed bag-of-words vectors, so texts sharing words
+get similar vectors and repeated runs give identical results. Chat completions
+return a fake receipt derived from a hash of the request's image, so the same image
+always "reads" the same way.
+"""
+import json
+import random
+import hashlib
+import argparse
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from stubs.faults import LatencyModel, FaultInjector, add_fault_arguments
+
+DIM = 1536
+
+MERCHANTS = ["Costco Wholesale", "Trader Joe's", "Walmart", "Target", "Smart & Final",
+             "Restaurant Depot", "Safeway", "H Mart"]
+ITEMS = ["Whole milk", "Oat milk", "Paper cups 16oz", "Lids", "Coffee beans", "Espresso roast",
+         "Sugar", "Vanilla syrup", "Napkins", "Bagels", "Cream cheese", "Croissants", "Matcha powder"]
+
+
+def fake_embedding(text, dim=DIM):
+    vec = [0.0] * dim
+    for token in (text or "").lower().split():
+        h = hashlib.md5(token.encode("utf-8")).digest()
+        for k in range(0, 8, 2):
+            idx = int.from_bytes(h[k:k + 2], "little") % dim
+            vec[idx] += 1.0 if h[k + 8] & 1 else -1.0
+    norm = sum(v * v for v in vec) ** 0.5 or 1.0
+    return [v / norm for v in vec]
+
+
+def fake_receipt(seed_bytes):
+    """Deterministic receipt JSON (the shape run_ocr asks GPT-4o for)."""
+    rng = random.Random(hashlib.sha256(seed_bytes).digest())
+    items = [
+        {"name": rng.choice(ITEMS), "quantity": rng.randint(1, 4), "price": round(rng.uniform(1.5, 30), 2)}
+        for _ in range(rng.randint(2, 12))
+    ]
+    subtotal = round(sum(i["quantity"] * i["price"] for i in items), 2)
+    tax = round(subtotal * 0.0875, 2)
+    return {
+        "merchant_name": rng.choice(MERCHANTS),
+        "transaction_date": (date.today() - timedelta(days=rng.randint(0, 30))).isoformat(),
+        "total_amount": round(subtotal + tax, 2),
+        "subtotal": subtotal,
+        "tax": tax,
+        "items": items,
+        "payment_method": rng.choice(["Visa", "Mastercard", "Cash", None]),
+        "category_suggestion": "expense",
+    }
+
+
+def _image_bytes(messages):
+    for message in messages or []:
+        content = message.get("content")
+        if not isinstance(content, list):
+            continue
+        for part in content:
+            if part.get("type") == "image_url":
+                return (part.get("image_url") or {}).get("url", "").encode("utf-8")
+    return json.dumps(messages or []).encode("utf-8")
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "openai-stub"
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": {"message": "invalid JSON"}})
+
+        path = self.path.rstrip("/")
+        is_chat = path.endswith("/chat/completions")
+        (self.server.ocr_latency if is_chat else self.server.latency).sleep()
+        fault = self.server.faults.pick()
+        if fault:
+            status, headers = fault
+            return self._send(status, {"error": {"message": "injected failure", "type": "stub_error"}}, headers)
+
+        if is_chat:
+            content = json.dumps(fake_receipt(_image_bytes(req.get("messages"))))
+            return self._send(200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": req.get("model", "gpt-4o"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 800, "completion_tokens": len(content) // 4, "total_tokens": 800 + len(content) // 4},
+            })
+
+        if path.endswith("/embeddings"):
+            inputs = req.get("input")
+            if isinstance(inputs, str):
+                inputs = [inputs]
+            dim = int(req.get("dimensions") or self.server.dim)
+            data = [
+                {"object": "embedding", "index": i, "embedding": fake_embedding(t, dim)}
+                for i, t in enumerate(inputs or [])
+            ]
+            tokens = sum(len((t or "").split()) for t in inputs or [])
+            return self._send(200, {
+                "object": "list",
+                "data": data,
+                "model": req.get("model", "text-embedding-3-small"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+            })
+        self._send(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8089, dim=DIM, verbose=False, latency=0.0, ocr_latency=None,
+                error_rate=0.0, rate_limit_rate=0.0, seed=None):
+    """latency/ocr_latency are seconds or latency specs (stubs/faults.py); OCR defaults to `latency`."""
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.dim = dim
+    server.latency = LatencyModel(latency, seed)
+    server.ocr_latency = LatencyModel(latency if ocr_latency is None else ocr_latency, seed)
+    server.faults = FaultInjector(error_rate, rate_limit_rate, seed=seed)
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--dim", type=int, default=DIM)
+    add_fault_arguments(parser)
+    parser.add_argument("--ocr-latency", default=None, help="Latency spec for chat completions (default: --latency).")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    server = make_server(
+        args.host, args.port, args.dim, args.verbose, args.latency, args.ocr_latency,
+        args.error_rate, args.rate_limit_rate, args.seed,
+    )
+    print(f"OpenAI stub listening on http://{args.host}:{server.server_port}/v1")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Stand-in for a Pinecone index (the data-plane subset PineconeStore uses), in memory.
+
+    python -m stubs.pinecone_stub --port 8090 --latency lognormal:0.05:0.5
+    VECTOR_STORE=pinecone PINECONE_API_KEY=stub PINECONE_HOST=http://127.0.0.1:8090 flask --app run:app run
+
+Serves POST /vectors/upsert, /query (cosine, with metadata) and /vectors/delete
+(ids or deleteAll), plus GET /describe_index_stats. Vectors are lost on exit.
+"""
+import json
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from stubs.faults import LatencyModel, FaultInjector, add_fault_arguments
+
+
+class MemoryIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vectors = {}  # id -> (unit vector, metadata)
+
+    def upsert(self, vectors):
+        with self._lock:
+            for v in vectors:
+                values = np.asarray(v["values"], dtype=np.float32)
+                norm = float(np.linalg.norm(values)) or 1.0
+                self._vectors[v["id"]] = (values / norm, v.get("metadata") or {})
+        return len(vectors)
+
+    def query(self, vector, top_k, include_metadata):
+        with self._lock:
+            items = list(self._vectors.items())
+        if not items:
+            return []
+        q = np.asarray(vector, dtype=np.float32)
+        q = q / (float(np.linalg.norm(q)) or 1.0)
+        scores = np.stack([vec for _, (vec, _) in items]) @ q
+        order = np.argsort(-scores)[:top_k]
+        return [
+            {
+                "id": items[i][0],
+                "score": float(scores[i]),
+                **({"metadata": items[i][1][1]} if include_metadata else {}),
+            }
+            for i in order
+        ]
+
+    def delete(self, ids=None, delete_all=False):
+        with self._lock:
+            if delete_all:
+                self._vectors.clear()
+            for vid in ids or []:
+                self._vectors.pop(vid, None)
+
+    def count(self):
+        with self._lock:
+            return len(self._vectors)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "pinecone-stub"
+
+    def _send(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _injected_failure(self):
+        self.server.latency.sleep()
+        fault = self.server.faults.pick()
+        if fault:
+            status, headers = fault
+            self._send(status, {"code": status, "message": "injected failure"}, headers)
+            return True
+        return False
+
+    def do_GET(self):
+        if self._injected_failure():
+            return
+        if self.path.rstrip("/") == "/describe_index_stats":
+            return self._send(200, {"namespaces": {"": {"vectorCount": self.server.index.count()}},
+                                    "dimension": self.server.dim, "totalVectorCount": self.server.index.count()})
+        self._send(404, {"message": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            req = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"message": "invalid JSON"})
+        if self._injected_failure():
+            return
+
+        index = self.server.index
+        path = self.path.rstrip("/")
+        if path == "/vectors/upsert":
+            return self._send(200, {"upsertedCount": index.upsert(req.get("vectors") or [])})
+        if path == "/query":
+            matches = index.query(req.get("vector") or [], int(req.get("topK", 10)), req.get("includeMetadata", False))
+            return self._send(200, {"matches": matches, "namespace": req.get("namespace", "")})
+        if path == "/vectors/delete":
+            index.delete(req.get("ids"), bool(req.get("deleteAll")))
+            return self._send(200, {})
+        if path == "/describe_index_stats":
+            return self.do_GET()
+        self._send(404, {"message": f"Unknown path {self.path}"})
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8090, dim=1536, verbose=False, latency=0.0,
+                error_rate=0.0, rate_limit_rate=0.0, seed=None):
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.index = MemoryIndex()
+    server.dim = dim
+    server.latency = LatencyModel(latency, seed)
+    server.faults = FaultInjector(error_rate, rate_limit_rate, seed=seed)
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--dim", type=int, default=1536)
+    add_fault_arguments(parser)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.dim, args.verbose, args.latency,
+                         args.error_rate, args.rate_limit_rate, args.seed)
+    print(f"Pinecone stub listening on http://{args.host}:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Stand-in for an S3-compatible object store (the subset S3Storage uses), in memory.
+
+    python -m stubs.s3_stub --port 8092 --latency lognormal:0.02:0.5
+    STORAGE_BACKEND=s3 S3_BUCKET=uploads S3_ENDPOINT_URL=http://127.0.0.1:8092 \\
+        AWS_ACCESS_KEY_ID=stub AWS_SECRET_ACCESS_KEY=stub S3_REGION=us-east-1 flask --app run:app run
+
+Path-style requests only: PUT/GET/HEAD/DELETE of objects, multipart uploads (initiate,
+upload part, complete, abort, list), ListObjectsV2 and bucket create/head. Buckets are
+created on first use and signatures are not checked. Objects are lost on exit.
+"""
+import re
+import uuid
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+from xml.sax.saxutils import escape
+from stubs.faults import LatencyModel, FaultInjector, add_fault_arguments
+
+XMLNS = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _iso(ts):
+    return ts.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _decode_aws_chunked(body):
+    """Strip aws-chunked framing (`<hex size>[;chunk-signature=..]\\r\\n<data>\\r\\n`... plus trailers)."""
+    out, pos = bytearray(), 0
+    while True:
+        end = body.index(b"\r\n", pos)
+        size = int(body[pos:end].split(b";")[0], 16)
+        pos = end + 2
+        if size == 0:
+            return bytes(out)
+        out += body[pos:pos + size]
+        pos += size + 2
+
+
+class Bucket:
+    def __init__(self):
+        self.objects = {}  # key -> (bytes, etag, last_modified, content_type)
+        self.uploads = {}  # upload id -> {"key", "initiated", "parts": {number: (bytes, etag)}}
+
+
+class MemoryStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def bucket(self, name):
+        with self._lock:
+            return self._buckets.setdefault(name, Bucket())
+
+    def lock(self):
+        return self._lock
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "s3-stub"
+
+    def _send(self, status, body=b"", headers=None, content_type="application/xml"):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if body or status not in (204, 304):
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status, code, message):
+        xml = f'<?xml version="1.0" encoding="UTF-8"?><Error><Code>{code}</Code><Message>{escape(message)}</Message></Error>'
+        self._send(status, xml)
+
+    def _parse(self):
+        parts = urlsplit(self.path)
+        bucket, _, key = parts.path.lstrip("/").partition("/")
+        query = {k: v[0] for k, v in parse_qs(parts.query, keep_blank_values=True).items()}
+        return unquote(bucket), unquote(key), query
+
+    def _body(self):
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if "aws-chunked" in self.headers.get("Content-Encoding", "") or \
+                self.headers.get("x-amz-content-sha256", "").startswith("STREAMING-"):
+            data = _decode_aws_chunked(data)
+        return data
+
+    def _injected_failure(self):
+        self.server.latency.sleep()
+        fault = self.server.faults.pick()
+        if fault:
+            status, headers = fault
+            code = "SlowDown" if status == 429 else "InternalError"
+            self._error(status, code, "injected failure")
+            return True
+        return False
+
+    def do_PUT(self):
+        name, key, query = self._parse()
+        data = self._body()
+        if self._injected_failure():
+            return
+        bucket = self.server.store.bucket(name)
+        if not key:
+            return self._send(200)
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        with self.server.store.lock():
+            if "uploadId" in query:
+                upload = bucket.uploads.get(query["uploadId"])
+                if upload is None:
+                    return self._error(404, "NoSuchUpload", query["uploadId"])
+                upload["parts"][int(query["partNumber"])] = (data, etag)
+            else:
+                bucket.objects[key] = (data, etag, _now(), self.headers.get("Content-Type", "binary/octet-stream"))
+        self._send(200, headers={"ETag": etag})
+
+    def do_POST(self):
+        name, key, query = self._parse()
+        data = self._body()
+        if self._injected_failure():
+            return
+        bucket = self.server.store.bucket(name)
+        with self.server.store.lock():
+            if "uploads" in query:
+                upload_id = uuid.uuid4().hex
+                bucket.uploads[upload_id] = {
+                    "key": key, "initiated": _now(), "parts": {},
+                    "content_type": self.headers.get("Content-Type", "binary/octet-stream"),
+                }
+                return self._send(200, (
+                    f'<?xml version="1.0" encoding="UTF-8"?><InitiateMultipartUploadResult xmlns="{XMLNS}">'
+                    f"<Bucket>{escape(name)}</Bucket><Key>{escape(key)}</Key><UploadId>{upload_id}</UploadId>"
+                    "</InitiateMultipartUploadResult>"
+                ))
+            if "uploadId" in query:
+                upload = bucket.uploads.pop(query["uploadId"], None)
+                if upload is None:
+                    return self._error(404, "NoSuchUpload", query["uploadId"])
+                numbers = [int(n) for n in re.findall(rb"<PartNumber>(\d+)</PartNumber>", data)]
+                content = b"".join(upload["parts"][n][0] for n in numbers)
+                etag = f'"{hashlib.md5(content).hexdigest()}-{len(numbers)}"'
+                bucket.objects[key] = (content, etag, _now(), upload["content_type"])
+                return self._send(200, (
+                    f'<?xml version="1.0" encoding="UTF-8"?><CompleteMultipartUploadResult xmlns="{XMLNS}">'
+                    f"<Bucket>{escape(name)}</Bucket><Key>{escape(key)}</Key><ETag>{escape(etag)}</ETag>"
+                    "</CompleteMultipartUploadResult>"
+                ))
+        self._error(400, "InvalidRequest", f"Unsupported POST {self.path}")
+
+    def do_GET(self):
+        name, key, query = self._parse()
+        if self._injected_failure():
+            return
+        bucket = self.server.store.bucket(name)
+        if key:
+            with self.server.store.lock():
+                obj = bucket.objects.get(key)
+            if obj is None:
+                return self._error(404, "NoSuchKey", key)
+            data, etag, modified, content_type = obj
+            return self._send(200, data, {
+                "ETag": etag, "Last-Modified": modified.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+            }, content_type)
+        if "uploads" in query:
+            return self._list_uploads(name, bucket, query.get("prefix", ""))
+        self._list_objects(name, bucket, query)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_DELETE(self):
+        name, key, query = self._parse()
+        if self._injected_failure():
+            return
+        bucket = self.server.store.bucket(name)
+        with self.server.store.lock():
+            if "uploadId" in query:
+                bucket.uploads.pop(query["uploadId"], None)
+            else:
+                bucket.objects.pop(key, None)
+        self._send(204)
+
+    def _list_objects(self, name, bucket, query):
+        prefix = query.get("prefix", "")
+        max_keys = int(query.get("max-keys", 1000))
+        after = query.get("continuation-token") or query.get("start-after", "")
+        with self.server.store.lock():
+            keys = sorted(k for k in bucket.objects if k.startswith(prefix) and k > after)
+            page = [(k, bucket.objects[k]) for k in keys[:max_keys]]
+        truncated = len(keys) > max_keys
+        contents = "".join(
+            f"<Contents><Key>{escape(k)}</Key><LastModified>{_iso(modified)}</LastModified>"
+            f"<ETag>{escape(etag)}</ETag><Size>{len(data)}</Size><StorageClass>STANDARD</StorageClass></Contents>"
+            for k, (data, etag, modified, _) in page
+        )
+        token = f"<NextContinuationToken>{escape(page[-1][0])}</NextContinuationToken>" if truncated else ""
+        self._send(200, (
+            f'<?xml version="1.0" encoding="UTF-8"?><ListBucketResult xmlns="{XMLNS}">'
+            f"<Name>{escape(name)}</Name><Prefix>{escape(prefix)}</Prefix><KeyCount>{len(page)}</KeyCount>"
+            f"<MaxKeys>{max_keys}</MaxKeys><IsTruncated>{str(truncated).lower()}</IsTruncated>{token}{contents}"
+            "</ListBucketResult>"
+        ))
+
+    def _list_uploads(self, name, bucket, prefix):
+        with self.server.store.lock():
+            uploads = [(uid, u) for uid, u in bucket.uploads.items() if u["key"].startswith(prefix)]
+        items = "".join(
+            f"<Upload><Key>{escape(u['key'])}</Key><UploadId>{uid}</UploadId>"
+            f"<Initiated>{_iso(u['initiated'])}</Initiated></Upload>"
+            for uid, u in uploads
+        )
+        self._send(200, (
+            f'<?xml version="1.0" encoding="UTF-8"?><ListMultipartUploadsResult xmlns="{XMLNS}">'
+            f"<Bucket>{escape(name)}</Bucket><IsTruncated>false</IsTruncated>{items}</ListMultipartUploadsResult>"
+        ))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(host="127.0.0.1", port=8092, verbose=False, latency=0.0, error_rate=0.0,
+                rate_limit_rate=0.0, seed=None):
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.store = MemoryStore()
+    server.latency = LatencyModel(latency, seed)
+    server.faults = FaultInjector(error_rate, rate_limit_rate, seed=seed)
+    server.verbose = verbose
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8092)
+    add_fault_arguments(parser)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+    server = make_server(args.host, args.port, args.verbose, args.latency,
+                         args.error_rate, args.rate_limit_rate, args.seed)
+    print(f"S3 stub listening on http://{args.host}:{server.server_port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
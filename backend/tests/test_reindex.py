@@ -0,0 +1,143 @@
+"""reindex_receipts against the offline OpenAI stub (stubs/openai_stub.py) and a local vector store.
+
+    cd backend && python -m pytest -q tests
+"""
+import json
+import os
+import threading
+import pytest
+
+os.environ["EMBEDDING_CACHE_PATH"] = ""  # in-memory only; cleared per test below
+
+from flask_migrate import upgrade
+from app import create_app, db
+from app.models import User, Receipt
+from app.services import embedding_cache, ocr_service, reindex_service
+from app.services.vector_store import get_vector_store
+from stubs.openai_stub import make_server
+
+
+@pytest.fixture
+def stub():
+    server = make_server(port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch, stub):
+    monkeypatch.setenv("DATABASE_URL", "sqlite:///" + str(tmp_path / "test.db"))
+    monkeypatch.setenv("VECTOR_STORE", "local")
+    monkeypatch.setenv("VECTOR_STORE_PATH", str(tmp_path / "vectors"))
+    monkeypatch.setenv("OPENAI_API_KEY", "stub")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{stub.server_port}/v1")
+    monkeypatch.setattr(ocr_service, "_openai_client", None)
+    embedding_cache.clear()
+
+    app = create_app()
+    with app.app_context():
+        upgrade()
+        user = User(name="Test", email="test@example.com", password_hash="x", role="admin")
+        db.session.add(user)
+        db.session.flush()
+        for i in range(1, 8):
+            db.session.add(Receipt(uploaded_by=user.id, image_path=f"{i}.jpg", merchant_name=f"Shop {i}", total_amount=i))
+        db.session.commit()
+        yield app
+        db.session.remove()
+
+
+class _Calls(list):
+    def __init__(self):
+        super().__init__()
+        self.fail_on = set()
+
+
+@pytest.fixture
+def embed_calls(monkeypatch):
+    """Records the texts of every embeddings request; `fail_on` lists call numbers that raise."""
+    calls = _Calls()
+    real = reindex_service.create_embeddings
+    lock = threading.Lock()
+
+    def create_embeddings(texts):
+        with lock:
+            calls.append(list(texts))
+            number = len(calls)
+        if number in calls.fail_on:
+            raise RuntimeError("embeddings unavailable")
+        return real(texts)
+
+    monkeypatch.setattr(reindex_service, "create_embeddings", create_embeddings)
+    return calls
+
+
+def _merchants(calls):
+    return sorted(int(text.split()[1]) for batch in calls for text in batch)
+
+
+def _vector_ids():
+    return {r.id: r.pinecone_id for r in Receipt.query.order_by(Receipt.id)}
+
+
+def test_batches_every_receipt_and_clears_checkpoint(app, embed_calls, tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    stats = reindex_service.reindex_receipts(
+        chunk_size=5, batch_size=2, workers=2, checkpoint_path=checkpoint, log=lambda msg: None
+    )
+
+    assert stats == {"indexed": 7, "failed": 0, "chunks": 2}
+    assert sorted(len(batch) for batch in embed_calls) == [1, 2, 2, 2]
+    assert _merchants(embed_calls) == list(range(1, 8))
+    assert _vector_ids() == {i: f"receipt-{i}" for i in range(1, 8)}
+    assert len(get_vector_store()) == 7
+    assert not os.path.exists(checkpoint)
+
+
+def test_failed_chunk_resumes_from_checkpoint(app, embed_calls, tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    embed_calls.fail_on.add(3)  # first batch of the third chunk (receipts 5-6)
+    stats = reindex_service.reindex_receipts(
+        only_missing=False, chunk_size=2, batch_size=2, workers=1, checkpoint_path=checkpoint, log=lambda msg: None
+    )
+
+    assert stats == {"indexed": 4, "failed": 1, "chunks": 3}
+    with open(checkpoint, encoding="utf-8") as f:
+        assert json.load(f)["last_id"] == 4
+
+    embed_calls.clear()
+    logged = []
+    stats = reindex_service.reindex_receipts(
+        only_missing=False, chunk_size=2, batch_size=2, workers=1, checkpoint_path=checkpoint, log=logged.append
+    )
+
+    assert "Resuming after receipt #4" in logged
+    assert stats == {"indexed": 3, "failed": 0, "chunks": 2}
+    assert _merchants(embed_calls) == [5, 6, 7]
+    assert len(get_vector_store()) == 7
+    assert not os.path.exists(checkpoint)
+
+
+def test_receipts_left_without_vector_are_retried(app, embed_calls, tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    embed_calls.fail_on.add(2)  # second batch of the only chunk (receipts 4-6)
+    stats = reindex_service.reindex_receipts(
+        chunk_size=10, batch_size=3, workers=1, checkpoint_path=checkpoint, log=lambda msg: None
+    )
+
+    assert stats == {"indexed": 4, "failed": 1, "chunks": 1}
+    assert [rid for rid, vector_id in _vector_ids().items() if vector_id is None] == [4, 5, 6]
+    assert not os.path.exists(checkpoint)  # a failed chunk never advances the checkpoint
+
+    embed_calls.clear()
+    stats = reindex_service.reindex_receipts(
+        chunk_size=10, batch_size=3, workers=1, checkpoint_path=checkpoint, log=lambda msg: None
+    )
+
+    assert stats == {"indexed": 3, "failed": 0, "chunks": 1}
+    assert _merchants(embed_calls) == [4, 5, 6]
+    assert _vector_ids() == {i: f"receipt-{i}" for i in range(1, 8)}
+    assert len(get_vector_store()) == 7
@@ -15,6 +15,11 @@ api.interceptors.request.use((config) => {
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  // After our own writes, ask replica-backed routes to read from the primary for a few seconds
+  const primaryUntil = localStorage.getItem("primaryUntil");
+  if (primaryUntil && Number(primaryUntil) > Date.now() / 1000) {
+    config.headers["X-Primary-Until"] = primaryUntil;
+  }
   // Let the browser set Content-Type (with boundary) for FormData; default application/json would break file uploads
   if (config.data instanceof FormData) {
     delete config.headers["Content-Type"];
@@ -24,7 +29,11 @@ api.interceptors.request.use((config) => {
 });
 
 api.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    const primaryUntil = response.headers["x-primary-until"];
+    if (primaryUntil) localStorage.setItem("primaryUntil", primaryUntil);
+    return response;
+  },
   (error) => {
     if (error.response?.status === 401) {
       localStorage.removeItem("token");
@@ -1,4 +1,5 @@
 import api, { apiBase } from "./client";
+import { syncedGet, order } from "./sync";
 
 export const auth = {
   login: (username, password) => api.post("/auth/login", { username, password }),
@@ -22,7 +23,20 @@ export const receipts = {
       onUploadProgress: onProgress,
     });
   },
-  list: () => api.get("/receipts/"),
+  uploadBatch: (files, onProgress) => {
+    const form = new FormData();
+    files.forEach((file) => form.append("files", file));
+    return api.post("/receipts/upload-batch", form, {
+      headers: { "Content-Type": undefined },
+      onUploadProgress: onProgress,
+    });
+  },
+  list: (params = {}) => {
+    const q = new URLSearchParams(params);
+    // Later pages (cursor) are fetched directly; the first page is kept in sync.
+    if (params.cursor) return api.get(`/receipts/?${q}`);
+    return syncedGet(`/receipts/?${q}`, order.receipts);
+  },
   update: (id, data) => api.patch(`/receipts/${id}`, data),
   search: (q) => api.get(`/receipts/search?q=${encodeURIComponent(q)}`),
   imageUrl: (filename) => `${apiBase ? apiBase + "/api" : "/api"}/receipts/image/${filename}`,
@@ -34,7 +48,7 @@ export const ledger = {
     const params = new URLSearchParams();
     if (start) params.set("start", start);
     if (end) params.set("end", end);
-    return api.get(`/ledger/?${params}`);
+    return syncedGet(`/ledger/?${params}`, order.ledger);
   },
   dailySummary: (start, end) => {
     const params = new URLSearchParams();
@@ -48,8 +62,8 @@ export const ledger = {
 
 export const reimbursements = {
   create: (data) => api.post("/reimbursements/", data),
-  mine: () => api.get("/reimbursements/mine"),
-  pending: () => api.get("/reimbursements/pending"),
+  mine: () => syncedGet("/reimbursements/mine", order.reimbursementsNewest),
+  pending: () => syncedGet("/reimbursements/pending", order.reimbursementsOldest),
   approve: (id) => api.post(`/reimbursements/${id}/approve`),
   reject: (id) => api.post(`/reimbursements/${id}/reject`),
 };
@@ -57,7 +71,16 @@ export const reimbursements = {
 export const recipes = {
   list: (category) => {
     const params = category ? `?category=${encodeURIComponent(category)}` : "";
-    return api.get(`/recipes/${params}`);
+    return syncedGet(`/recipes/${params}`, order.recipes);
+  },
+  search: ({ q, ingredients = [], category, page, perPage } = {}) => {
+    const params = new URLSearchParams();
+    if (q) params.set("q", q);
+    ingredients.forEach((name) => params.append("ingredient", name));
+    if (category) params.set("category", category);
+    if (page) params.set("page", page);
+    if (perPage) params.set("per_page", perPage);
+    return api.get(`/recipes/search?${params}`);
   },
   create: (formData) =>
     api.post("/recipes/", formData, {
@@ -84,7 +107,7 @@ export const activity = {
 };
 
 export const inventory = {
-  list: () => api.get("/inventory/"),
+  list: () => syncedGet("/inventory/", order.inventory),
   create: (data) => api.post("/inventory/", data),
   update: (id, data) => api.patch(`/inventory/${id}`, data),
   remove: (id) => api.delete(`/inventory/${id}`),
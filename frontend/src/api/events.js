@@ -0,0 +1,75 @@
+import { apiBase } from "./client";
+
+// One shared connection to the server-sent event stream (GET /api/events/stream), read
+// with fetch so the JWT goes in the Authorization header like every other request.
+// Listeners get each change event ({ type, op, id, seq, user_id }) and a synthetic
+// { type: "connected", reconnect } per connection; after a reconnect they should refetch
+// to cover the gap.
+const listeners = new Set();
+let controller = null;
+
+function dispatch(evt) {
+  listeners.forEach((fn) => fn(evt));
+}
+
+function parse(block) {
+  const data = block
+    .split("\n")
+    .filter((line) => line.startsWith("data:"))
+    .map((line) => line.slice(5).trim())
+    .join("\n");
+  if (!data) return;
+  try {
+    dispatch(JSON.parse(data));
+  } catch {
+    // ignore malformed messages
+  }
+}
+
+async function run(signal) {
+  let delay = 3000;
+  let reconnect = false;
+  while (!signal.aborted) {
+    try {
+      const res = await fetch(`${apiBase ? apiBase + "/api" : "/api"}/events/stream`, {
+        headers: { Authorization: `Bearer ${localStorage.getItem("token")}` },
+        signal,
+      });
+      if (res.status === 401 || res.status === 404) return;
+      if (res.ok && res.body) {
+        delay = 3000;
+        dispatch({ type: "connected", reconnect });
+        reconnect = true;
+        const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+        let buffer = "";
+        for (;;) {
+          const { value, done } = await reader.read();
+          if (done) break;
+          buffer += value;
+          const blocks = buffer.split("\n\n");
+          buffer = blocks.pop();
+          blocks.forEach(parse);
+        }
+      }
+    } catch {
+      if (signal.aborted) return;
+    }
+    await new Promise((resolve) => setTimeout(resolve, delay));
+    delay = Math.min(delay * 2, 60000);
+  }
+}
+
+export function subscribeEvents(listener) {
+  listeners.add(listener);
+  if (!controller) {
+    controller = new AbortController();
+    run(controller.signal);
+  }
+  return () => {
+    listeners.delete(listener);
+    if (!listeners.size && controller) {
+      controller.abort();
+      controller = null;
+    }
+  };
+}
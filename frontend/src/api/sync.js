@@ -0,0 +1,61 @@
+import api from "./client";
+
+// Delta sync for collection endpoints (backend/app/sync.py). The first request for a URL
+// loads the whole collection and remembers its X-Sync-Token; later requests send it as
+// `since` and merge the changed rows and deleted ids into the cached list, so revisiting
+// a page or refreshing after a mutation only transfers what changed.
+const cache = new Map();
+
+const byDesc = (key) => (a, b) => (a[key] < b[key] ? 1 : a[key] > b[key] ? -1 : b.id - a.id);
+const byAsc = (key) => (a, b) => (a[key] > b[key] ? 1 : a[key] < b[key] ? -1 : a.id - b.id);
+
+// Same ordering as the backend uses for each collection.
+export const order = {
+  ledger: byDesc("entry_date"),
+  receipts: byDesc("created_at"),
+  inventory: (a, b) => a.name.localeCompare(b.name),
+  recipes: byDesc("created_at"),
+  reimbursementsNewest: byDesc("created_at"),
+  reimbursementsOldest: byAsc("created_at"),
+};
+
+async function loadFull(key, url) {
+  const res = await api.get(url);
+  const token = res.headers["x-sync-token"];
+  if (token !== undefined && Array.isArray(res.data)) {
+    cache.set(key, { token, items: res.data.slice(), headers: res.headers });
+  }
+  return res;
+}
+
+/**
+ * GET a collection URL through the sync cache. Resolves to { data, headers } like axios;
+ * `headers` are those of the full load (e.g. X-Next-Cursor for the next receipts page).
+ */
+export async function syncedGet(url, compare) {
+  const key = `${localStorage.getItem("token")} ${url}`;
+  const entry = cache.get(key);
+  if (!entry) return loadFull(key, url);
+
+  const sep = url.includes("?") ? "&" : "?";
+  const res = await api.get(`${url}${sep}since=${encodeURIComponent(entry.token)}`);
+  const { changed = [], deleted = [], reset } = res.data || {};
+  if (reset) {
+    cache.delete(key);
+    return loadFull(key, url);
+  }
+  const cached = new Set(entry.items.map((item) => item.id));
+  const last = entry.items[entry.items.length - 1];
+  // A paginated first page only takes changes that fall inside it; later pages load by cursor.
+  const inPage = (item) =>
+    !entry.headers["x-next-cursor"] || !compare || !last || cached.has(item.id) || compare(item, last) <= 0;
+  const drop = new Set([...deleted, ...changed.map((item) => item.id)]);
+  const items = entry.items.filter((item) => !drop.has(item.id)).concat(changed.filter(inPage));
+  if (compare && changed.length) items.sort(compare);
+  cache.set(key, { ...entry, token: res.headers["x-sync-token"] ?? entry.token, items });
+  return { data: items.slice(), headers: entry.headers };
+}
+
+export function clearSyncCache() {
+  cache.clear();
+}
@@ -1,5 +1,6 @@
 import { createContext, useState, useEffect } from "react";
 import { auth as authApi } from "../api/endpoints";
+import { clearSyncCache } from "../api/sync";
 
 export const AuthContext = createContext(null);
 
@@ -39,6 +40,7 @@ export function AuthProvider({ children }) {
   };
 
   const logout = () => {
+    clearSyncCache();
     setToken(null);
     setUser(null);
     localStorage.removeItem("token");
@@ -0,0 +1,27 @@
+import { useEffect, useRef } from "react";
+import { subscribeEvents } from "../api/events";
+
+/**
+ * Call `onChange` (debounced) when the server reports a committed change to one of
+ * `types` (e.g. ["reimbursement", "ledger"]), and after the event stream reconnects.
+ */
+export function useLiveEvents(types, onChange, delay = 300) {
+  const callback = useRef(onChange);
+  callback.current = onChange;
+  const key = types.join(",");
+
+  useEffect(() => {
+    const wanted = new Set(key.split(","));
+    let timer = null;
+    const unsubscribe = subscribeEvents((evt) => {
+      // The page loaded on mount; only a reconnect can have missed changes.
+      if (evt.type === "connected" ? !evt.reconnect : !wanted.has(evt.type)) return;
+      clearTimeout(timer);
+      timer = setTimeout(() => callback.current(), delay);
+    });
+    return () => {
+      clearTimeout(timer);
+      unsubscribe();
+    };
+  }, [key, delay]);
+}
@@ -2,6 +2,7 @@ import { useState, useEffect, useCallback } from "react";
 import { useAuth } from "../hooks/useAuth";
 import { activity as activityApi } from "../api/endpoints";
 import { users as usersApi } from "../api/endpoints";
+import { useLiveEvents } from "../hooks/useLiveEvents";
 
 function formatDateTime(val) {
   if (!val) return "—";
@@ -45,8 +46,8 @@ export default function Activity() {
     user_id: "",
   });
 
-  const fetchLogs = useCallback(async () => {
-    setLoading(true);
+  const fetchLogs = useCallback(async ({ silent = false } = {}) => {
+    if (!silent) setLoading(true);
     try {
       const params = {};
       if (filters.start) params.start = filters.start;
@@ -66,6 +67,9 @@ export default function Activity() {
     fetchLogs();
   }, [fetchLogs]);
 
+  // Refresh quietly when a change is committed by another user or tab.
+  useLiveEvents(["activity"], () => fetchLogs({ silent: true }));
+
   useEffect(() => {
     if (!isAdmin) return;
     usersApi
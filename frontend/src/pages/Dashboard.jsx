@@ -2,6 +2,7 @@ import { useState, useEffect, useCallback } from "react";
 import { useAuth } from "../hooks/useAuth";
 import { ledger } from "../api/endpoints";
 import Modal from "../components/Modal";
+import { useLiveEvents } from "../hooks/useLiveEvents";
 
 const CATEGORIES = [
   { value: "sales", label: "Sales" },
@@ -43,8 +44,8 @@ export default function Dashboard() {
   });
   const [submitError, setSubmitError] = useState("");
 
-  const fetchData = useCallback(async () => {
-    setLoading(true);
+  const fetchData = useCallback(async ({ silent = false } = {}) => {
+    if (!silent) setLoading(true);
     try {
       const res = await ledger.dailySummary(range.start, range.end);
       setSummary({ rows: res.data.rows || [], totals: res.data.totals || null });
@@ -59,6 +60,9 @@ export default function Dashboard() {
     fetchData();
   }, [fetchData]);
 
+  // Refresh quietly when a change is committed by another user or tab.
+  useLiveEvents(["ledger"], () => fetchData({ silent: true }));
+
   const openAddModal = () => {
     setEditing(null);
     setForm({
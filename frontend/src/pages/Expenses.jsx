@@ -25,6 +25,8 @@ function formatCurrency(val) {
 export default function Expenses() {
   const { user } = useAuth();
   const [receiptsList, setReceiptsList] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchQuery, setSearchQuery] = useState("");
   const [searchResults, setSearchResults] = useState(null);
   const [loading, setLoading] = useState(true);
@@ -40,13 +42,27 @@ export default function Expenses() {
     try {
       const res = await receipts.list();
       setReceiptsList(res.data || []);
+      setNextCursor(res.headers["x-next-cursor"] || null);
     } catch (err) {
       setReceiptsList([]);
+      setNextCursor(null);
     } finally {
       setLoading(false);
     }
   }, []);
 
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const res = await receipts.list({ cursor: nextCursor });
+      setReceiptsList((prev) => [...prev, ...(res.data || [])]);
+      setNextCursor(res.headers["x-next-cursor"] || null);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     fetchReceipts();
   }, [fetchReceipts]);
@@ -308,6 +324,18 @@ export default function Expenses() {
             </tbody>
           </table>
         </div>
+        {searchResults === null && nextCursor && (
+          <div className="border-t border-slate-100 px-4 py-3 text-center">
+            <button
+              type="button"
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="px-4 py-2 rounded-lg border border-slate-200 text-slate-600 hover:bg-slate-50 text-sm disabled:opacity-50"
+            >
+              {loadingMore ? "Loading..." : "Load more"}
+            </button>
+          </div>
+        )}
       </div>
 
       {/* Review Form Modal */}
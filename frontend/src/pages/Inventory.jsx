@@ -2,6 +2,7 @@ import { useState, useEffect, useCallback } from "react";
 import { useAuth } from "../hooks/useAuth";
 import { inventory as inventoryApi } from "../api/endpoints";
 import Modal from "../components/Modal";
+import { useLiveEvents } from "../hooks/useLiveEvents";
 
 function formatDateTime(val) {
   if (!val) return "—";
@@ -18,8 +19,8 @@ export default function Inventory() {
   const [form, setForm] = useState({ name: "", quantity: "", unit: "" });
   const [error, setError] = useState("");
 
-  const fetchItems = useCallback(async () => {
-    setLoading(true);
+  const fetchItems = useCallback(async ({ silent = false } = {}) => {
+    if (!silent) setLoading(true);
     try {
       const res = await inventoryApi.list();
       setItems(Array.isArray(res.data) ? res.data : []);
@@ -34,6 +35,9 @@ export default function Inventory() {
     fetchItems();
   }, [fetchItems]);
 
+  // Refresh quietly when a change is committed by another user or tab.
+  useLiveEvents(["inventory"], () => fetchItems({ silent: true }));
+
   const openEdit = (item) => {
     setEditingItem(item);
     setForm({
@@ -2,6 +2,7 @@ import { useState, useEffect, useCallback } from "react";
 import { useAuth } from "../hooks/useAuth";
 import { reimbursements } from "../api/endpoints";
 import Modal from "../components/Modal";
+import { useLiveEvents } from "../hooks/useLiveEvents";
 
 function formatCurrency(val) {
   if (val == null || val === "") return "";
@@ -45,8 +46,8 @@ export default function Reimbursements() {
   const [formError, setFormError] = useState("");
   const [actionLoading, setActionLoading] = useState(null);
 
-  const fetchData = useCallback(async () => {
-    setLoading(true);
+  const fetchData = useCallback(async ({ silent = false } = {}) => {
+    if (!silent) setLoading(true);
     try {
       const [mineRes, pendingRes] = await Promise.all([
         reimbursements.mine(),
@@ -66,6 +67,9 @@ export default function Reimbursements() {
     fetchData();
   }, [fetchData]);
 
+  // Refresh quietly when a change is committed by another user or tab.
+  useLiveEvents(["reimbursement"], () => fetchData({ silent: true }));
+
   const openForm = () => {
     setForm({
       entry_date: new Date().toISOString().slice(0, 10),